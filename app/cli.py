@@ -0,0 +1,82 @@
+import argparse
+import logging
+import sys
+import time
+from typing import List
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+
+logger = logging.getLogger(__name__)
+
+
+def read_urls(path: str) -> List[str]:
+    # 한 줄에 URL 하나, 빈 줄과 '#' 주석은 무시 ('-'이면 표준 입력)
+    stream = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    try:
+        return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    # 환경 변수 기반 파이프라인 설정은 API 서버와 동일하게 app.pipeline에서 생성
+    from app.pipeline import batch_runner, job_manager, bind_api_clients
+    from app.services.api_clients import ApiClientManager
+
+    urls = read_urls(args.urls_file) + list(args.urls)
+    if not urls:
+        logger.error("No URLs provided")
+        return 2
+
+    api_clients = ApiClientManager.from_env()
+    bind_api_clients(api_clients)
+    batch = batch_runner.submit(urls, update=args.update)
+    logger.info(f"Batch {batch.batch_id}: {len(batch.items)} unique URLs ({len(urls)} given)")
+
+    reported = set()
+    try:
+        while True:
+            for item in batch.items:
+                if item.is_finished and item.url not in reported:
+                    reported.add(item.url)
+                    result = item.job.result_path if item.job is not None else None
+                    logger.info(f"[{len(reported)}/{len(batch.items)}] {item.status}: {item.url} {result or item.to_dict()['error']}")
+            if batch.is_finished:
+                break
+            time.sleep(args.poll_interval)
+    except KeyboardInterrupt:
+        logger.warning("Interrupted, cancelling remaining jobs")
+        return 130
+    finally:
+        batch_runner.shutdown()
+        job_manager.shutdown()
+        api_clients.close()
+
+    summary = batch.to_dict()
+    logger.info(f"Batch finished: {summary['completed']} completed, {summary['failed']} failed")
+    return 1 if summary["failed"] else 0
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="나무위키 문서 팟캐스트 생성 도구")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    batch_parser = subparsers.add_parser("batch", help="여러 나무위키 URL로 팟캐스트를 일괄 생성")
+    batch_parser.add_argument("urls_file", help="URL 목록 파일 (한 줄에 하나, '-'이면 표준 입력)")
+    batch_parser.add_argument("urls", nargs="*", help="추가 URL")
+    batch_parser.add_argument("--update", action="store_true", help="이미 만든 팟캐스트는 바뀐 챕터만 다시 생성")
+    batch_parser.add_argument("--poll-interval", type=float, default=2.0, help="진행 상황 확인 주기 (초)")
+    batch_parser.set_defaults(func=run_batch)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -24,4 +24,22 @@ class AudioGenerationException(PodcastException):
     """오디오 생성 실패 예외"""
     def __init__(self, message="Failed to generate audio"):
         self.message = message
-        super().__init__(self.message) 
\ No newline at end of file
+        super().__init__(self.message) 
+
+class JobNotFoundException(PodcastException):
+    """존재하지 않는 작업 예외"""
+    def __init__(self, message="Job not found"):
+        self.message = message
+        super().__init__(self.message)
+
+class JobQueueFullException(PodcastException):
+    """작업 대기열 초과 예외"""
+    def __init__(self, message="Too many pending jobs"):
+        self.message = message
+        super().__init__(self.message)
+
+class BatchNotFoundException(PodcastException):
+    """존재하지 않는 배치 예외"""
+    def __init__(self, message="Batch not found"):
+        self.message = message
+        super().__init__(self.message)
@@ -3,7 +3,10 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from fastapi.responses import HTMLResponse
 from fastapi import Request
-from app.routes import podcast
+from contextlib import asynccontextmanager
+from app.routes import podcast, metrics
+from app.services.api_clients import ApiClientManager
+from app import pipeline
 from dotenv import load_dotenv
 import os
 import logging
@@ -23,7 +26,24 @@ logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 요청마다 클라이언트를 만들지 않도록 앱 수명 동안 공유할 API 클라이언트를 생성해 서비스에 주입
+    api_clients = ApiClientManager.from_env()
+    pipeline.bind_api_clients(api_clients)
+    app.state.api_clients = api_clients
+    try:
+        yield
+    finally:
+        pipeline.batch_runner.shutdown()
+        pipeline.job_manager.shutdown()
+        if pipeline.podcast_maker.merge_executor is not None:
+            pipeline.podcast_maker.merge_executor.shutdown(wait=False, cancel_futures=True)
+        await api_clients.aclose()
+
+
+app = FastAPI(lifespan=lifespan)
 
 templates = Jinja2Templates(directory="app/templates")
 
@@ -33,3 +53,4 @@ async def read_root(request: Request):
     return templates.TemplateResponse("podcast.html", {"request": request})
 
 app.include_router(podcast.router, prefix="/api")
+app.include_router(metrics.router)
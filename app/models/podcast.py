@@ -1,5 +1,5 @@
 from pydantic import BaseModel, HttpUrl
-from typing import Optional
+from typing import List, Optional
 
 class PodcastRequest(BaseModel):
     url: HttpUrl
@@ -13,8 +13,50 @@ class PodcastResponse(BaseModel):
 class ScriptRequest(BaseModel):
     title: str
     content: str
+    # True이면 캐시된 LLM 응답과 기존 결과를 쓰지 않고 새로 생성
+    fresh: bool = False
 
 class ScriptResponse(BaseModel):
     script: str
     status: str = "success"
-    error: str = None 
\ No newline at end of file
+    error: str = None 
+
+class JobCreateResponse(BaseModel):
+    job_id: str
+    status: str
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    title: str
+    url: Optional[str] = None
+    status: str
+    stage: Optional[str] = None
+    progress_current: int = 0
+    progress_total: int = 0
+    created_at: str
+    updated_at: str
+    error: Optional[str] = None
+    # 완료된 작업의 HLS 마스터 플레이리스트와 챕터 정보 경로 (HLS 출력이 없으면 None, 결과 MP3만 제공)
+    playlist_url: Optional[str] = None
+    chapters_url: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    urls: List[HttpUrl]
+    # True이면 이미 만든 팟캐스트는 원문이 바뀐 챕터만 다시 생성
+    update: bool = False
+
+class BatchItemStatus(BaseModel):
+    url: str
+    status: str
+    title: Optional[str] = None
+    job_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchStatusResponse(BaseModel):
+    batch_id: str
+    status: str
+    total: int
+    completed: int
+    failed: int
+    created_at: str
+    items: List[BatchItemStatus]
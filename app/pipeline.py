@@ -0,0 +1,132 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dotenv import load_dotenv
+from app.services.namuwiki_scrape import NamuWikiScraper
+from app.services.namuwiki_extractors import get_extractor
+from app.services.api_clients import ApiClientManager
+from app.services.script_maker import ScriptMaker, LongDocumentConfig
+from app.services.audio_maker import AudioMaker
+from app.services.tts_providers import create_tts_provider
+from app.services.podcast_maker import PodcastMaker
+from app.services.audio_merger import AudioMerger
+from app.services.hls_packager import HLSPackager
+from app.services.job_manager import JobManager
+from app.services.batch_runner import BatchRunner
+from app.storage.audio_cache import AudioCache
+from app.storage.scrape_cache import ScrapeCache
+from app.storage.llm_cache import LLMResponseCache
+from app.storage.podcast_index import PodcastIndex
+from app.storage.checkpoint_store import CheckpointStore
+from app.storage.job_queue import JobQueue
+from app.utils.rate_limiter import HostRateLimiter
+from app.utils.quota_scheduler import QuotaScheduler
+
+# API 라우트와 CLI가 같은 파이프라인 인스턴스(동시성 제한, 캐시, 작업 풀)를 공유하도록 한 곳에서 생성
+load_dotenv()
+NamuWikiScraper.extractor = get_extractor(os.getenv("NAMUWIKI_EXTRACTOR", "html.parser"))
+NamuWikiScraper.cache = ScrapeCache(ttl_seconds=int(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "3600")))
+NamuWikiScraper.rate_limiter = HostRateLimiter(float(os.getenv("SCRAPE_MIN_INTERVAL_SECONDS", "1.0")))
+# API 키별 분당 할당량. 기본값은 제한 없음(0, 429 재시도만 수행)이며 키의 사용 등급(tier) 한도를 설정하면 그 안에서
+# 호출을 나눠 보냄. 워커 프로세스 여러 개가 같은 키를 쓰면 워커 수로 나눈 값을 설정.
+# OpenAI 한도는 분 단위로 채워지므로 기본적으로 1분치까지는 한 번에 보낼 수 있게 함 (긴 문서의 목차 요청 하나가
+# 버킷보다 커서 이후 호출이 모두 밀리지 않도록)
+llm_scheduler = QuotaScheduler(
+    "openai",
+    requests_per_minute=float(os.getenv("OPENAI_CHAT_RPM", "0")),
+    tokens_per_minute=float(os.getenv("OPENAI_CHAT_TPM", "0")),
+    burst_seconds=float(os.getenv("OPENAI_CHAT_BURST_SECONDS", "60")),
+    max_retries=int(os.getenv("SCRIPT_MAX_RETRIES", "3")),
+)
+script_maker = ScriptMaker(
+    os.getenv("OPENAI_API_KEY"),
+    scheduler=llm_scheduler,
+    max_concurrency=int(os.getenv("SCRIPT_MAX_CONCURRENCY", "4")),
+    toc_mode=os.getenv("TOC_MODE", "sections"),
+    cache=LLMResponseCache(
+        ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", str(30 * 86400))),
+        max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    ),
+    long_document=LongDocumentConfig(
+        threshold_tokens=int(os.getenv("LONG_DOC_THRESHOLD_TOKENS", "60000")),
+        window_tokens=int(os.getenv("LONG_DOC_WINDOW_TOKENS", "8000")),
+        overlap_tokens=int(os.getenv("LONG_DOC_OVERLAP_TOKENS", "500")),
+        max_chapter_tokens=int(os.getenv("MAX_CHAPTER_TOKENS", "6000")),
+        max_input_tokens=int(os.getenv("MAX_INPUT_TOKENS", "400000")),
+    ),
+)
+tts_provider_name = os.getenv("TTS_PROVIDER", "openai")  # elevenlabs, openai, gtts, fake
+tts_provider = create_tts_provider(
+    tts_provider_name,
+    api_key={"elevenlabs": os.getenv("ELEVEN_LABS_API_KEY"), "openai": os.getenv("OPENAI_API_KEY")}.get(tts_provider_name),
+)
+tts_scheduler = QuotaScheduler(
+    tts_provider.name,
+    requests_per_minute=float(os.getenv(f"{tts_provider_name.upper()}_TTS_RPM", "0")),
+    characters_per_minute=float(os.getenv(f"{tts_provider_name.upper()}_TTS_CHARS_PER_MINUTE", "0")),
+    max_retries=int(os.getenv("TTS_MAX_RETRIES", "3")),
+)
+audio_maker = AudioMaker(
+    tts_provider,
+    scheduler=tts_scheduler,
+    max_concurrency=int(os.getenv(f"{tts_provider_name.upper()}_TTS_MAX_CONCURRENCY", str(tts_provider.default_concurrency))),
+    cache=AudioCache(max_bytes=int(os.getenv("TTS_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))),
+)
+# wal: API 서버와 워커가 한 머신에 있을 때 / delete: 여러 머신의 워커가 공유 볼륨의 generated/를 함께 쓸 때
+sqlite_journal_mode = os.getenv("SQLITE_JOURNAL_MODE", "wal")
+podcast_maker = PodcastMaker(
+    script_maker,
+    audio_maker,
+    audio_merger=AudioMerger(os.getenv("AUDIO_MERGE_MODE", "concat")),
+    index=PodcastIndex(
+        retention_seconds=int(os.getenv("PODCAST_RETENTION_SECONDS", str(30 * 86400))),
+        max_bytes=int(os.getenv("PODCAST_STORAGE_MAX_BYTES", str(10 * 1024 * 1024 * 1024))),
+        journal_mode=sqlite_journal_mode,
+    ),
+    checkpoints=CheckpointStore(ttl_seconds=int(os.getenv("CHECKPOINT_TTL_SECONDS", str(7 * 86400)))),
+)
+# 0이면 HLS 세그먼트를 만들지 않고 병합된 MP3만 제공
+hls_segment_seconds = float(os.getenv("HLS_SEGMENT_SECONDS", "6"))
+if hls_segment_seconds > 0:
+    podcast_maker.hls_packager = HLSPackager(segment_seconds=hls_segment_seconds)
+
+
+def create_merge_executor(processes: int) -> ProcessPoolExecutor:
+    # 병합 프로세스는 작업/heartbeat 스레드가 이미 돌고 있을 때 처음 만들어지므로 fork하지 않음
+    # (다른 스레드가 잡고 있던 락이 자식에서 풀리지 않아 멈출 수 있음). forkserver가 없는 Windows는 spawn
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload(["app.services.audio_merger"])
+    return ProcessPoolExecutor(max_workers=processes, mp_context=context)
+
+
+# 0이면 병합을 작업 스레드에서 실행, 1 이상이면 그 수만큼의 프로세스 풀에서 실행
+merge_processes = int(os.getenv("MERGE_PROCESSES", "0"))
+if merge_processes > 0:
+    podcast_maker.merge_executor = create_merge_executor(merge_processes)
+# thread: 작업을 API 프로세스의 스레드 풀에서 실행 / queue: 공유 대기열에 넣고 워커 프로세스(python -m app.worker)가 실행
+job_backend = os.getenv("JOB_BACKEND", "thread")
+if job_backend not in ("thread", "queue"):
+    raise ValueError(f"Unknown job backend: {job_backend}")
+job_queue = JobQueue(
+    os.getenv("JOB_QUEUE_PATH", "generated/job_queue.sqlite3"),
+    max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "3")),
+    journal_mode=sqlite_journal_mode,
+) if job_backend == "queue" else None
+job_manager = JobManager(
+    podcast_maker,
+    max_workers=int(os.getenv("PODCAST_MAX_WORKERS", "4")),
+    max_pending=int(os.getenv("PODCAST_MAX_PENDING_JOBS", "100")),
+    queue=job_queue,
+)
+batch_runner = BatchRunner(
+    job_manager,
+    scrape_workers=int(os.getenv("BATCH_SCRAPE_WORKERS", "4")),
+)
+
+
+def bind_api_clients(clients: ApiClientManager):
+    # 서비스들이 애플리케이션 공용 클라이언트(커넥션 풀, 타임아웃, 재시도 설정)를 사용하도록 주입
+    script_maker.client = clients.openai
+    tts_provider.bind_clients(clients)
@@ -1,30 +1,72 @@
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import  FileResponse
-from app.models.podcast import PodcastRequest, PodcastResponse, ScriptRequest
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import  FileResponse, Response, StreamingResponse
+from app.models.podcast import (
+    PodcastRequest,
+    PodcastResponse,
+    ScriptRequest,
+    JobCreateResponse,
+    JobStatusResponse,
+    BatchRequest,
+    BatchStatusResponse,
+)
 from app.services.namuwiki_scrape import NamuWikiScraper
 from app.services.namuwiki_data_extract import TextCleaner
-from app.services.script_maker import ScriptMaker
-from app.services.audio_maker import AudioMaker
 from app.exceptions.podcast_exceptions import (
     PodcastException,
     InvalidURLException,
     ScrapingException,
     ContentProcessingException,
+    JobNotFoundException,
+    JobQueueFullException,
+    BatchNotFoundException,
 )
-from app.services.podcast_maker import PodcastMaker
-import os
+from app.services.job_manager import PodcastJob
+from app.storage.hls_store import HLSStore
+from app.pipeline import script_maker, podcast_maker, job_manager, batch_runner
+import asyncio
 import logging
-from dotenv import load_dotenv
+import os
 
 # 로그 핸들러 설정
 logger = logging.getLogger()
 
 router = APIRouter()
 
-load_dotenv()
-script_maker = ScriptMaker(os.getenv("OPENAI_API_KEY"))
-audio_maker = AudioMaker([os.getenv("ELEVEN_LABS_API_KEY"), os.getenv("OPENAI_API_KEY")], 2) # 1: elevenlabs, 2: openai
-podcast_maker = PodcastMaker(script_maker, audio_maker)
+HLS_MEDIA_TYPES = {
+    ".m3u8": "application/vnd.apple.mpegurl",
+    ".ts": "video/mp2t",
+    ".json": "application/json",
+}
+# 세그먼트는 작업별로 한 번만 쓰이므로 오래 캐시, 플레이리스트/챕터 정보와 결과 MP3는 하루
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+MEDIA_CACHE_CONTROL = "public, max-age=86400"
+
+def _file_response(request: Request, path: str, media_type: str, cache_control: str,
+                   filename: str = None) -> Response:
+    # FileResponse가 Range 요청(206)을 처리하고, ETag가 일치하면 본문 없이 304로 응답
+    response = FileResponse(
+        path=path,
+        media_type=media_type,
+        filename=filename,
+        stat_result=os.stat(path),
+        headers={"Cache-Control": cache_control},
+    )
+    etag = response.headers.get("etag")
+    if_none_match = request.headers.get("if-none-match")
+    if etag and if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags or etag in tags:
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    return response
+
+def _job_status(job: PodcastJob) -> JobStatusResponse:
+    status = JobStatusResponse(**job.to_dict())
+    index = podcast_maker.index
+    if job.status == PodcastJob.COMPLETED and index is not None and index.hls.exists(job.job_id):
+        # 마스터 플레이리스트는 미디어 플레이리스트와 함께 챕터 정보(SESSION-DATA)를 가리킴
+        status.playlist_url = f"/api/jobs/{job.job_id}/media/{HLSStore.MASTER}"
+        status.chapters_url = f"/api/jobs/{job.job_id}/media/{HLSStore.CHAPTERS}"
+    return status
 
 @router.post("/podcast", response_model=PodcastResponse)
 async def create_podcast(request: PodcastRequest):
@@ -34,8 +76,8 @@ async def create_podcast(request: PodcastRequest):
             raise InvalidURLException()
         
         try:
-            # 콘텐츠 스크래핑
-            title, raw_content = NamuWikiScraper.scrape_content(str(request.url))
+            # 콘텐츠 스크래핑 (네트워크 I/O는 이벤트 루프 밖에서 실행)
+            title, raw_content = await asyncio.to_thread(NamuWikiScraper.scrape_content, str(request.url))
         except Exception as e:
             raise ScrapingException(f"Failed to scrape content: {str(e)}")
         
@@ -67,15 +109,146 @@ async def create_podcast(request: PodcastRequest):
 @router.post("/create_podcast")
 async def create_full_podcast(request: ScriptRequest):
     try:
-        podcast_path = podcast_maker.create_podcast(request.title, request.content)
+        # 작업 풀에서 생성하고 완료될 때까지 이벤트 루프를 막지 않고 대기
+        job = job_manager.submit(request.title, request.content, fresh=request.fresh)
+        podcast_path = await asyncio.wrap_future(job.future)
         
         return FileResponse(
             path=podcast_path,
             media_type="audio/mpeg",
-            filename=os.path.basename(podcast_path)
+            filename=job.download_filename
         )
         
+    except JobQueueFullException as e:
+        raise HTTPException(status_code=503, detail=str(e.message))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/stream_podcast")
+async def stream_full_podcast(request: ScriptRequest):
+    try:
+        # 목차는 응답 시작 전에 생성해 실패 시 오류 상태 코드를 돌려줄 수 있도록 함
+        chapters = await asyncio.to_thread(
+            script_maker.generate_toc, request.title, request.content, fresh=request.fresh
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    # 챕터 오디오가 준비되는 대로 MP3 바이트를 전송 (동기 제너레이터는 스레드풀에서 순회됨)
+    return StreamingResponse(
+        podcast_maker.stream_podcast(request.title, chapters, fresh=request.fresh),
+        media_type="audio/mpeg",
+    )
+
+@router.post("/jobs", response_model=JobCreateResponse, status_code=202)
+async def create_podcast_job(request: ScriptRequest):
+    try:
+        job = job_manager.submit(request.title, request.content, fresh=request.fresh)
+        return JobCreateResponse(job_id=job.job_id, status=job.status)
+    except JobQueueFullException as e:
+        raise HTTPException(status_code=503, detail=str(e.message))
+
+@router.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_podcast_job(job_id: str):
+    try:
+        job = job_manager.get_job(job_id)
+        return _job_status(job)
+    except JobNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e.message))
+
+@router.post("/jobs/{job_id}/retry", response_model=JobCreateResponse, status_code=202)
+async def retry_podcast_job(job_id: str):
+    try:
+        job = job_manager.get_job(job_id)
+    except JobNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e.message))
+
+    if job.status != PodcastJob.FAILED:
+        raise HTTPException(status_code=409, detail=f"Only failed jobs can be retried: {job.status}")
+    if not job.content:
+        # 재시작 전에 생성된 작업은 본문이 남아 있지 않으므로 새로 요청해야 함
+        raise HTTPException(status_code=409, detail="Job content is no longer available, submit it again")
+
+    try:
+        # 같은 제목/본문이면 체크포인트에서 완료된 목차/챕터를 이어받아 실행됨
+        retried = job_manager.submit(job.title, job.content, url=job.url)
+        return JobCreateResponse(job_id=retried.job_id, status=retried.status)
+    except JobQueueFullException as e:
+        raise HTTPException(status_code=503, detail=str(e.message))
 
+@router.post("/podcasts/update", response_model=JobCreateResponse, status_code=202)
+async def update_podcast(request: PodcastRequest):
+    # 문서를 다시 스크래핑해 같은 URL로 만든 이전 팟캐스트와 비교, 원문이 바뀐 챕터만 다시 생성
+    url = str(request.url)
+    try:
+        NamuWikiScraper.validate_url(url)
+    except InvalidURLException as e:
+        raise HTTPException(status_code=400, detail=str(e.message))
+
+    try:
+        title, raw_content = await asyncio.to_thread(NamuWikiScraper.scrape_content, url)
+        content = TextCleaner.clean_text(raw_content)
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Failed to scrape content: {str(e)}")
+
+    try:
+        job = job_manager.submit(title, content, url=NamuWikiScraper.normalize_url(url), update=True)
+        return JobCreateResponse(job_id=job.job_id, status=job.status)
+    except JobQueueFullException as e:
+        raise HTTPException(status_code=503, detail=str(e.message))
+
+@router.get("/jobs/{job_id}/result")
+async def get_podcast_job_result(job_id: str, request: Request):
+    try:
+        job = job_manager.get_job(job_id)
+    except JobNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e.message))
+
+    if job.status == PodcastJob.FAILED:
+        raise HTTPException(status_code=500, detail=job.error)
+    if job.status != PodcastJob.COMPLETED or not job.result_path:
+        raise HTTPException(status_code=409, detail=f"Job is not completed yet: {job.status}")
+    if not os.path.exists(job.result_path):
+        raise HTTPException(status_code=404, detail="Podcast file is no longer available")
+
+    return _file_response(request, job.result_path, "audio/mpeg", MEDIA_CACHE_CONTROL, filename=job.download_filename)
+
+@router.get("/jobs/{job_id}/media/{filename}")
+async def get_podcast_job_media(job_id: str, filename: str, request: Request):
+    # HLS 플레이리스트, 세그먼트, 챕터 정보 (클라이언트는 필요한 세그먼트만 받아 재생/챕터 이동)
+    index = podcast_maker.index
+    path = index.hls.path_for(job_id, filename) if index is not None else None
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Media not found: {filename}")
+
+    extension = os.path.splitext(filename)[1]
+    if extension == ".ts":
+        return _file_response(request, path, HLS_MEDIA_TYPES[extension], IMMUTABLE_CACHE_CONTROL)
+    if filename in (HLSStore.MASTER, HLSStore.PLAYLIST):
+        # 재생 중인 팟캐스트가 GC 대상에서 밀려나도록 접근 시각 갱신
+        await asyncio.to_thread(index.get, job_id)
+    return _file_response(request, path, HLS_MEDIA_TYPES[extension], MEDIA_CACHE_CONTROL)
+
+@router.get("/podcasts", response_model=JobStatusResponse)
+async def find_podcast_by_url(url: str):
+    try:
+        job = await asyncio.to_thread(job_manager.find_job_by_url, NamuWikiScraper.normalize_url(url))
+        return _job_status(job)
+    except JobNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e.message))
+
+@router.post("/batches", response_model=BatchStatusResponse, status_code=202)
+async def create_podcast_batch(request: BatchRequest):
+    try:
+        batch = batch_runner.submit((str(url) for url in request.urls), update=request.update)
+        return BatchStatusResponse(**batch.to_dict())
+    except InvalidURLException as e:
+        raise HTTPException(status_code=400, detail=str(e.message))
+
+@router.get("/batches/{batch_id}", response_model=BatchStatusResponse)
+async def get_podcast_batch(batch_id: str):
+    try:
+        batch = batch_runner.get_batch(batch_id)
+        return BatchStatusResponse(**batch.to_dict())
+    except BatchNotFoundException as e:
+        raise HTTPException(status_code=404, detail=str(e.message))
@@ -0,0 +1,149 @@
+import os
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class ApiClientConfig:
+    # 요청 타임아웃 (초, 연결 타임아웃은 별도)
+    timeout_seconds: float = 120.0
+    connect_timeout_seconds: float = 10.0
+    # ElevenLabs httpx transport의 연결 재시도 횟수 (요청이 나가기 전의 연결 실패만 해당)
+    # 429와 5xx 재시도는 할당량을 함께 관리하는 QuotaScheduler가 담당하므로 OpenAI SDK 재시도는 쓰지 않음
+    connect_retries: int = 2
+    # 프로바이더별 커넥션 풀 크기와 keep-alive 유지 시간
+    max_connections: int = 32
+    max_keepalive_connections: int = 16
+    keepalive_expiry_seconds: float = 60.0
+
+    @classmethod
+    def from_env(cls) -> "ApiClientConfig":
+        return cls(
+            timeout_seconds=float(os.getenv("API_TIMEOUT_SECONDS", str(cls.timeout_seconds))),
+            connect_timeout_seconds=float(os.getenv("API_CONNECT_TIMEOUT_SECONDS", str(cls.connect_timeout_seconds))),
+            connect_retries=int(os.getenv("API_CONNECT_RETRIES", str(cls.connect_retries))),
+            max_connections=int(os.getenv("API_MAX_CONNECTIONS", str(cls.max_connections))),
+            max_keepalive_connections=int(os.getenv("API_MAX_KEEPALIVE_CONNECTIONS", str(cls.max_keepalive_connections))),
+            keepalive_expiry_seconds=float(os.getenv("API_KEEPALIVE_EXPIRY_SECONDS", str(cls.keepalive_expiry_seconds))),
+        )
+
+
+class ApiClientManager:
+    """OpenAI(sync/async)와 ElevenLabs 클라이언트를 애플리케이션 전체에서 하나씩 공유하도록 관리
+
+    각 클라이언트는 처음 사용할 때 keep-alive 커넥션 풀, 타임아웃 설정과 함께 만들어지고
+    close/aclose에서 커넥션 풀을 정리합니다. 모든 호출은 QuotaScheduler를 거치므로 SDK 자체 재시도는 끕니다
+    (SDK가 몰래 재시도하면 스케줄러가 예약한 할당량보다 많은 요청이 나감).
+    """
+
+    def __init__(self, openai_api_key: Optional[str] = None, elevenlabs_api_key: Optional[str] = None,
+                 config: Optional[ApiClientConfig] = None):
+        self.openai_api_key = openai_api_key
+        self.elevenlabs_api_key = elevenlabs_api_key
+        self.config = config or ApiClientConfig()
+        self.lock = threading.Lock()
+        self._openai = None
+        self._async_openai = None
+        self._elevenlabs = None
+        self._elevenlabs_http = None
+        self.logger = logging.getLogger(__name__)
+
+    @classmethod
+    def from_env(cls) -> "ApiClientManager":
+        return cls(
+            openai_api_key=os.getenv("OPENAI_API_KEY"),
+            elevenlabs_api_key=os.getenv("ELEVEN_LABS_API_KEY"),
+            config=ApiClientConfig.from_env(),
+        )
+
+    @property
+    def openai(self):
+        with self.lock:
+            if self._openai is None:
+                import openai
+                self._openai = openai.OpenAI(
+                    api_key=self._require_key(self.openai_api_key, "OpenAI"),
+                    http_client=openai.DefaultHttpxClient(limits=self._limits()),
+                    timeout=self._timeout(),
+                    max_retries=0,
+                )
+                self.logger.info("Created shared OpenAI client")
+            return self._openai
+
+    @property
+    def async_openai(self):
+        with self.lock:
+            if self._async_openai is None:
+                import openai
+                self._async_openai = openai.AsyncOpenAI(
+                    api_key=self._require_key(self.openai_api_key, "OpenAI"),
+                    http_client=openai.DefaultAsyncHttpxClient(limits=self._limits()),
+                    timeout=self._timeout(),
+                    max_retries=0,
+                )
+                self.logger.info("Created shared async OpenAI client")
+            return self._async_openai
+
+    @property
+    def elevenlabs(self):
+        with self.lock:
+            if self._elevenlabs is None:
+                import httpx
+                from elevenlabs.client import ElevenLabs
+                # ElevenLabs SDK는 자체 재시도 설정이 없어 httpx transport의 연결 재시도를 사용
+                self._elevenlabs_http = httpx.Client(
+                    timeout=self._timeout(),
+                    transport=httpx.HTTPTransport(limits=self._limits(), retries=self.config.connect_retries),
+                )
+                self._elevenlabs = ElevenLabs(
+                    api_key=self._require_key(self.elevenlabs_api_key, "ElevenLabs"),
+                    timeout=self.config.timeout_seconds,
+                    httpx_client=self._elevenlabs_http,
+                )
+                self.logger.info("Created shared ElevenLabs client")
+            return self._elevenlabs
+
+    def close(self):
+        with self.lock:
+            # ElevenLabs 클라이언트는 close가 없으므로 직접 만든 httpx 클라이언트를 닫음
+            clients = [self._openai, self._elevenlabs_http]
+            self._openai = self._elevenlabs = self._elevenlabs_http = None
+        for client in clients:
+            if client is None:
+                continue
+            try:
+                client.close()
+            except Exception as e:
+                self.logger.warning(f"Failed to close API client: {str(e)}")
+
+    async def aclose(self):
+        with self.lock:
+            async_client, self._async_openai = self._async_openai, None
+        if async_client is not None:
+            await async_client.close()
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _limits(self):
+        import httpx
+        return httpx.Limits(
+            max_connections=self.config.max_connections,
+            max_keepalive_connections=self.config.max_keepalive_connections,
+            keepalive_expiry=self.config.keepalive_expiry_seconds,
+        )
+
+    def _timeout(self):
+        import httpx
+        return httpx.Timeout(self.config.timeout_seconds, connect=self.config.connect_timeout_seconds)
+
+    @staticmethod
+    def _require_key(api_key: Optional[str], provider: str) -> str:
+        if not api_key:
+            raise ValueError(f"{provider} API key is not provided")
+        return api_key
@@ -1,87 +1,177 @@
 import os
 import re
-from datetime import datetime
+import threading
+import time
+import uuid
 import logging
-from elevenlabs import VoiceSettings
-from elevenlabs.client import ElevenLabs
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from app.exceptions.podcast_exceptions import AudioGenerationException
-from pathlib import Path
-import openai
+from app.services.tts_providers import TTSProvider
+from app.storage.audio_cache import AudioCache
+from app.utils.text_splitter import pack_chunks
+from app.utils.quota_scheduler import QuotaScheduler, should_refund
+from app.utils.metrics import span, BYTES_WRITTEN, CONCURRENCY_WAIT, TTS_CHARACTERS, TTS_REQUESTS_IN_FLIGHT
+from typing import Iterator, Optional
 
 class AudioMaker:
-    def __init__(self, api_key_list: list[str], model: int):
-        # 1: elevenlabs, 2: openai
-        self.model = model
-        api_key = api_key_list[model-1]
-
-        if not api_key:
-            raise ValueError("API key is not provided")
-        if model == 1:
-            self.client = ElevenLabs(api_key=api_key)
-        elif model == 2:
-            openai.api_key = api_key
-            self.client = openai.OpenAI()
-        else:
-            raise ValueError("TTS model is not selected")
-
-        self.audio_dir = "generated/audio"
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, provider: TTSProvider, max_concurrency: Optional[int] = None,
+                 cache: Optional[AudioCache] = None, max_chars: Optional[int] = None,
+                 scheduler: Optional[QuotaScheduler] = None, audio_dir: str = "generated/audio"):
+        self.provider = provider
+        # 요청 수/글자 수 할당량에 맞춰 TTS 호출을 내보내고 429를 재시도 (None이면 한도 없이 재시도만 담당)
+        self.scheduler = scheduler or QuotaScheduler(provider.name)
+
+        self.max_concurrency = max(1, max_concurrency or provider.default_concurrency)
+        # 선택된 프로바이더로 동시에 나가는 TTS 요청 수를 제한
+        self.semaphore = threading.BoundedSemaphore(self.max_concurrency)
+        # 긴 스크립트는 문장 경계에서 나눈 청크들을 이 풀에서 동시에 합성
+        self.chunk_executor = ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="tts-chunk")
+        # 요청 1회당 입력 글자 수 한도
+        self.max_chars = max_chars or provider.max_chars
+
+        # 동일한 텍스트/보이스 설정의 오디오는 캐시에서 재사용 (None이면 캐시 미사용)
+        self.cache = cache
+
+        self.audio_dir = audio_dir
         os.makedirs(self.audio_dir, exist_ok=True)
         self.logger = logging.getLogger(__name__)
 
     def generate_audio(self, title: str, script: str) -> str:
-
-        if self.model == 1:
-            self.logger.info("TTS model selected: elevenlabs")
-            return self.generate_audio_elevenlabs(title, script)
-        elif self.model == 2:
-            self.logger.info("TTS model selected: openai")
-            return self.generate_audio_openai(title, script)
-        else:
-            raise ValueError("TTS model is not selected")
-        
-    def generate_audio_openai(self, title: str, script: str) -> str:
-
+        self.logger.info(f"TTS provider selected: {self.provider.name}")
+        with span("chapter_tts", provider=self.provider.name, characters=len(script or "")) as tts_span:
+            filepath = self._generate_audio_file(title, script)
+            tts_span.set(bytes=os.path.getsize(filepath))
+        return filepath
+
+    def stream_audio(self, title: str, script: str) -> Iterator[bytes]:
+        # 파일로 저장하지 않고 프로바이더가 보내 주는 MP3 청크를 도착하는 대로 전달
+        if not script or not title:
+            raise AudioGenerationException("Empty script or title provided")
+
+        chunks = pack_chunks(script, self.max_chars)
+        if not chunks:
+            raise AudioGenerationException("Empty script or title provided")
+
+        # 첫 청크는 실시간으로 스트리밍하고, 나머지 청크는 그동안 미리 합성
+        first_chunk, *rest_chunks = chunks
+        rest_futures = [
+            self.chunk_executor.submit(contextvars.copy_context().run, self._synthesize_chunk, chunk)
+            for chunk in rest_chunks
+        ]
         try:
-            if not script or not title:
-                raise ValueError("Empty script or title provided")
-            
-            self.logger.info(f"Starting audio generation for: {title}")
-            
-            # 타이틀을 파일명에 사용할 수 있도록 특수문자 제거 및 공백은 언더바(_)로 치환
-            sanitized_title = re.sub(r'[^\w\s-]', '', title.strip())
-            sanitized_title = re.sub(r'\s+', '_', sanitized_title)
-            
-            # 현재 생성 일시 (YYYYMMDD_HHMMSS 형식)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{sanitized_title}_{timestamp}.mp3"
-            filepath = os.path.join(self.audio_dir, filename)
-
-            self.logger.info("Converting text to speech...")
-            # TTS 변환 및 파일 저장
-
-            response = self.client.audio.speech.create(
-                model="tts-1",
-                voice="nova",
-                input=script,
-            )
-
-            self.logger.info(f"Saving audio file to: {filepath}")
-
-            with open(filepath, "wb") as f:
-                f.write(response.content)
-
-            if not os.path.exists(filepath):
-                self.logger.error("Failed to save audio file")
-                raise AudioGenerationException("Failed to save audio file")
-            
-            self.logger.info("Audio generation completed successfully")
-            return filepath
-
+            yield from self._stream_chunk(title, first_chunk)
+            for future in rest_futures:
+                yield future.result()
+        except AudioGenerationException:
+            raise
         except Exception as e:
-            self.logger.error(f"Audio generation failed: {str(e)}")
-            raise AudioGenerationException(f"Failed to generate audio: {str(e)}")
-        
-    def generate_audio_elevenlabs(self, title: str, script: str) -> str:
+            self.logger.error(f"Audio streaming failed: {str(e)}")
+            raise AudioGenerationException(f"Failed to stream audio: {str(e)}")
+        finally:
+            for future in rest_futures:
+                future.cancel()
+
+    def _stream_chunk(self, title: str, text: str) -> Iterator[bytes]:
+        cache_key = self.provider.cache_key(text)
+        cached_path = self.cache.get(cache_key) if self.cache is not None else None
+        cached_file = None
+        if cached_path is not None:
+            try:
+                cached_file = open(cached_path, "rb")
+            except FileNotFoundError:
+                # 읽기 직전에 다른 스레드가 해당 항목을 제거한 경우 새로 합성 (열린 뒤에는 삭제되어도 끝까지 읽힘)
+                pass
+        if cached_file is not None:
+            self.logger.info(f"Audio cache hit for: {title}")
+            with cached_file:
+                while chunk := cached_file.read(self.STREAM_CHUNK_SIZE):
+                    yield chunk
+            return
+
+        self.logger.info(f"Streaming audio for: {title}")
+        audio_data = bytearray()
+        attempt = 0
+        while True:
+            reservation = self.scheduler.acquire(characters=len(text))
+            try:
+                with self._provider_slot(text):
+                    for chunk in self.provider.stream(text):
+                        if chunk:
+                            audio_data.extend(chunk)
+                            yield chunk
+                break
+            except Exception as e:
+                # 이미 보낸 청크는 되돌릴 수 없으므로 첫 청크를 받기 전의 실패만 재시도 (예약량은 재시도가 새로 받음)
+                if not audio_data and should_refund(e):
+                    reservation.refund()
+                attempt += 1
+                delay = None if audio_data else self.scheduler.retry_delay(e, attempt)
+                if delay is None:
+                    raise
+                self.logger.warning(f"TTS stream failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                time.sleep(delay)
+
+        if self.cache is not None:
+            self.cache.put(cache_key, bytes(audio_data))
+
+    def _synthesize_chunk(self, text: str) -> bytes:
+        cache_key = self.provider.cache_key(text)
+        if self.cache is not None:
+            cached_path = self.cache.get(cache_key)
+            if cached_path is not None:
+                try:
+                    with open(cached_path, "rb") as f:
+                        return f.read()
+                except FileNotFoundError:
+                    # 읽기 직전에 다른 스레드가 해당 항목을 제거한 경우 새로 합성
+                    pass
+
+        # TTS 변환 (할당량과 프로바이더별 동시 요청 수 제한, 429는 재시도)
+        def synthesize() -> bytes:
+            with self._provider_slot(text):
+                return self.provider.synthesize(text)
+
+        audio_data = self.scheduler.run(synthesize, characters=len(text))
+
+        if self.cache is not None:
+            self.cache.put(cache_key, audio_data)
+        return audio_data
+
+    @contextmanager
+    def _provider_slot(self, text: str) -> Iterator[None]:
+        # 동시성 슬롯 대기 시간과 진행 중인 요청 수를 메트릭으로 기록
+        wait_started = time.perf_counter()
+        with self.semaphore:
+            CONCURRENCY_WAIT.observe(time.perf_counter() - wait_started, resource="tts")
+            TTS_CHARACTERS.inc(len(text), provider=self.provider.name)
+            with TTS_REQUESTS_IN_FLIGHT.track_inprogress(provider=self.provider.name):
+                yield
+
+    def _synthesize_script(self, script: str) -> bytes:
+        # 프로바이더 글자 수 한도에 맞춰 문장 경계에서 나누고, 청크별 결과를 순서대로 이어 붙임
+        chunks = pack_chunks(script, self.max_chars)
+        if not chunks:
+            raise ValueError("Empty script provided")
+        if len(chunks) == 1:
+            return self._synthesize_chunk(chunks[0])
+
+        self.logger.info(f"Synthesizing {len(chunks)} chunks concurrently")
+        # 요청 우선순위(contextvars)가 청크 합성 스레드에도 적용되도록 context를 복사해 실행
+        futures = [
+            self.chunk_executor.submit(contextvars.copy_context().run, self._synthesize_chunk, chunk)
+            for chunk in chunks
+        ]
+        try:
+            return b"".join(future.result() for future in futures)
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def _generate_audio_file(self, title: str, script: str) -> str:
 
         try:
             if not script or not title:
@@ -93,32 +183,17 @@ class AudioMaker:
             sanitized_title = re.sub(r'[^\w\s-]', '', title.strip())
             sanitized_title = re.sub(r'\s+', '_', sanitized_title)
             
-            # 현재 생성 일시 (YYYYMMDD_HHMMSS 형식)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"{sanitized_title}_{timestamp}.mp3"
+            # 같은 제목으로 동시에 생성해도 겹치지 않도록 고유 ID를 붙임
+            filename = f"{sanitized_title}_{uuid.uuid4().hex}.mp3"
             filepath = os.path.join(self.audio_dir, filename)
 
             self.logger.info("Converting text to speech...")
-            # TTS 변환 및 파일 저장
-            response = self.client.text_to_speech.convert(
-                voice_id="DMkRitQrfpiddSQT5adl",  # jjeong voice
-                output_format="mp3_44100_128",
-                text=script,
-                model_id="eleven_multilingual_v2",
-                voice_settings=VoiceSettings(
-                    stability=0.5,
-                    similarity_boost=0.75,
-                    style=0.0,
-                    use_speaker_boost=True,
-                )
-            )
+            audio_data = self._synthesize_script(script)
 
             self.logger.info(f"Saving audio file to: {filepath}")
-            # 파일 저장: response는 청크 iterable로 반환됨
             with open(filepath, "wb") as f:
-                for chunk in response:
-                    if chunk:
-                        f.write(chunk)
+                f.write(audio_data)
+            BYTES_WRITTEN.inc(len(audio_data), stage="chapter_tts")
 
             if not os.path.exists(filepath):
                 self.logger.error("Failed to save audio file")
@@ -130,4 +205,3 @@ class AudioMaker:
         except Exception as e:
             self.logger.error(f"Audio generation failed: {str(e)}")
             raise AudioGenerationException(f"Failed to generate audio: {str(e)}")
-        
\ No newline at end of file
@@ -0,0 +1,191 @@
+import os
+import json
+import shutil
+import subprocess
+import tempfile
+import threading
+import logging
+from typing import List, Tuple
+from app.exceptions.podcast_exceptions import AudioGenerationException
+
+# 챕터 사이에 넣는 효과음 (실행 디렉터리와 관계없이 저장소의 assets 폴더에서 찾음)
+DEFAULT_TRANSITION_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "assets", "mouse_click.flac"
+)
+
+class AudioMerger:
+    # concat: MP3 프레임을 디코딩 없이 이어 붙임 (ffmpeg concat demuxer, stream copy)
+    # pydub: 모든 챕터를 PCM으로 디코딩한 뒤 다시 인코딩
+    MERGE_MODES = ("concat", "pydub")
+
+    def __init__(self, merge_mode: str = "concat", transition_path: str = DEFAULT_TRANSITION_PATH,
+                 cache_dir: str = "generated/cache/transition"):
+        if merge_mode not in self.MERGE_MODES:
+            raise ValueError(f"Unknown merge mode: {merge_mode}")
+        self.merge_mode = merge_mode
+        self.transition_path = transition_path
+        self.cache_dir = cache_dir
+        self.lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.logger = logging.getLogger(__name__)
+
+    def __getstate__(self) -> dict:
+        # 프로세스 풀에서 병합할 수 있도록 lock은 제외하고 전달 (자식 프로세스에서 새로 생성)
+        state = self.__dict__.copy()
+        del state["lock"]
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def get_ffmpeg_paths() -> Tuple[str, str]:
+        # FFmpeg 경로 설정 (환경 변수가 없으면 PATH에서 탐색)
+        ffmpeg_path = os.getenv("FFMPEG_PATH") or shutil.which("ffmpeg")
+        ffprobe_path = os.getenv("FFPROBE_PATH") or shutil.which("ffprobe")
+
+        if not ffmpeg_path or not ffprobe_path or not os.path.exists(ffmpeg_path) or not os.path.exists(ffprobe_path):
+            raise AudioGenerationException("FFmpeg or FFprobe not found. Please check installation.")
+        return ffmpeg_path, ffprobe_path
+
+    def merge(self, audio_files: List[str], output_path: str) -> List[float]:
+        # 병합된 오디오에서 각 챕터가 시작하는 시각(초)을 반환 (HLS 챕터 정보에 사용)
+        try:
+            self.logger.info(f"Starting audio merge of {len(audio_files)} files ({self.merge_mode})")
+            if not os.path.exists(self.transition_path):
+                raise AudioGenerationException("Transition sound effect file not found.")
+
+            if self.merge_mode == "concat":
+                try:
+                    offsets = self._merge_concat(audio_files, output_path)
+                except Exception as e:
+                    # 입력 MP3의 형식이 서로 달라 stream copy가 불가능한 경우 디코딩 방식으로 대체
+                    self.logger.warning(f"Stream-copy merge failed, falling back to pydub: {str(e)}")
+                    offsets = self._merge_pydub(audio_files, output_path)
+            else:
+                offsets = self._merge_pydub(audio_files, output_path)
+
+            self.logger.info("Audio merge completed successfully")
+            return offsets
+
+        except Exception as e:
+            self.logger.error(f"Audio merge failed: {str(e)}")
+            raise AudioGenerationException(f"Failed to merge audio files: {str(e)}")
+
+    def probe(self, audio_file: str) -> dict:
+        _, ffprobe_path = self.get_ffmpeg_paths()
+        result = subprocess.run(
+            [
+                ffprobe_path, "-v", "error", "-select_streams", "a:0",
+                "-show_entries", "stream=sample_rate,channels,bit_rate",
+                "-of", "json", audio_file,
+            ],
+            capture_output=True, text=True, check=True,
+        )
+        stream = json.loads(result.stdout)["streams"][0]
+        return {
+            "sample_rate": int(stream["sample_rate"]),
+            "channels": int(stream["channels"]),
+            # VBR 등으로 비트레이트를 알 수 없으면 128k로 인코딩
+            "bit_rate": int(stream.get("bit_rate") or 128000),
+        }
+
+    def duration(self, audio_file: str) -> float:
+        _, ffprobe_path = self.get_ffmpeg_paths()
+        result = subprocess.run(
+            [ffprobe_path, "-v", "error", "-show_entries", "format=duration", "-of", "json", audio_file],
+            capture_output=True, text=True, check=True,
+        )
+        return float(json.loads(result.stdout)["format"]["duration"])
+
+    def get_transition_clip(self, reference_file: str) -> str:
+        # 챕터 오디오와 같은 샘플레이트/채널/비트레이트의 MP3로 트랜지션 효과음을 한 번만 인코딩
+        params = self.probe(reference_file)
+        kbps = max(32, round(params["bit_rate"] / 1000))
+        clip_path = os.path.join(
+            self.cache_dir,
+            f"transition_{params['sample_rate']}_{params['channels']}_{kbps}k.mp3",
+        )
+        with self.lock:
+            if not os.path.exists(clip_path):
+                ffmpeg_path, _ = self.get_ffmpeg_paths()
+                self.logger.info(f"Encoding transition clip: {clip_path}")
+                # 같은 캐시 디렉터리를 쓰는 다른 프로세스와 임시 파일이 겹치지 않도록 프로세스별 이름 사용
+                tmp_path = f"{clip_path}.{os.getpid()}.tmp.mp3"
+                subprocess.run(
+                    [
+                        ffmpeg_path, "-y", "-v", "error", "-i", self.transition_path,
+                        "-ar", str(params["sample_rate"]), "-ac", str(params["channels"]),
+                        "-codec:a", "libmp3lame", "-b:a", f"{kbps}k",
+                        "-write_xing", "0", "-id3v2_version", "0",
+                        tmp_path,
+                    ],
+                    capture_output=True, check=True,
+                )
+                os.replace(tmp_path, clip_path)
+        return clip_path
+
+    def _merge_concat(self, audio_files: List[str], output_path: str) -> List[float]:
+        ffmpeg_path, _ = self.get_ffmpeg_paths()
+        transition_clip = self.get_transition_clip(audio_files[0])
+
+        # 오디오 파일 병합 (각 파일 사이에 트랜지션 효과 삽입)
+        entries = []
+        for idx, audio_file in enumerate(audio_files, 1):
+            entries.append(audio_file)
+            if idx < len(audio_files):
+                entries.append(transition_clip)
+
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False, encoding="utf-8") as list_file:
+            for entry in entries:
+                escaped = os.path.abspath(entry).replace("'", "'\\''")
+                list_file.write(f"file '{escaped}'\n")
+            list_path = list_file.name
+
+        try:
+            self.logger.info(f"Exporting final podcast to: {output_path}")
+            subprocess.run(
+                [
+                    ffmpeg_path, "-y", "-v", "error", "-f", "concat", "-safe", "0",
+                    "-i", list_path, "-c", "copy", output_path,
+                ],
+                capture_output=True, check=True,
+            )
+        finally:
+            os.remove(list_path)
+
+        # stream copy는 프레임을 그대로 이어 붙이므로 챕터 시작 시각은 앞선 파일 길이의 합
+        transition_seconds = self.duration(transition_clip)
+        offsets, position = [], 0.0
+        for audio_file in audio_files:
+            offsets.append(position)
+            position += self.duration(audio_file) + transition_seconds
+        return offsets
+
+    def _merge_pydub(self, audio_files: List[str], output_path: str) -> List[float]:
+        from pydub import AudioSegment
+
+        ffmpeg_path, ffprobe_path = self.get_ffmpeg_paths()
+        AudioSegment.converter = ffmpeg_path
+        AudioSegment.ffprobe = ffprobe_path
+
+        # 트랜지션 효과음 로드 (mouse_click 효과음)
+        transition_segment = AudioSegment.from_file(self.transition_path)
+
+        # 오디오 파일 병합 (각 파일 사이에 트랜지션 효과 삽입)
+        combined = AudioSegment.empty()
+        offsets = []
+        total_files = len(audio_files)
+        for idx, audio_file in enumerate(audio_files, 1):
+            self.logger.info(f"Merging file {idx}/{total_files}")
+            offsets.append(len(combined) / 1000)
+            segment = AudioSegment.from_mp3(audio_file)
+            combined += segment
+            # 마지막 파일이 아니라면 트랜지션 효과음 추가
+            if idx < total_files:
+                combined += transition_segment
+
+        self.logger.info(f"Exporting final podcast to: {output_path}")
+        combined.export(output_path, format="mp3")
+        return offsets
@@ -0,0 +1,143 @@
+import threading
+import uuid
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+from app.services.job_manager import JobManager, PodcastJob
+from app.services.namuwiki_scrape import NamuWikiScraper
+from app.services.namuwiki_data_extract import TextCleaner
+from app.exceptions.podcast_exceptions import BatchNotFoundException, InvalidURLException
+from app.utils.quota_scheduler import PRIORITY_BATCH
+
+class BatchItem:
+    PENDING = "pending"
+    SCRAPING = "scraping"
+    FAILED = "failed"
+
+    def __init__(self, url: str):
+        self.url = url
+        self.title: Optional[str] = None
+        self.job: Optional[PodcastJob] = None
+        self.error: Optional[str] = None
+        self.scrape_status = BatchItem.PENDING
+        self.future: Optional[Future] = None
+
+    @property
+    def status(self) -> str:
+        # 작업 대기열에 들어간 뒤로는 팟캐스트 작업의 상태를 그대로 따름
+        return self.job.status if self.job is not None else self.scrape_status
+
+    @property
+    def is_finished(self) -> bool:
+        return self.scrape_status == BatchItem.FAILED or (self.job is not None and self.job.is_finished)
+
+    def to_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "status": self.status,
+            "title": self.title,
+            "job_id": self.job.job_id if self.job is not None else None,
+            "error": self.error or (self.job.error if self.job is not None else None),
+        }
+
+
+class PodcastBatch:
+    RUNNING = "running"
+    COMPLETED = "completed"
+
+    def __init__(self, items: List[BatchItem], update: bool = False):
+        self.batch_id = uuid.uuid4().hex
+        self.items = items
+        # True이면 이미 만든 팟캐스트는 바뀐 챕터만 다시 생성
+        self.update = update
+        self.created_at = datetime.now()
+
+    @property
+    def is_finished(self) -> bool:
+        return all(item.is_finished for item in self.items)
+
+    def to_dict(self) -> dict:
+        return {
+            "batch_id": self.batch_id,
+            "status": PodcastBatch.COMPLETED if self.is_finished else PodcastBatch.RUNNING,
+            "total": len(self.items),
+            "completed": sum(1 for item in self.items if item.status == PodcastJob.COMPLETED),
+            "failed": sum(1 for item in self.items if item.status == PodcastJob.FAILED),
+            "created_at": self.created_at.isoformat(),
+            "items": [item.to_dict() for item in self.items],
+        }
+
+
+class BatchRunner:
+    """여러 나무위키 URL을 스크래핑해 JobManager 작업 풀로 팬아웃하는 배치 실행기"""
+
+    def __init__(self, job_manager: JobManager, scrape_workers: int = 4, retention_seconds: int = 86400):
+        self.job_manager = job_manager
+        self.retention = timedelta(seconds=retention_seconds)
+        # 스크래핑은 세션 커넥션 풀과 호스트별 rate limit을 공유하므로 워커 수는 작게 유지
+        self.executor = ThreadPoolExecutor(max_workers=scrape_workers, thread_name_prefix="batch-scrape")
+        self.batches: Dict[str, PodcastBatch] = {}
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    def submit(self, urls: Iterable[str], update: bool = False) -> PodcastBatch:
+        # 정규화한 URL 기준으로 중복을 제거하고 입력 순서는 유지
+        unique_urls = []
+        seen = set()
+        for url in urls:
+            url = url.strip()
+            if not url:
+                continue
+            if not NamuWikiScraper.validate_url(url):
+                raise InvalidURLException(f"Invalid URL: {url}")
+            normalized = NamuWikiScraper.normalize_url(url)
+            if normalized not in seen:
+                seen.add(normalized)
+                unique_urls.append(normalized)
+
+        batch = PodcastBatch([BatchItem(url) for url in unique_urls], update=update)
+        with self.lock:
+            self._prune_finished_batches()
+            self.batches[batch.batch_id] = batch
+
+        self.logger.info(f"Batch {batch.batch_id} submitted with {len(batch.items)} URLs")
+        for item in batch.items:
+            item.future = self.executor.submit(self._run_item, item, batch.update)
+        return batch
+
+    def get_batch(self, batch_id: str) -> PodcastBatch:
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            raise BatchNotFoundException(f"Batch not found: {batch_id}")
+        return batch
+
+    def shutdown(self, wait: bool = False):
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run_item(self, item: BatchItem, update: bool = False):
+        item.scrape_status = BatchItem.SCRAPING
+        try:
+            title, blocks = NamuWikiScraper.scrape_blocks(item.url)
+            item.title = title
+            # 본문 블록이 추출되는 대로 정리
+            content = TextCleaner.clean_text(blocks)
+            # 대기열이 가득 차면 빈자리가 날 때까지 기다렸다가 제출
+            # 배치 작업은 대화형 요청보다 뒤에 API 할당량을 받음
+            item.job = self.job_manager.submit(
+                title, content, block=True, url=item.url, update=update, priority=PRIORITY_BATCH
+            )
+        except Exception as e:
+            item.error = str(e)
+            item.scrape_status = BatchItem.FAILED
+            self.logger.error(f"Batch item failed for {item.url}: {str(e)}")
+
+    def _prune_finished_batches(self):
+        expire_before = datetime.now() - self.retention
+        expired = [
+            batch_id for batch_id, batch in self.batches.items()
+            if batch.is_finished and batch.created_at < expire_before
+        ]
+        for batch_id in expired:
+            del self.batches[batch_id]
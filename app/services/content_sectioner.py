@@ -0,0 +1,116 @@
+import re
+from dataclasses import dataclass
+from typing import List
+from app.utils.text_splitter import split_sentences
+from app.utils.token_counter import count_tokens
+
+@dataclass
+class Section:
+    index: int
+    heading: str
+    text: str
+    tokens: int
+
+
+class ContentSectioner:
+    # 나무위키 문단 제목 블록: "2.1.\n초기 반응\n[편집]" 형태
+    HEADING_NUMBER_PATTERN = re.compile(r'^\d+(?:\.\d+)*\.$')
+    HEADING_INLINE_PATTERN = re.compile(r'^(\d+(?:\.\d+)*\.)\s+(.+)$')
+    EDIT_MARKER_PATTERN = re.compile(r'\[편집\]')
+    BLOCK_SEPARATOR_PATTERN = re.compile(r'\n\s*\n')
+    MAX_HEADING_LENGTH = 100
+
+    def __init__(self, max_section_tokens: int = 800, min_section_tokens: int = 150, model: str = "gpt-4o"):
+        self.max_section_tokens = max_section_tokens
+        self.min_section_tokens = min_section_tokens
+        self.model = model
+
+    def split(self, content: str) -> List[Section]:
+        # 1. 문단 제목을 기준으로 구간 나누기
+        raw_sections = []
+        heading, body = "", []
+        for block in self.BLOCK_SEPARATOR_PATTERN.split(content.strip()):
+            block = block.strip()
+            if not block:
+                continue
+            block_heading = self._parse_heading(block)
+            if block_heading is not None:
+                if heading or body:
+                    raw_sections.append((heading, "\n\n".join(body)))
+                heading, body = block_heading, []
+            else:
+                body.append(block)
+        if heading or body:
+            raw_sections.append((heading, "\n\n".join(body)))
+
+        # 2. 너무 긴 구간은 문단/문장 경계에서 나누고, 너무 짧은 구간은 다음 구간과 합치기
+        pieces = []
+        for heading, body in raw_sections:
+            for part_idx, part in enumerate(self._split_long_text(body) or [""]):
+                pieces.append((heading if part_idx == 0 else f"{heading} (계속)".strip(), part))
+
+        sections: List[Section] = []
+        pending_heading, pending_text = None, ""
+        for heading, text in pieces:
+            text = self._format_section_text(heading, text)
+            if pending_heading is not None:
+                heading = pending_heading
+                text = f"{pending_text}\n\n{text}"
+                pending_heading = None
+            tokens = count_tokens(text, self.model)
+            if tokens < self.min_section_tokens:
+                pending_heading, pending_text = heading, text
+                continue
+            sections.append(Section(len(sections) + 1, heading, text, tokens))
+
+        if pending_heading is not None:
+            if sections and sections[-1].tokens + count_tokens(pending_text, self.model) <= self.max_section_tokens:
+                last = sections[-1]
+                last.text = f"{last.text}\n\n{pending_text}"
+                last.tokens = count_tokens(last.text, self.model)
+            else:
+                sections.append(Section(len(sections) + 1, pending_heading, pending_text, count_tokens(pending_text, self.model)))
+
+        return sections
+
+    def _parse_heading(self, block: str):
+        lines = [line.strip() for line in block.split("\n") if line.strip()]
+        if not lines or len(block) > self.MAX_HEADING_LENGTH:
+            return None
+        first, *rest = lines
+        if self.HEADING_NUMBER_PATTERN.match(first):
+            title = " ".join(line for line in rest if not self.EDIT_MARKER_PATTERN.fullmatch(line))
+            return f"{first} {title}".strip()
+        # 같은 줄에 번호와 제목이 있는 경우 ("1. 개요")
+        match = self.HEADING_INLINE_PATTERN.match(first)
+        if match and len(lines) == 1:
+            return f"{match.group(1)} {self.EDIT_MARKER_PATTERN.sub('', match.group(2)).strip()}"
+        return None
+
+    def _split_long_text(self, text: str) -> List[str]:
+        if not text or count_tokens(text, self.model) <= self.max_section_tokens:
+            return [text] if text else []
+
+        # 문단 단위로 나누고, 문단 하나가 너무 길면 문장 단위로 나눔
+        units = []
+        for paragraph in re.split(r'\n+', text):
+            if count_tokens(paragraph, self.model) <= self.max_section_tokens:
+                units.append(paragraph)
+            else:
+                units.extend(split_sentences(paragraph))
+
+        parts, current, current_tokens = [], [], 0
+        for unit in units:
+            unit_tokens = count_tokens(unit, self.model)
+            if current and current_tokens + unit_tokens > self.max_section_tokens:
+                parts.append("\n".join(current))
+                current, current_tokens = [], 0
+            current.append(unit)
+            current_tokens += unit_tokens
+        if current:
+            parts.append("\n".join(current))
+        return parts
+
+    @staticmethod
+    def _format_section_text(heading: str, text: str) -> str:
+        return f"{heading}\n{text}".strip() if heading else text
@@ -0,0 +1,98 @@
+import os
+import json
+import subprocess
+import logging
+from typing import List, Tuple
+from app.services.audio_merger import AudioMerger
+from app.storage.hls_store import HLSStore
+from app.exceptions.podcast_exceptions import AudioGenerationException
+
+class HLSPackager:
+    """병합된 MP3를 고정 길이 HLS 세그먼트로 나누고 목차 기반 챕터 정보를 함께 기록
+
+    세그먼트는 디코딩 없이 MP3 프레임을 MPEG-TS로 옮겨 담으므로(stream copy) 병합보다 훨씬 가볍습니다.
+    클라이언트는 전체 파일을 받지 않고 필요한 구간만 받아 바로 재생하거나 챕터 위치로 이동할 수 있습니다.
+    """
+    # Apple HLS 챕터 규격의 SESSION-DATA ID (chapters.json을 가리킴)
+    CHAPTERS_DATA_ID = "com.apple.hls.chapters"
+    # MPEG-TS에 담긴 MP3 오디오의 코덱 문자열
+    CODECS = "mp4a.40.34"
+
+    def __init__(self, segment_seconds: float = 6.0, language: str = "ko"):
+        self.segment_seconds = segment_seconds
+        self.language = language
+        self.logger = logging.getLogger(__name__)
+
+    def package(self, audio_path: str, output_dir: str, chapter_titles: List[str], chapter_offsets: List[float]):
+        """output_dir에 master.m3u8, playlist.m3u8, 세그먼트, chapters.json을 생성
+
+        chapter_offsets는 병합된 오디오에서 각 챕터가 시작하는 시각(초)으로, AudioMerger.merge의 반환값입니다.
+        """
+        ffmpeg_path, _ = AudioMerger.get_ffmpeg_paths()
+        playlist_path = os.path.join(output_dir, HLSStore.PLAYLIST)
+        self.logger.info(f"Packaging HLS segments ({self.segment_seconds:g}s) to: {output_dir}")
+        try:
+            subprocess.run(
+                [
+                    ffmpeg_path, "-y", "-v", "error", "-i", audio_path,
+                    "-map", "0:a", "-c:a", "copy",
+                    "-f", "hls", "-hls_time", f"{self.segment_seconds:g}", "-hls_playlist_type", "vod",
+                    "-hls_segment_type", "mpegts", "-hls_flags", "independent_segments",
+                    "-hls_segment_filename", os.path.join(output_dir, HLSStore.SEGMENT_PATTERN),
+                    playlist_path,
+                ],
+                capture_output=True, check=True,
+            )
+        except subprocess.CalledProcessError as e:
+            raise AudioGenerationException(f"Failed to package HLS segments: {e.stderr.decode(errors='replace').strip()}")
+
+        segments = self._read_segments(playlist_path)
+        total_seconds = sum(duration for _, duration in segments)
+        with open(os.path.join(output_dir, HLSStore.CHAPTERS), "w", encoding="utf-8") as f:
+            json.dump(self._chapters(chapter_titles, chapter_offsets, total_seconds), f, ensure_ascii=False)
+        self._write_master(output_dir, segments, total_seconds)
+
+    def _chapters(self, titles: List[str], offsets: List[float], total_seconds: float) -> List[dict]:
+        # 챕터 길이는 다음 챕터 시작까지 (사이의 트랜지션 효과음 포함)
+        ends = offsets[1:] + [total_seconds]
+        return [
+            {
+                "chapter": idx,
+                "start-time": round(start, 3),
+                "duration": round(max(0.0, end - start), 3),
+                "titles": [{"language": self.language, "title": title}],
+            }
+            for idx, (title, start, end) in enumerate(zip(titles, offsets, ends), start=1)
+        ]
+
+    def _write_master(self, output_dir: str, segments: List[Tuple[str, float]], total_seconds: float):
+        # BANDWIDTH는 가장 큰 세그먼트 비트레이트, AVERAGE-BANDWIDTH는 전체 평균 (컨테이너 오버헤드 포함)
+        sizes = [os.path.getsize(os.path.join(output_dir, name)) for name, _ in segments]
+        peak = max((size * 8 / duration for size, (_, duration) in zip(sizes, segments) if duration > 0), default=0)
+        average = sum(sizes) * 8 / total_seconds if total_seconds > 0 else peak
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:6",
+            "#EXT-X-INDEPENDENT-SEGMENTS",
+            f'#EXT-X-SESSION-DATA:DATA-ID="{self.CHAPTERS_DATA_ID}",URI="{HLSStore.CHAPTERS}"',
+            f'#EXT-X-STREAM-INF:BANDWIDTH={int(peak)},AVERAGE-BANDWIDTH={int(average)},CODECS="{self.CODECS}"',
+            HLSStore.PLAYLIST,
+        ]
+        with open(os.path.join(output_dir, HLSStore.MASTER), "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    @staticmethod
+    def _read_segments(playlist_path: str) -> List[Tuple[str, float]]:
+        # (세그먼트 파일명, 길이) 목록
+        segments, duration = [], None
+        with open(playlist_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("#EXTINF:"):
+                    duration = float(line[len("#EXTINF:"):].split(",", 1)[0])
+                elif line and not line.startswith("#") and duration is not None:
+                    segments.append((line, duration))
+                    duration = None
+        if not segments:
+            raise AudioGenerationException("HLS playlist has no segments")
+        return segments
@@ -0,0 +1,366 @@
+import re
+import threading
+import uuid
+import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+from app.services.podcast_maker import PodcastMaker
+from app.storage.podcast_index import PodcastIndex
+from app.storage.job_queue import JobQueue
+from app.exceptions.podcast_exceptions import JobNotFoundException, JobQueueFullException
+from app.utils.metrics import span, COALESCED_REQUESTS, JOB_QUEUE_DEPTH
+from app.utils.quota_scheduler import PRIORITY_INTERACTIVE, request_priority
+
+class PodcastJob:
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+    def __init__(self, title: str, content: str, url: Optional[str] = None, job_id: Optional[str] = None,
+                 content_hash: Optional[str] = None, fresh: bool = False, base_job_id: Optional[str] = None,
+                 priority: int = PRIORITY_INTERACTIVE):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.title = title
+        self.content = content
+        self.content_hash = content_hash or PodcastIndex.content_hash(title, content)
+        self.url = url
+        # True이면 캐시/기존 결과를 쓰지 않고 새로 생성
+        self.fresh = fresh
+        # 업데이트 모드에서 바뀌지 않은 챕터를 가져올 이전 버전 작업
+        self.base_job_id = base_job_id
+        # API 할당량을 받는 순서 (대화형 요청이 배치 작업보다 먼저)
+        self.priority = priority
+        self.status = PodcastJob.PENDING
+        self.stage: Optional[str] = None
+        self.progress_current = 0
+        self.progress_total = 0
+        self.result_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.updated_at = self.created_at
+        self.future: Optional[Future] = None
+
+    @classmethod
+    def from_record(cls, record: dict, result_path: Optional[str] = None) -> "PodcastJob":
+        # 메모리에서 정리됐거나 재시작 전에 생성된 작업을 인덱스 기록으로 복원
+        job = cls(record["title"], "", url=record["url"], job_id=record["job_id"], content_hash=record["content_hash"])
+        job.status = record["status"]
+        job.error = record["error"]
+        job.result_path = result_path if job.status == PodcastJob.COMPLETED else None
+        job.created_at = datetime.fromtimestamp(record["created_at"])
+        job.updated_at = datetime.fromtimestamp(record["updated_at"])
+        job.future = Future()
+        if job.status == PodcastJob.COMPLETED:
+            job.future.set_result(job.result_path)
+        elif job.status == PodcastJob.FAILED:
+            job.future.set_exception(RuntimeError(job.error or "Job failed"))
+        return job
+
+    @classmethod
+    def from_queue_record(cls, record: dict) -> "PodcastJob":
+        payload = record["payload"]
+        job = cls(
+            payload["title"], payload["content"], url=payload.get("url"), job_id=record["job_id"],
+            content_hash=record["content_hash"], fresh=payload.get("fresh", False),
+            base_job_id=payload.get("base_job_id"), priority=record["priority"],
+        )
+        job.future = Future()
+        return job
+
+    def to_payload(self) -> dict:
+        # 작업 대기열에 기록해 워커 프로세스가 같은 작업을 실행하는 데 필요한 값
+        return {
+            "title": self.title,
+            "content": self.content,
+            "url": self.url,
+            "fresh": self.fresh,
+            "base_job_id": self.base_job_id,
+            "priority": self.priority,
+        }
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (PodcastJob.COMPLETED, PodcastJob.FAILED)
+
+    @property
+    def download_filename(self) -> str:
+        # 저장소 파일명은 해시이므로 내려받을 때는 제목 기반 이름을 사용
+        sanitized_title = re.sub(r'[^\w\s-]', '', self.title.strip())
+        sanitized_title = re.sub(r'\s+', '_', sanitized_title)
+        return f"{sanitized_title or 'podcast'}_podcast.mp3"
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.job_id,
+            "title": self.title,
+            "url": self.url,
+            "status": self.status,
+            "stage": self.stage,
+            "progress_current": self.progress_current,
+            "progress_total": self.progress_total,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+            "error": self.error,
+        }
+
+
+class JobManager:
+    def __init__(self, podcast_maker: PodcastMaker, max_workers: int = 4,
+                 max_pending: int = 100, retention_seconds: int = 3600,
+                 queue: Optional[JobQueue] = None, poll_interval_seconds: float = 1.0):
+        self.podcast_maker = podcast_maker
+        # PodcastMaker에 인덱스가 설정된 경우 작업 기록/결과 재사용에 같은 인덱스를 사용
+        self.index: Optional[PodcastIndex] = podcast_maker.index
+        self.max_pending = max_pending
+        self.retention = timedelta(seconds=retention_seconds)
+        # 대기열이 있으면 작업을 이 프로세스에서 실행하지 않고 공유 대기열에 넣어 워커 프로세스(app.worker)가 실행.
+        # 진행 상황과 결과는 poller 스레드가 대기열에서 읽어 메모리의 작업과 future에 반영
+        self.queue = queue
+        self.poll_interval_seconds = poll_interval_seconds
+        self.poller: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+        # 팟캐스트 생성은 블로킹 작업이므로 이벤트 루프 밖의 제한된 워커 풀에서 실행
+        self.executor = None if queue is not None else ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="podcast-job"
+        )
+        self.jobs: Dict[str, PodcastJob] = {}
+        # 같은 (제목, 본문)으로 진행 중인 작업 (content_hash -> job), 동시에 들어온 같은 요청은 이 작업을 공유
+        self.inflight: Dict[str, PodcastJob] = {}
+        self.lock = threading.Lock()
+        # 대기열이 가득 찼을 때 block=True로 제출한 쪽이 빈자리를 기다리는 데 사용
+        self.capacity = threading.Condition(self.lock)
+        self.logger = logging.getLogger(__name__)
+        # 종료된 프로세스가 실행하던 작업만 실패 처리 (같은 인덱스를 쓰는 다른 프로세스의 작업은 유지).
+        # 대기열 방식에서는 진행 중인 작업이 재시작 후에도 워커에서 계속 실행되므로 실패 처리하지 않음
+        if self.index is not None and self.queue is None:
+            interrupted = self.index.mark_interrupted()
+            if interrupted:
+                self.logger.warning(f"Marked {interrupted} interrupted jobs as failed")
+
+    def submit(self, title: str, content: str, block: bool = False, url: Optional[str] = None,
+               fresh: bool = False, update: bool = False, priority: int = PRIORITY_INTERACTIVE) -> PodcastJob:
+        # fresh=True이면 진행 중인 작업이나 완료된 결과를 재사용하지 않고 새로 생성
+        # update=True이면 같은 URL의 최근 완료 작업을 이전 버전으로 삼아 원문이 바뀐 챕터만 다시 생성
+        # 같은 문서라도 TTS 프로바이더/음성/모델이 다르면 다른 결과 (AudioMaker의 청크 캐시 키와 같은 기준)
+        voice = self.podcast_maker.audio_maker.provider.cache_key("")
+        content_hash = PodcastIndex.content_hash(title, content, voice=voice)
+        if not fresh:
+            with self.lock:
+                job = self._join_inflight(content_hash, url)
+            if job is not None:
+                return job
+            if self.queue is not None:
+                # 다른 프로세스가 같은 내용으로 넣은 작업이 대기열에 있으면 그 작업을 함께 기다림
+                record = self.queue.find_active(content_hash)
+                if record is not None:
+                    return self._attach_queued(record, url)
+
+        if self.index is not None:
+            self.index.maybe_gc()
+            # 같은 제목/본문으로 이미 생성된 결과가 있으면 다시 생성하지 않고 기존 작업을 반환
+            record = None if fresh else self.index.find_completed(content_hash=content_hash)
+            if record is not None:
+                if url and not record["url"]:
+                    self.index.update_job(record["job_id"], url=url)
+                    record["url"] = url
+                job = PodcastJob.from_record(record, self.index.audio_path(record))
+                with self.lock:
+                    self.jobs[job.job_id] = job
+                self.logger.info(f"Reusing completed job {job.job_id} for: {title}")
+                return job
+
+        base_job_id = None
+        if update and url and self.index is not None:
+            base = self.index.find_completed(url=url)
+            base_job_id = base["job_id"] if base is not None else None
+
+        with self.lock:
+            self._prune_finished_jobs()
+            while True:
+                # 인덱스 조회나 대기열 대기 중에 같은 작업이 먼저 제출됐을 수 있으므로 다시 확인
+                job = None if fresh else self._join_inflight(content_hash, url)
+                if job is not None:
+                    return job
+                pending = self._count_pending()
+                if pending < self.max_pending:
+                    break
+                if not block:
+                    raise JobQueueFullException(f"Too many pending jobs ({pending})")
+                # 대기열 방식에서는 다른 프로세스의 작업 완료가 통지되지 않으므로 주기적으로 다시 확인
+                self.capacity.wait(self.poll_interval_seconds if self.queue is not None else None)
+
+            job = PodcastJob(
+                title, content, url=url, content_hash=content_hash, fresh=fresh, base_job_id=base_job_id,
+                priority=priority,
+            )
+            if self.queue is not None:
+                job.future = Future()
+            self.jobs[job.job_id] = job
+            self.inflight[content_hash] = job
+
+        if self.index is not None:
+            self.index.create_job(job.job_id, title, content_hash, url=job.url)
+
+        self.logger.info(f"Job {job.job_id} submitted for: {title}")
+        if self.queue is None:
+            job.future = self.executor.submit(self._run_job, job)
+            return job
+
+        try:
+            self.queue.enqueue(job.job_id, content_hash, job.to_payload(), priority=job.priority)
+        except Exception as e:
+            self._update(job, status=PodcastJob.FAILED, error=f"Failed to enqueue job: {str(e)}")
+            job.future.set_exception(RuntimeError(job.error))
+            if self.index is not None:
+                self.index.update_job(job.job_id, status=job.status, error=job.error)
+            raise
+        self._start_poller()
+        return job
+
+    def get_job(self, job_id: str) -> PodcastJob:
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None and self.index is not None:
+            record = self.index.get(job_id)
+            if record is not None:
+                job = PodcastJob.from_record(record, self.index.audio_path(record))
+        if job is None:
+            raise JobNotFoundException(f"Job not found: {job_id}")
+        return job
+
+    def find_job_by_url(self, url: str) -> PodcastJob:
+        # 해당 URL로 만든 가장 최근 작업 (완료된 작업 우선)
+        record = None
+        if self.index is not None:
+            record = self.index.find_completed(url=url) or self.index.find_latest(url)
+        if record is None:
+            raise JobNotFoundException(f"No podcast found for URL: {url}")
+        with self.lock:
+            job = self.jobs.get(record["job_id"])
+        return job or PodcastJob.from_record(record, self.index.audio_path(record))
+
+    def shutdown(self, wait: bool = False):
+        self.stop_event.set()
+        if self.executor is not None:
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    def _run_job(self, job: PodcastJob) -> str:
+        self._update(job, status=PodcastJob.RUNNING)
+        try:
+            with span("podcast", job_id=job.job_id, characters=len(job.content)), request_priority(job.priority):
+                result_path = self.podcast_maker.create_podcast(
+                    job.title,
+                    job.content,
+                    progress_callback=lambda stage, current, total: self._update(
+                        job, stage=stage, progress_current=current, progress_total=total
+                    ),
+                    job_id=job.job_id,
+                    fresh=job.fresh,
+                    base_job_id=job.base_job_id,
+                )
+            self._update(job, status=PodcastJob.COMPLETED, result_path=result_path)
+            self.logger.info(f"Job {job.job_id} completed: {result_path}")
+            return result_path
+        except Exception as e:
+            self._update(job, status=PodcastJob.FAILED, error=str(e))
+            self.logger.error(f"Job {job.job_id} failed: {str(e)}")
+            raise
+
+    def _update(self, job: PodcastJob, **fields):
+        with self.lock:
+            for key, value in fields.items():
+                setattr(job, key, value)
+            job.updated_at = datetime.now()
+            if job.is_finished:
+                if self.inflight.get(job.content_hash) is job:
+                    del self.inflight[job.content_hash]
+                self.capacity.notify_all()
+
+        # 진행률은 메모리에만 두고 상태 전환만 인덱스에 기록 (대기열 방식에서는 워커 프로세스가 기록)
+        if self.index is not None and "status" in fields and self.queue is None:
+            try:
+                self.index.update_job(job.job_id, status=job.status, error=job.error, url=job.url)
+            except Exception as e:
+                self.logger.warning(f"Failed to record job {job.job_id} status: {str(e)}")
+
+    def _join_inflight(self, content_hash: str, url: Optional[str]) -> Optional[PodcastJob]:
+        job = self.inflight.get(content_hash)
+        if job is not None:
+            if url and not job.url:
+                # URL 조회(find_job_by_url)로도 찾을 수 있도록 기록 (인덱스에는 다음 상태 변경 때 반영)
+                job.url = url
+            COALESCED_REQUESTS.inc(kind="job")
+            self.logger.info(f"Attached to in-flight job {job.job_id} for: {job.title}")
+        return job
+
+    def _attach_queued(self, record: dict, url: Optional[str]) -> PodcastJob:
+        with self.lock:
+            job = self.jobs.get(record["job_id"])
+            if job is None:
+                job = PodcastJob.from_queue_record(record)
+                self.jobs[job.job_id] = job
+                self.inflight.setdefault(job.content_hash, job)
+        if url and not job.url:
+            job.url = url
+        self._apply_queue_record(job, record)
+        COALESCED_REQUESTS.inc(kind="job")
+        self.logger.info(f"Attached to queued job {job.job_id} for: {job.title}")
+        self._start_poller()
+        return job
+
+    def _start_poller(self):
+        with self.lock:
+            if self.poller is not None:
+                return
+            self.poller = threading.Thread(target=self._poll_queue, name="job-queue-poller", daemon=True)
+        self.poller.start()
+
+    def _poll_queue(self):
+        while not self.stop_event.wait(self.poll_interval_seconds):
+            try:
+                with self.lock:
+                    jobs = [job for job in self.jobs.values() if not job.is_finished]
+                records = self.queue.get_many(job.job_id for job in jobs)
+                for job in jobs:
+                    record = records.get(job.job_id)
+                    if record is not None:
+                        self._apply_queue_record(job, record)
+                counts = self.queue.count_by_status()
+                for status in (JobQueue.PENDING, JobQueue.RUNNING, JobQueue.COMPLETED, JobQueue.FAILED):
+                    JOB_QUEUE_DEPTH.set(counts.get(status, 0), status=status)
+            except Exception as e:
+                self.logger.warning(f"Failed to poll job queue: {str(e)}")
+
+    def _apply_queue_record(self, job: PodcastJob, record: dict):
+        # 워커가 대기열에 기록한 상태/진행률을 반영하고, 끝난 작업은 future를 완료
+        fields = {
+            key: record[key]
+            for key in ("status", "stage", "progress_current", "progress_total", "error", "result_path")
+            if record[key] != getattr(job, key)
+        }
+        if fields:
+            self._update(job, **fields)
+        if job.future.done():
+            return
+        if job.status == PodcastJob.COMPLETED:
+            job.future.set_result(job.result_path)
+        elif job.status == PodcastJob.FAILED:
+            job.future.set_exception(RuntimeError(job.error or "Job failed"))
+
+    def _count_pending(self) -> int:
+        if self.queue is not None:
+            # 다른 프로세스가 넣은 작업까지 포함한 대기열 전체 기준
+            return self.queue.count_active()
+        return sum(1 for job in self.jobs.values() if not job.is_finished)
+
+    def _prune_finished_jobs(self):
+        # 보존 기간이 지난 완료/실패 작업은 메모리에서 제거
+        expire_before = datetime.now() - self.retention
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.is_finished and job.updated_at < expire_before
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
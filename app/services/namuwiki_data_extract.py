@@ -1,19 +1,75 @@
 import re
-from app.exceptions.podcast_exceptions import ContentProcessingException
+from typing import Iterable, Iterator, List, Union
+from app.exceptions.podcast_exceptions import ContentProcessingException, PodcastException
+from app.utils.metrics import span
 
 class TextCleaner:
+    """나무위키 본문을 빈 줄로 구분된 문단 단위로 정리
+
+    문자열 전체에 대해 아래 치환을 차례로 적용합니다 (줄 단위 파이썬 반복 없이 미리 컴파일한 정규식만 사용).
+    1. 폭 없는 공백 제거
+    2. 각주/편집 표시만 있는 줄은 줄바꿈까지, 나머지 표시는 앞의 공백과 함께 제거
+    3. 탭/nbsp 등 특수 공백과 연속 공백을 공백 하나로, 줄 앞뒤 공백 제거
+    4. 문단 제목 블록("2.1." / "초기 반응")을 "2.1. 초기 반응" 한 줄의 독립된 블록으로 분리
+    5. 문장이 끝나지 않은 줄(HTML 인라인 요소 경계에서 잘린 줄)을 다음 줄과 이어 붙임
+    """
+    # 나무위키 각주([1], [a], [주 1], [*])와 문단 편집 링크([편집]) 표시
+    MARKER_PATTERN = r'\[(?:편집|\d{1,4}|[A-Za-z]|\*|주\s?\d{1,4}|각주\s?\d{1,4})\]'
+    ZERO_WIDTH_CHARS = ("\u200b", "\ufeff")
+    # 표시만 있는 줄 (줄바꿈까지 제거해 문단이 나뉘지 않도록)과 본문 중간의 표시 (앞 공백 포함)
+    MARKER_LINE_REGEX = re.compile(rf'^[^\S\n]*(?:{MARKER_PATTERN}[^\S\n]*)+(?:\n|$)', re.MULTILINE)
+    MARKER_REGEX = re.compile(rf'[^\S\n]*{MARKER_PATTERN}')
+    # 줄바꿈을 제외한 연속 공백과 탭/nbsp 등 특수 공백 (단어 사이의 공백 하나는 건드리지 않음)
+    SPACE_REGEX = re.compile(r' [^\S\n]+|[^\S\n ][^\S\n]*')
+    # 공백 정리 후 줄 앞뒤에 남은 공백
+    LINE_EDGE_SPACE_REGEX = re.compile(r' \n ?|\n ')
+    # 빈 줄로 구분된 본문 블록
+    BLOCK_SEPARATOR_REGEX = re.compile(r'\n\n+')
+    # 블록 첫 줄(본문 맨 앞이나 빈 줄 다음 줄)의 문단 제목 번호와 다음 줄의 제목
+    HEADING_REGEX = re.compile(r'^(?<![^\n]\n)(\d+(?:\.\d+)*\.)\n([^\n]+)(?:\n|$)', re.MULTILINE)
+    # 문장 끝 문자와 그 뒤에 올 수 있는 닫는 따옴표/괄호 ("다.", "요?", "…", "다.”")
+    SENTENCE_END = r'[.!?…。！？]'
+    CLOSING_MARK = r'["\'”’)\]」』]'
+    # 이어 붙일 줄바꿈: 문장 끝이나 빈 줄 앞뒤가 아닌 줄바꿈
+    LINE_JOIN_REGEX = re.compile(rf'\n(?<!{SENTENCE_END}\n)(?<!{SENTENCE_END}{CLOSING_MARK}\n)(?<!\n\n)(?!\n)')
+
     @staticmethod
-    def clean_text(content: str) -> str:
+    def clean_text(content: Union[str, Iterable[str]]) -> str:
+        # 문자열 전체 또는 스크래퍼가 내보내는 본문 블록 iterator를 받아 문단("\n\n") 단위로 정리
         try:
-            # 불필요한 공백 제거
-            content = re.sub(r'\s+', ' ', content)
-            
-            # 특수문자 및 참조 링크 제거
-            content = re.sub(r'\[\d+\]', '', content)
-            
-            # 빈 줄 제거
-            content = '\n'.join(line.strip() for line in content.split('\n') if line.strip())
-            
-            return content.strip()
+            if isinstance(content, str):
+                with span("clean", input_characters=len(content)) as clean_span:
+                    content = "\n\n".join(TextCleaner._clean(content))
+                    clean_span.set(characters=len(content))
+                    return content
+            with span("clean", streaming=True) as clean_span:
+                content = "\n\n".join(TextCleaner.clean_blocks(content))
+                clean_span.set(characters=len(content))
+                return content
+        except PodcastException:
+            raise
         except Exception as e:
             raise ContentProcessingException(f"Failed to clean text: {str(e)}")
+
+    @staticmethod
+    def clean_blocks(blocks: Iterable[str]) -> Iterator[str]:
+        # 스크래퍼가 내보내는 본문 블록을 하나씩 정리 (블록이 도착하는 대로 처리되도록 generator로 동작)
+        for block in blocks:
+            yield from TextCleaner._clean(block)
+
+    @staticmethod
+    def _clean(text: str) -> List[str]:
+        for char in TextCleaner.ZERO_WIDTH_CHARS:
+            if char in text:
+                text = text.replace(char, "")
+        text = TextCleaner.MARKER_LINE_REGEX.sub("", text)
+        text = TextCleaner.MARKER_REGEX.sub("", text)
+        text = TextCleaner.SPACE_REGEX.sub(" ", text)
+        text = TextCleaner.LINE_EDGE_SPACE_REGEX.sub("\n", text).strip()
+        text = TextCleaner.HEADING_REGEX.sub(TextCleaner._replace_heading, text)
+        text = TextCleaner.LINE_JOIN_REGEX.sub(" ", text)
+        return [block for block in (block.strip() for block in TextCleaner.BLOCK_SEPARATOR_REGEX.split(text)) if block]
+
+    @staticmethod
+    def _replace_heading(match: "re.Match[str]") -> str:
+        return f"{match[1]} {match[2]}\n\n"
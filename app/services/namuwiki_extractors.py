@@ -0,0 +1,206 @@
+import logging
+from bs4 import BeautifulSoup, SoupStrainer, Tag
+from typing import Iterator, List, Tuple
+
+# 나무위키 본문 구조에 사용되는 클래스
+CONTENT_CLASS = 'ndDq6gtT jDOGykqY'
+BLOCK_CLASSES = ['c0JwjYul +UZZK0Af', 'cPIcBa-P _1qJ2Vzes']
+AD_CLASS = 'yzOgysK4'
+
+logger = logging.getLogger(__name__)
+
+
+def _join_contents(contents: List[str]) -> str:
+    if not contents:
+        raise ValueError("Content extraction failed")
+    # 모든 콘텐츠를 하나의 문자열로 결합
+    return '\n\n'.join(contents)
+
+
+class HtmlParserExtractor:
+    """html.parser로 전체 문서 트리를 만드는 기본 추출기"""
+    name = "html.parser"
+    parser = "html.parser"
+
+    def extract(self, html: str) -> Tuple[str, str]:
+        title, blocks = self.iter_blocks(html)
+        return title, _join_contents(list(blocks))
+
+    def iter_blocks(self, html: str) -> Tuple[str, Iterator[str]]:
+        return self._iter_blocks_from_soups(BeautifulSoup(html, self.parser), None)
+
+    def _iter_blocks_from_soups(self, title_soup, content_soup) -> Tuple[str, Iterator[str]]:
+        # 제목과 본문 블록 목록은 바로 찾고, 블록별 텍스트는 소비하는 쪽에서 하나씩 꺼내 감
+        content_soup = content_soup or title_soup
+
+        # og:title 메타 태그에서 제목 추출
+        title_meta = title_soup.find('meta', property='og:title')
+        if not title_meta:
+            raise ValueError("Title meta tag not found")
+        title = title_meta['content'].strip()
+
+        # 본문 내용 추출
+        content_div = content_soup.find('div', class_=CONTENT_CLASS)
+        if not content_div:
+            raise ValueError("Main content div not found")
+
+        # 두 클래스에 해당하는 모든 div 찾기
+        content_divs = content_div.find_all('div', class_=BLOCK_CLASSES)
+        if not content_divs:
+            raise ValueError("Content divs not found")
+
+        return title, self._iter_div_texts(content_divs)
+
+    @staticmethod
+    def _iter_div_texts(content_divs) -> Iterator[str]:
+        # 각 div에서 콘텐츠 추출
+        for div in content_divs:
+            if not isinstance(div, Tag):
+                continue
+
+            # 광고 제거
+            for ad in div.find_all('div', class_=AD_CLASS):
+                ad.decompose()
+
+            try:
+                div_content = div.get_text(separator='\n', strip=True)
+                if div_content:
+                    yield div_content
+            except AttributeError:
+                continue
+
+
+class StrainerExtractor(HtmlParserExtractor):
+    """SoupStrainer로 제목 메타 태그와 본문 서브트리만 트리로 구성하는 추출기"""
+    name = "strainer"
+
+    def __init__(self):
+        try:
+            import lxml  # noqa: F401
+            self.parser = "lxml"
+        except ImportError:
+            self.parser = "html.parser"
+
+    def iter_blocks(self, html: str) -> Tuple[str, Iterator[str]]:
+        title_soup = BeautifulSoup(html, self.parser, parse_only=SoupStrainer('meta', property='og:title'))
+        content_soup = BeautifulSoup(html, self.parser, parse_only=SoupStrainer('div', class_=self._is_content_class))
+        return self._iter_blocks_from_soups(title_soup, content_soup)
+
+    @staticmethod
+    def _is_content_class(value) -> bool:
+        # SoupStrainer는 class 속성을 원문 그대로 넘기므로 find와 같게 공백을 정규화해 비교
+        return value is not None and " ".join(value.split()) == CONTENT_CLASS
+
+
+class LxmlExtractor:
+    """lxml pull parser로 BeautifulSoup 없이 추출하는 추출기
+
+    HTML을 조각 단위로 파서에 넣으면서 본문 블록 div가 닫히는 대로 텍스트를 내보내므로,
+    문서 전체를 파싱하기 전에 첫 블록부터 정리를 시작할 수 있습니다.
+    """
+    name = "lxml"
+
+    # BeautifulSoup의 get_text처럼 스크립트/스타일 내용은 제외
+    SKIP_TAGS = {"script", "style", "template"}
+    # 파서에 한 번에 넣는 HTML 글자 수
+    FEED_CHARS = 64 * 1024
+
+    def __init__(self):
+        from lxml import etree
+        self.etree = etree
+
+    def extract(self, html: str) -> Tuple[str, str]:
+        title, blocks = self.iter_blocks(html)
+        return title, _join_contents(list(blocks))
+
+    def iter_blocks(self, html: str) -> Tuple[str, Iterator[str]]:
+        events = self._iter_events(html)
+
+        # og:title 메타 태그는 head에 있으므로 본문을 파싱하기 전에 찾음
+        for event, element in events:
+            if element.tag == "meta" and element.get("property") == "og:title" and element.get("content") is not None:
+                title = element.get("content").strip()
+                break
+        else:
+            raise ValueError("Title meta tag not found")
+
+        return title, self._iter_block_texts(events)
+
+    def _iter_events(self, html: str) -> Iterator[tuple]:
+        parser = self.etree.HTMLPullParser(events=("start", "end"), tag=("meta", "div"))
+        for start in range(0, len(html), self.FEED_CHARS):
+            parser.feed(html[start:start + self.FEED_CHARS])
+            yield from parser.read_events()
+        parser.close()
+        yield from parser.read_events()
+
+    def _iter_block_texts(self, events: Iterator[tuple]) -> Iterator[str]:
+        content_div = None
+        found_blocks = False
+        # 시작 순서대로의 [블록 div, 닫힘 여부] (블록 안에 블록이 있어도 문서 순서대로 내보냄)
+        pending = []
+        for event, element in events:
+            if element.tag != "div":
+                continue
+            if content_div is None:
+                if event == "start" and self._class_name(element) == CONTENT_CLASS:
+                    content_div = element
+                continue
+            if event == "start":
+                if self._class_name(element) in BLOCK_CLASSES:
+                    pending.append([element, False])
+                    found_blocks = True
+                continue
+            if element is content_div:
+                break
+            for entry in pending:
+                if entry[0] is element:
+                    entry[1] = True
+            while pending and pending[0][1]:
+                block = pending.pop(0)[0]
+                texts = [text.strip() for text in self._iter_text(block)]
+                div_content = '\n'.join(text for text in texts if text)
+                if not pending:
+                    # 바깥 블록이 없으면 다 읽은 서브트리는 메모리에서 해제
+                    block.clear(keep_tail=True)
+                if div_content:
+                    yield div_content
+
+        if content_div is None:
+            raise ValueError("Main content div not found")
+        if not found_blocks:
+            raise ValueError("Content divs not found")
+
+    @staticmethod
+    def _class_name(element) -> str:
+        return " ".join(element.get("class", "").split())
+
+    def _iter_text(self, element) -> Iterator[str]:
+        if element.text:
+            yield element.text
+        for child in element:
+            # 주석/처리 명령 노드는 tag가 문자열이 아님. 건너뛰는 태그(template 안의 요소 포함)와 광고 div는
+            # 내용만 건너뛰고 tail 텍스트는 유지
+            if isinstance(child.tag, str) and child.tag not in self.SKIP_TAGS and not (
+                child.tag == "div" and AD_CLASS in child.get("class", "").split()
+            ):
+                yield from self._iter_text(child)
+            if child.tail:
+                yield child.tail
+
+
+EXTRACTORS = {
+    HtmlParserExtractor.name: HtmlParserExtractor,
+    StrainerExtractor.name: StrainerExtractor,
+    LxmlExtractor.name: LxmlExtractor,
+}
+
+
+def get_extractor(name: str):
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown extraction backend: {name}")
+    try:
+        return EXTRACTORS[name]()
+    except ImportError:
+        logger.warning(f"Extraction backend '{name}' is not available, falling back to html.parser")
+        return HtmlParserExtractor()
@@ -1,9 +1,36 @@
+import threading
 import requests
-from bs4 import BeautifulSoup, Tag
-from typing import Tuple, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit, urlunsplit, quote, unquote, parse_qsl, urlencode
+from typing import Iterator, Tuple, Optional
+from app.services.namuwiki_extractors import HtmlParserExtractor
+from app.storage.scrape_cache import ScrapeCache
+from app.utils.rate_limiter import HostRateLimiter
+from app.utils.metrics import span
+from app.utils.single_flight import SingleFlight
 from app.exceptions.podcast_exceptions import InvalidURLException, ScrapingException
 
 class NamuWikiScraper:
+    # (connect, read) 타임아웃 (초)
+    TIMEOUT = (5, 30)
+    POOL_MAXSIZE = 20
+
+    # HTML 추출 백엔드 (namuwiki_extractors.get_extractor로 교체 가능)
+    extractor = HtmlParserExtractor()
+
+    # 스크래핑 결과 캐시 (None이면 캐시 미사용)
+    cache: Optional[ScrapeCache] = None
+
+    # 호스트별 요청 간격 제한 (None이면 제한 없음)
+    rate_limiter: Optional[HostRateLimiter] = None
+
+    # 같은 문서를 동시에 여러 번 요청하면 한 번만 가져와 결과를 공유
+    _scrape_flight = SingleFlight("scrape")
+
+    _session: Optional[requests.Session] = None
+    _session_lock = threading.Lock()
+
     @staticmethod
     def validate_url(url: str) -> bool:
         if not url.startswith("https://namu.wiki/"):
@@ -11,59 +38,100 @@ class NamuWikiScraper:
         return True
 
     @staticmethod
-    def scrape_content(url: str) -> Tuple[str, str]:
+    def normalize_url(url: str) -> str:
+        # 같은 문서가 인코딩/대소문자/fragment 차이로 다른 키가 되지 않도록 정규화
+        parts = urlsplit(url.strip())
+        path = quote(unquote(parts.path), safe="/:()'!*,;=@+$")
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+        return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+    @classmethod
+    def get_session(cls) -> requests.Session:
+        # 커넥션 풀을 재사용하도록 프로세스 전체에서 하나의 세션을 공유
+        with cls._session_lock:
+            if cls._session is None:
+                session = requests.Session()
+                retry = Retry(total=2, backoff_factor=0.5, status_forcelist=[502, 503, 504], allowed_methods=["GET"])
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=cls.POOL_MAXSIZE, max_retries=retry)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._session = session
+            return cls._session
+
+    @classmethod
+    def scrape_content(cls, url: str) -> Tuple[str, str]:
+        return cls._scrape_flight.do(cls.normalize_url(url), cls._scrape_joined, url)
+
+    @classmethod
+    def _scrape_joined(cls, url: str) -> Tuple[str, str]:
+        title, blocks = cls.scrape_blocks(url)
+        return title, "\n\n".join(blocks)
+
+    @classmethod
+    def scrape_blocks(cls, url: str) -> Tuple[str, Iterator[str]]:
+        # 요청과 파싱은 바로 수행하고, 본문 블록은 소비하는 쪽(TextCleaner.clean_blocks)에서 하나씩 추출
+        with span("scrape") as scrape_span:
+            return cls._scrape_blocks(url, scrape_span)
+
+    @classmethod
+    def _scrape_blocks(cls, url: str, scrape_span) -> Tuple[str, Iterator[str]]:
         try:
-            # HTTP 요청
-            response = requests.get(url)
+            normalized_url = cls.normalize_url(url)
+            cached = cls.cache.get(normalized_url) if cls.cache else None
+            if cached and cls.cache.is_fresh(cached):
+                scrape_span.set(cache="hit", characters=len(cached["content"]))
+                return cached["title"], iter(cached["content"].split("\n\n"))
+
+            # 캐시가 만료되었으면 ETag/Last-Modified로 조건부 요청
+            headers = {}
+            if cached:
+                if cached.get("etag"):
+                    headers["If-None-Match"] = cached["etag"]
+                if cached.get("last_modified"):
+                    headers["If-Modified-Since"] = cached["last_modified"]
+
+            # HTTP 요청 (캐시 적중 시에는 rate limit을 적용하지 않음)
+            if cls.rate_limiter:
+                cls.rate_limiter.wait(url)
+            response = cls.get_session().get(url, headers=headers, timeout=cls.TIMEOUT)
+            if response.status_code == 304 and cached:
+                cls.cache.touch(cached)
+                scrape_span.set(cache="revalidated", characters=len(cached["content"]))
+                return cached["title"], iter(cached["content"].split("\n\n"))
             response.raise_for_status()
-            
-            # BeautifulSoup 객체 생성
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # og:title 메타 태그에서 제목 추출
-            title_meta = soup.find('meta', property='og:title')
-            if not title_meta:
-                raise ValueError("Title meta tag not found")
-            title = title_meta['content'].strip()
-
-            # 본문 내용 추출
-            content_div = soup.find('div', class_='ndDq6gtT jDOGykqY')
-            if not content_div:
-                raise ValueError("Main content div not found")
-            
-            # 두 클래스에 해당하는 모든 div 찾기
-            content_divs = content_div.find_all('div', class_=['c0JwjYul +UZZK0Af', 'cPIcBa-P _1qJ2Vzes'])
-            if not content_divs:
-                raise ValueError("Content divs not found")
-            
-            # 각 div의 내용을 저장할 리스트
-            contents = []
-            
-            # 각 div에서 콘텐츠 추출
-            for div in content_divs:
-                if not isinstance(div, Tag):
-                    continue
-                
-                # 광고 제거
-                for ad in div.find_all('div', class_='yzOgysK4'):
-                    ad.decompose()
-                
-                try:
-                    div_content = div.get_text(separator='\n', strip=True)
-                    if div_content:
-                        contents.append(div_content)
-                except AttributeError:
-                    continue
-            
-            if not contents:
-                raise ValueError("Content extraction failed")
-            
-            # 모든 콘텐츠를 하나의 문자열로 결합
-            final_content = '\n\n'.join(contents)
-            
-            return title, str(final_content)
-            
+
+            title, blocks = cls.extractor.iter_blocks(response.text)
+            scrape_span.set(cache="miss", bytes=len(response.content))
+            return title, cls._stream_blocks(normalized_url, title, blocks, response)
+
         except requests.RequestException as e:
             raise ScrapingException(f"Failed to fetch content: {str(e)}")
         except Exception as e:
             raise ScrapingException(f"Failed to scrape content: {str(e)}")
+
+    @classmethod
+    def _stream_blocks(cls, normalized_url: str, title: str, blocks: Iterator[str],
+                       response: requests.Response) -> Iterator[str]:
+        contents = []
+        try:
+            for block in blocks:
+                contents.append(block)
+                yield block
+        except Exception as e:
+            raise ScrapingException(f"Failed to scrape content: {str(e)}")
+        if not contents:
+            raise ScrapingException("Failed to scrape content: Content extraction failed")
+
+        # 모든 블록을 내보낸 뒤에 캐시에 저장
+        if cls.cache:
+            cls.cache.put(
+                normalized_url,
+                title,
+                "\n\n".join(contents),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+
+    @classmethod
+    def extract_content(cls, html: str) -> Tuple[str, str]:
+        return cls.extractor.extract(html)
@@ -1,114 +1,375 @@
 import os
-from datetime import datetime
 import re
+import time
 import logging
-from typing import List
+import threading
+import contextvars
+import uuid
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Callable, Iterator, List, Optional, Tuple
 from app.services.script_maker import ScriptMaker
 from app.services.audio_maker import AudioMaker
-from app.exceptions.podcast_exceptions import ContentProcessingException, AudioGenerationException
+from app.services.audio_merger import AudioMerger
+from app.services.hls_packager import HLSPackager
+from app.storage.podcast_index import PodcastIndex
+from app.storage.checkpoint_store import CheckpointStore
+from app.utils.metrics import span, BYTES_WRITTEN
+from app.exceptions.podcast_exceptions import ContentProcessingException
 
 class PodcastMaker:
-    def __init__(self, script_maker: ScriptMaker, audio_maker: AudioMaker):
+    def __init__(self, script_maker: ScriptMaker, audio_maker: AudioMaker, max_parallel_chapters: Optional[int] = None,
+                 audio_merger: Optional[AudioMerger] = None, index: Optional[PodcastIndex] = None,
+                 checkpoints: Optional[CheckpointStore] = None, merge_executor: Optional[Executor] = None,
+                 hls_packager: Optional[HLSPackager] = None, podcast_dir: str = "generated/podcasts",
+                 script_dir: str = "generated/script"):
         self.script_maker = script_maker
         self.audio_maker = audio_maker
-        self.podcast_dir = "generated/podcasts"
-        self.script_dir = "generated/script"  # 최종 스크립트 저장 폴더
+        self.audio_merger = audio_merger or AudioMerger()
+        # 인덱스가 있으면 결과물을 content-addressed 저장소에 보관하고 메타데이터를 기록
+        self.index = index
+        # 체크포인트가 있으면 목차/챕터 스크립트/챕터 오디오를 저장해 두고 재시도 시 이어서 진행
+        self.checkpoints = checkpoints
+        # CPU를 쓰는 병합/인코딩을 실행할 프로세스 풀 (None이면 작업 스레드에서 직접 실행).
+        # API 호출 위주인 스크립트/TTS 단계는 스레드에서, 병합은 GIL과 무관하게 별도 프로세스에서 진행
+        self.merge_executor = merge_executor
+        # 병합된 팟캐스트를 HLS 세그먼트로 나눠 인덱스의 HLS 저장소에 기록 (None이면 MP3만 제공)
+        self.hls_packager = hls_packager
+        # 챕터 파이프라인(스크립트 -> TTS) 동시 실행 수. 기본값은 두 단계의 동시성 한도 합으로,
+        # 스크립트 생성과 TTS가 서로를 기다리지 않고 겹쳐서 진행될 수 있도록 함
+        self.max_parallel_chapters = max_parallel_chapters or (
+            script_maker.max_concurrency + audio_maker.max_concurrency
+        )
+        self.podcast_dir = podcast_dir
+        self.script_dir = script_dir  # 최종 스크립트 저장 폴더
         # 팟캐스트와 스크립트 저장 디렉토리 생성
         os.makedirs(self.podcast_dir, exist_ok=True)
         os.makedirs(self.script_dir, exist_ok=True)
         self.logger = logging.getLogger(__name__)
 
-    def create_podcast(self, title: str, content: str) -> str:
+    def create_podcast(self, title: str, content: str,
+                       progress_callback: Optional[Callable[[str, int, int], None]] = None,
+                       job_id: Optional[str] = None, fresh: bool = False,
+                       base_job_id: Optional[str] = None, attempt: int = 1) -> str:
+        """base_job_id가 주어지면 (업데이트 모드) 그 작업의 챕터 구성으로 목차를 다시 만들고,
+        원문이 바뀌지 않은 챕터는 이전 스크립트와 오디오를 그대로 재사용합니다.
+        attempt는 같은 작업의 몇 번째 실행인지로, 이전 시도의 체크포인트를 가져가 이어서 진행하는 데 쓰입니다."""
         chapter_audio_files = []
         cleaned_title = re.sub(r'[^\w\s-]', '', title.strip())
         cleaned_title = re.sub(r'\s+', '_', cleaned_title)
+        # 같은 제목의 요청이 동시에 들어와도 파일명이 겹치지 않도록 작업별 고유 ID 사용
+        run_id = job_id or uuid.uuid4().hex
+        store_result = self.index is not None and job_id is not None
+        checkpoint_key = None
+        if self.checkpoints is not None:
+            self.checkpoints.maybe_prune()
+            # 실행별 체크포인트를 사용 (새로 생성하는 요청은 이전 실행의 체크포인트를 이어 쓰지 않음)
+            checkpoint_key = self.checkpoints.claim(
+                self.checkpoints.make_key(title, content), run_id, resume=not fresh, attempt=attempt
+            )
+        previous_chapters = self.index.get_chapters(base_job_id) if self.index is not None and base_job_id else []
+        reused_audio_paths = set()
+        timings = {}
+        stage_started = time.monotonic()
         try:
             self.logger.info(f"Starting podcast creation for: {title}")
             
-            # 1. 스크립트 생성 및 파일 저장
-            self.logger.info("Generating scripts for chapters...")
-            chapter_scripts = self.script_maker.generate_script(title, content)
-            if not chapter_scripts:
-                self.logger.error("No scripts were generated")
-                raise ContentProcessingException("No scripts generated")
-            
+            # 1. 목차 생성
+            self.logger.info("Generating table of contents...")
+            self._report_progress(progress_callback, "script", 0, 1)
+            chapters = self.checkpoints.load_toc(checkpoint_key) if checkpoint_key else None
+            if chapters:
+                self.logger.info(f"Resuming from checkpoint: {checkpoint_key}")
+            else:
+                chapters = None
+                if previous_chapters and not fresh:
+                    chapters = self.script_maker.rebuild_toc(title, content, previous_chapters)
+                if not chapters:
+                    chapters = self.script_maker.generate_toc(title, content, fresh=fresh)
+                if chapters and checkpoint_key:
+                    self.checkpoints.save_toc(checkpoint_key, chapters)
+            timings["toc_seconds"] = round(time.monotonic() - stage_started, 3)
+            if not chapters:
+                self.logger.error("No chapters were generated")
+                raise ContentProcessingException("No chapters generated")
+            self._report_progress(progress_callback, "script", 1, 1)
+
+            # 2. 챕터별 파이프라인: 각 챕터의 스크립트가 완성되는 즉시 해당 챕터의 TTS를 시작
+            total_chapters = len(chapters)
+            voice = self.audio_maker.provider.cache_key("")
+            source_hashes = [
+                ScriptMaker.chapter_source_hash(chapter, idx, total_chapters, voice=voice)
+                for idx, chapter in enumerate(chapters, start=1)
+            ]
+            # 원문(과 첫/마지막 여부, 음성 설정)이 이전 버전과 같은 챕터는 다시 만들지 않음
+            reusable = {chapter["source_hash"]: chapter for chapter in previous_chapters if chapter["available"]}
+            reused = {
+                idx: reusable[source_hash]
+                for idx, source_hash in enumerate(source_hashes, start=1)
+                if source_hash in reusable and not fresh
+            }
+            reused_audio_paths.update(chapter["audio_path"] for chapter in reused.values())
+            if previous_chapters:
+                timings["reused_chapters"] = len(reused)
+                self.logger.info(f"Reusing {len(reused)}/{total_chapters} chapters from job {base_job_id}")
+            self.logger.info(f"Generating scripts and audio for {total_chapters} chapters...")
+            self._report_progress(progress_callback, "tts", 0, total_chapters)
+            chapter_results = self._run_chapter_pipeline(
+                title, chapters, chapter_audio_files, progress_callback, checkpoint_key, fresh, reused
+            )
+            chapter_scripts = [script for script, _ in chapter_results]
+            chapter_audio_files[:] = [audio_path for _, audio_path in chapter_results]
+            timings["chapters_seconds"] = round(time.monotonic() - stage_started - timings["toc_seconds"], 3)
+
             final_script_text = "\n\n".join(chapter_scripts)
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            final_script_filename = f"{cleaned_title}_{timestamp}_script.txt"
-            final_script_filepath = os.path.join(self.script_dir, final_script_filename)
-            self.logger.info(f"Saving final script to {final_script_filepath}")
-            with open(final_script_filepath, "w", encoding="utf-8") as f:
-                f.write(final_script_text)
-
-            # 2. 각 챕터별 오디오 파일 생성
-            self.logger.info(f"Generating audio for {len(chapter_scripts)} chapters...")
-            for idx, script in enumerate(chapter_scripts, 1):
-                self.logger.info(f"Processing Chapter {idx}")
-                chapter_title = f"{title}_Chapter_{idx}"
-                audio_path = self.audio_maker.generate_audio(chapter_title, script)
-                chapter_audio_files.append(audio_path)
+            if not store_result:
+                final_script_filepath = os.path.join(self.script_dir, f"{cleaned_title}_{run_id}_script.txt")
+                self.logger.info(f"Saving final script to {final_script_filepath}")
+                with span("export", artifact="script") as export_span:
+                    with open(final_script_filepath, "w", encoding="utf-8") as f:
+                        f.write(final_script_text)
+                    script_bytes = os.path.getsize(final_script_filepath)
+                    export_span.set(bytes=script_bytes)
+                    BYTES_WRITTEN.inc(script_bytes, stage="export")
 
             # 3. 최종 팟캐스트 파일명 생성
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            final_filename = f"{cleaned_title}_{timestamp}_podcast.mp3"
+            final_filename = f"{cleaned_title}_{run_id}_podcast.mp3"
             final_filepath = os.path.join(self.podcast_dir, final_filename)
 
             # 4. 오디오 파일 병합
             self.logger.info("Merging chapter audio files...")
-            self._merge_audio_files(chapter_audio_files, final_filepath)
+            self._report_progress(progress_callback, "merge", 0, 1)
+            merge_started = time.monotonic()
+            chapter_offsets = self._merge_audio_files(chapter_audio_files, final_filepath)
+            timings["merge_seconds"] = round(time.monotonic() - merge_started, 3)
+
+            if store_result and self.hls_packager is not None:
+                # 4-1. 스트리밍 재생용 HLS 세그먼트와 챕터 정보 생성 (실패해도 MP3 결과는 그대로 제공)
+                package_started = time.monotonic()
+                self._package_hls(job_id, final_filepath, [chapter["title"] for chapter in chapters], chapter_offsets)
+                timings["package_seconds"] = round(time.monotonic() - package_started, 3)
+            self._report_progress(progress_callback, "merge", 1, 1)
 
-            # 5. 임시 챕터 파일 삭제
+            if store_result:
+                timings["total_seconds"] = round(time.monotonic() - stage_started, 3)
+                with span("export", artifact="index") as export_span:
+                    final_filepath = self.index.save_result(
+                        job_id, final_script_text, final_filepath, total_chapters, timings
+                    )
+                    script_bytes = len(final_script_text.encode("utf-8"))
+                    export_span.set(bytes=script_bytes)
+                    BYTES_WRITTEN.inc(script_bytes, stage="export")
+                self._save_chapters(job_id, chapters, source_hashes, chapter_results, reused)
+
+            # 5. 임시 챕터 파일과 체크포인트 삭제 (이전 버전에서 재사용한 저장소 파일은 유지)
             for file_path in chapter_audio_files:
-                if os.path.exists(file_path):
+                if file_path not in reused_audio_paths and os.path.exists(file_path):
                     os.remove(file_path)
+            if checkpoint_key:
+                self.checkpoints.release(checkpoint_key)
             
             self.logger.info(f"Podcast creation completed successfully for: {title}")
             return final_filepath
 
         except Exception as e:
             self.logger.error(f"Podcast creation failed: {str(e)}")
-            # 에러 발생 시 임시 파일 정리
-            for file_path in chapter_audio_files:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+            # 에러 발생 시 임시 파일 정리 (체크포인트로 저장된 챕터 오디오는 재시도를 위해 남겨 둠)
+            if checkpoint_key:
+                self.checkpoints.release(checkpoint_key, resumable=True)
+            else:
+                for file_path in chapter_audio_files:
+                    if file_path not in reused_audio_paths and os.path.exists(file_path):
+                        os.remove(file_path)
             raise ContentProcessingException(f"Failed to create podcast: {str(e)}")
 
-    def _merge_audio_files(self, audio_files: List[str], output_path: str):
+    def stream_podcast(self, title: str, chapters: list, fresh: bool = False) -> Iterator[bytes]:
+        # 첫 챕터는 TTS 응답을 그대로 흘려보내고, 나머지 챕터는 그동안 병렬로 생성해 순서대로 이어 붙임
+        total_chapters = len(chapters)
+        if not chapters:
+            raise ContentProcessingException("No chapters generated")
+        self.logger.info(f"Starting podcast streaming for: {title} ({total_chapters} chapters)")
+
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(self.max_parallel_chapters, total_chapters - 1)),
+            thread_name_prefix="podcast-stream",
+        )
+        futures = {
+            idx: executor.submit(
+                contextvars.copy_context().run, self._produce_chapter, title, idx, chapter, total_chapters, None, fresh
+            )
+            for idx, chapter in enumerate(chapters, start=1)
+            if idx > 1
+        }
+        first_chapter_path = None
         try:
-            self.logger.info(f"Starting audio merge of {len(audio_files)} files")
-            from pydub import AudioSegment
-            
-            # FFmpeg 경로 설정
-            ffmpeg_path = os.getenv("FFMPEG_PATH")
-            ffprobe_path = os.getenv("FFPROBE_PATH")
-            
-            if not os.path.exists(ffmpeg_path) or not os.path.exists(ffprobe_path):
-                raise AudioGenerationException("FFmpeg or FFprobe not found. Please check installation.")
-            
-            AudioSegment.converter = ffmpeg_path
-            AudioSegment.ffprobe = ffprobe_path
-
-            # 트랜지션 효과음 로드 (mouse_click 효과음)
-            transition_path = "assets/mouse_click.flac"
-            if not os.path.exists(transition_path):
-                raise AudioGenerationException("Transition sound effect file not found.")
-            transition_segment = AudioSegment.from_file(transition_path)
-
-        # 오디오 파일 병합 (각 파일 사이에 트랜지션 효과 삽입)
-            combined = AudioSegment.empty()
-            total_files = len(audio_files)
-            for idx, audio_file in enumerate(audio_files, 1):
-                self.logger.info(f"Merging file {idx}/{total_files}")
-                segment = AudioSegment.from_mp3(audio_file)
-                combined += segment
-                # 마지막 파일이 아니라면 트랜지션 효과음 추가
-                if idx < total_files:
-                    combined += transition_segment
-
-            self.logger.info(f"Exporting final podcast to: {output_path}")
-            combined.export(output_path, format="mp3")
-            self.logger.info("Audio merge completed successfully")
+            script = self.script_maker.generate_chapter_script(1, chapters[0], total_chapters, fresh=fresh)
+            first_chapter = bytearray()
+            for chunk in self.audio_maker.stream_audio(f"{title}_Chapter_1", script):
+                first_chapter.extend(chunk)
+                yield chunk
+
+            transition = b""
+            if total_chapters > 1:
+                first_chapter_path = os.path.join(self.audio_maker.audio_dir, f"stream_{uuid.uuid4().hex}.mp3")
+                with open(first_chapter_path, "wb") as f:
+                    f.write(first_chapter)
+                transition = self._load_transition_clip(first_chapter_path)
+
+            for idx in range(2, total_chapters + 1):
+                _, audio_path = futures[idx].result()
+                if transition:
+                    yield transition
+                try:
+                    with open(audio_path, "rb") as f:
+                        while chunk := f.read(self.audio_maker.STREAM_CHUNK_SIZE):
+                            yield chunk
+                finally:
+                    os.remove(audio_path)
+            self.logger.info(f"Podcast streaming completed for: {title}")
+
+        finally:
+            # 클라이언트 연결 종료나 오류 시 남은 챕터 작업을 취소하고 생성된 파일을 정리
+            executor.shutdown(wait=False, cancel_futures=True)
+            for future in futures.values():
+                future.add_done_callback(self._remove_chapter_audio)
+            if first_chapter_path and os.path.exists(first_chapter_path):
+                os.remove(first_chapter_path)
+
+    def _load_transition_clip(self, reference_file: str) -> bytes:
+        try:
+            with open(self.audio_merger.get_transition_clip(reference_file), "rb") as f:
+                return f.read()
+        except Exception as e:
+            self.logger.warning(f"Transition clip unavailable, streaming without it: {str(e)}")
+            return b""
 
+    def _save_chapters(self, job_id: str, chapters: list, source_hashes: List[str],
+                       chapter_results: List[Tuple[str, str]], reused: dict):
+        # 다음 업데이트 때 재사용할 수 있도록 챕터별 산출물 기록 (실패해도 팟캐스트 결과에는 영향 없음)
+        entries = []
+        for idx, (chapter, source_hash, (script, audio_path)) in enumerate(
+            zip(chapters, source_hashes, chapter_results), start=1
+        ):
+            entry = {"title": chapter["title"], "headings": chapter.get("headings"), "source_hash": source_hash, "script": script}
+            if idx in reused:
+                entry.update(audio_hash=reused[idx]["audio_hash"], audio_size=reused[idx]["audio_size"])
+            else:
+                entry["audio_path"] = audio_path
+            entries.append(entry)
+        try:
+            self.index.save_chapters(job_id, entries)
+        except Exception as e:
+            self.logger.warning(f"Failed to save chapters for job {job_id}: {str(e)}")
+
+    @staticmethod
+    def _remove_chapter_audio(future: Future):
+        if future.cancelled() or future.exception() is not None:
+            return
+        _, audio_path = future.result()
+        if os.path.exists(audio_path):
+            os.remove(audio_path)
+
+    def _produce_chapter(self, title: str, idx: int, chapter: dict, total_chapters: int,
+                         checkpoint_key: Optional[str] = None, fresh: bool = False,
+                         previous: Optional[dict] = None) -> Tuple[str, str]:
+        # 스크립트/TTS 동시성은 각각 ScriptMaker, AudioMaker의 세마포어가 제한
+        self.logger.info(f"Processing Chapter {idx}")
+        if previous is not None:
+            with open(previous["script_path"], "r", encoding="utf-8") as f:
+                script = f.read()
+            self.logger.info(f"Chapter {idx} reused from previous version")
+            return script, previous["audio_path"]
+        if checkpoint_key is None:
+            script = self.script_maker.generate_chapter_script(idx, chapter, total_chapters, fresh=fresh)
+            audio_path = self.audio_maker.generate_audio(f"{title}_Chapter_{idx}", script)
+            return script, audio_path
+
+        # 체크포인트에 남아 있는 단계는 건너뛰고, 새로 만든 결과는 바로 체크포인트에 저장
+        script = self.checkpoints.load_script(checkpoint_key, idx)
+        if script is None:
+            script = self.script_maker.generate_chapter_script(idx, chapter, total_chapters, fresh=fresh)
+            self.checkpoints.save_script(checkpoint_key, idx, script)
+        else:
+            self.logger.info(f"Chapter {idx} script restored from checkpoint")
+
+        audio_path = self.checkpoints.load_audio(checkpoint_key, idx)
+        if audio_path is None:
+            audio_path = self.audio_maker.generate_audio(f"{title}_Chapter_{idx}", script)
+            audio_path = self.checkpoints.save_audio(checkpoint_key, idx, audio_path)
+        else:
+            self.logger.info(f"Chapter {idx} audio restored from checkpoint")
+        return script, audio_path
+
+    def _run_chapter_pipeline(self, title: str, chapters: list, chapter_audio_files: List[str],
+                              progress_callback: Optional[Callable[[str, int, int], None]],
+                              checkpoint_key: Optional[str] = None, fresh: bool = False,
+                              reused: Optional[dict] = None) -> List[Tuple[str, str]]:
+        total_chapters = len(chapters)
+        completed = [0]
+        lock = threading.Lock()
+
+        def produce_chapter(idx: int, chapter: dict) -> Tuple[str, str]:
+            script, audio_path = self._produce_chapter(
+                title, idx, chapter, total_chapters, checkpoint_key, fresh, (reused or {}).get(idx)
+            )
+            with lock:
+                # 실패 시 정리할 수 있도록 생성된 파일을 바로 기록
+                chapter_audio_files.append(audio_path)
+                completed[0] += 1
+                done = completed[0]
+            self._report_progress(progress_callback, "tts", done, total_chapters)
+            return script, audio_path
+
+        executor = ThreadPoolExecutor(
+            max_workers=min(self.max_parallel_chapters, total_chapters),
+            thread_name_prefix="podcast-chapter",
+        )
+        try:
+            # 요청 우선순위(contextvars)가 챕터 스레드의 API 호출에도 적용되도록 context를 복사해 실행
+            futures = [
+                executor.submit(contextvars.copy_context().run, produce_chapter, idx, chapter)
+                for idx, chapter in enumerate(chapters, start=1)
+            ]
+            # 완료 순서와 무관하게 챕터 순서대로 결과를 조립
+            return [future.result() for future in futures]
+        except Exception:
+            # 하나라도 실패하면 아직 시작하지 않은 챕터는 취소
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+    def _report_progress(self, progress_callback: Optional[Callable[[str, int, int], None]],
+                         stage: str, current: int, total: int):
+        if progress_callback is None:
+            return
+        try:
+            progress_callback(stage, current, total)
+        except Exception as e:
+            # 진행 상황 보고 실패가 팟캐스트 생성 자체를 중단시키지 않도록 함
+            self.logger.warning(f"Progress callback failed: {str(e)}")
+
+    def _merge_audio_files(self, audio_files: List[str], output_path: str) -> List[float]:
+        # 병합된 오디오에서 각 챕터가 시작하는 시각(초)을 반환
+        with span("merge", files=len(audio_files), mode=self.audio_merger.merge_mode) as merge_span:
+            if self.merge_executor is not None:
+                chapter_offsets = self.merge_executor.submit(self.audio_merger.merge, audio_files, output_path).result()
+            else:
+                chapter_offsets = self.audio_merger.merge(audio_files, output_path)
+            output_bytes = os.path.getsize(output_path)
+            merge_span.set(bytes=output_bytes)
+            BYTES_WRITTEN.inc(output_bytes, stage="merge")
+        return chapter_offsets
+
+    def _package_hls(self, job_id: str, audio_path: str, chapter_titles: List[str], chapter_offsets: List[float]):
+        hls = self.index.hls
+        staging_dir = hls.create_staging_dir(job_id)
+        try:
+            with span("export", artifact="hls") as export_span:
+                self.hls_packager.package(audio_path, staging_dir, chapter_titles, chapter_offsets)
+                output_bytes = sum(os.path.getsize(entry.path) for entry in os.scandir(staging_dir))
+                export_span.set(bytes=output_bytes)
+                BYTES_WRITTEN.inc(output_bytes, stage="export")
+            hls.commit(job_id, staging_dir)
         except Exception as e:
-            self.logger.error(f"Audio merge failed: {str(e)}")
-            raise AudioGenerationException(f"Failed to merge audio files: {str(e)}")
\ No newline at end of file
+            self.logger.warning(f"HLS packaging failed for job {job_id}, serving MP3 only: {str(e)}")
+            hls.discard(staging_dir)
@@ -1,8 +1,35 @@
 import openai
 import json
 import logging
+import contextvars
+import hashlib
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import List, Optional
+from app.services.content_sectioner import ContentSectioner
+from app.storage.llm_cache import LLMResponseCache
+from app.utils.quota_scheduler import QuotaScheduler
+from app.utils.token_counter import count_tokens
+from app.utils.metrics import span, current_span, CONCURRENCY_WAIT, LLM_CACHE_LOOKUPS, LLM_REQUESTS_IN_FLIGHT, LLM_TOKENS
 from app.exceptions.podcast_exceptions import ContentProcessingException
 
+@dataclass
+class LongDocumentConfig:
+    # 원문 토큰 수가 이 값을 넘으면 구간 묶음(window)별로 요약한 뒤 요약본으로 목차를 생성
+    threshold_tokens: int = 60000
+    window_tokens: int = 8000
+    # 각 window 앞에 문맥으로 덧붙이는 이전 구간의 토큰 수
+    overlap_tokens: int = 500
+    # 챕터 원문이 이 값을 넘으면 구간 경계에서 여러 챕터로 나눔
+    max_chapter_tokens: int = 6000
+    # 처리 가능한 최대 원문 토큰 수
+    max_input_tokens: int = 400000
+
+
 class ScriptMaker:
 
     # 시스템 메시지와 프롬프트 템플릿들을 상수로 정의합니다.
@@ -32,6 +59,48 @@ class ScriptMaker:
             "```\n"
         )
     
+    @staticmethod
+    def _get_section_messages(title: str, sections: list) -> list:
+        body = "\n\n".join(f"[구간 {section.index}]\n{section.text}" for section in sections)
+        return [
+            {"role": "system", "content": ScriptMaker.SYSTEM_MESSAGE},
+            {"role": "user", "content": f"제목과 원문 전체 내용 (구간 번호로 나뉘어 있음):\n\n제목: {title}\n\n{body}\n\n이 내용을 기억해."}
+        ]
+
+    @staticmethod
+    def _get_section_toc_prompt(total_sections: int) -> str:
+        return (
+            f"위에서 제공한 원문은 1번부터 {total_sections}번까지의 구간으로 나뉘어 있어. 이를 바탕으로 팟캐스트 스크립트의 목차를 생성해줘.\n"
+            "분할 기준:\n"
+            "- 각 챕터는 연속된 구간들로 구성되며, 챕터 제목과 챕터가 시작되는 구간 번호만 지정할 것\n"
+            "- 원문 내용을 다시 출력하지 말 것\n"
+            "- 글의 연결성과 흐름이 유지되도록 분할할 것\n"
+            "- 챕터별로 내용이 고르게 분배되도록 할 것 (너무 길거나 짧지 않도록 조정)\n"
+            "- 첫 챕터는 반드시 1번 구간에서 시작할 것\n"
+        )
+
+    @staticmethod
+    def _get_window_summary_prompt(title: str, context: list, window: list) -> str:
+        prompt = f"제목: {title}\n\n"
+        if context:
+            context_text = "\n\n".join(section.text for section in context)
+            prompt += f"앞부분 문맥 (요약하지 말 것):\n{context_text}\n\n"
+        window_text = "\n\n".join(f"[구간 {section.index}]\n{section.text}" for section in window)
+        prompt += (
+            f"요약할 원문:\n{window_text}\n\n"
+            "위 원문의 각 구간을 구간 번호별로 한두 문장으로 요약해줘.\n"
+            "출력 형식은 각 줄마다 '[구간 번호] 요약' 으로 하고, 다른 설명은 포함하지 말 것."
+        )
+        return prompt
+
+    @staticmethod
+    def _get_outline_messages(title: str, outlines: list) -> list:
+        outline_text = "\n".join(outlines)
+        return [
+            {"role": "system", "content": ScriptMaker.SYSTEM_MESSAGE},
+            {"role": "user", "content": f"제목과 원문의 구간별 요약:\n\n제목: {title}\n\n{outline_text}\n\n이 내용을 기억해."}
+        ]
+
     @staticmethod
     def _get_chapter_prompt(idx: int, chapter: dict, is_first: bool, is_last: bool) -> str:
         prompt = (
@@ -58,112 +127,494 @@ class ScriptMaker:
         return prompt
 
 
-    def __init__(self, api_key: str):
-        openai.api_key = api_key
+    # 재시도 대상 오류 (rate limit, 일시적 네트워크/서버 오류)
+    RETRYABLE_ERRORS = (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+    # sections: 로컬에서 구간을 나누고 모델은 챕터 경계만 지정 / full: 모델이 원문을 챕터별로 다시 출력
+    TOC_MODES = ("sections", "full")
+
+    # 프롬프트 템플릿이나 응답 처리 방식이 바뀌면 올려서 이전 응답 캐시를 무효화
+    PROMPT_VERSION = "1"
+
+    # TPM 할당량 예약에 쓰는 완성 토큰 추정치 (요청한 max_tokens가 더 작으면 그 값, 응답을 받은 뒤 실제 사용량으로 정산)
+    COMPLETION_TOKENS_ESTIMATE = 2000
+
+    def __init__(self, api_key: str, max_concurrency: int = 4, max_retries: int = 3, retry_base_delay: float = 1.0,
+                 toc_mode: str = "sections", sectioner: Optional[ContentSectioner] = None,
+                 long_document: Optional[LongDocumentConfig] = None, client=None,
+                 cache: Optional[LLMResponseCache] = None, scheduler: Optional[QuotaScheduler] = None):
+        if toc_mode not in self.TOC_MODES:
+            raise ValueError(f"Unknown TOC mode: {toc_mode}")
+        self.api_key = api_key
+        self.toc_mode = toc_mode
+        self.sectioner = sectioner or ContentSectioner()
+        self.long_document = long_document or LongDocumentConfig()
+        # chat.completions.create를 제공하는 클라이언트 (보통 ApiClientManager.openai, None이면 처음 사용할 때 한 번 생성)
+        self.client = client
+        self.client_lock = threading.Lock()
+        # 같은 요청(모델, 메시지, 파라미터)의 응답을 재사용하는 캐시 (None이면 캐시 미사용)
+        self.cache = cache
+        self.max_concurrency = max(1, max_concurrency)
+        # 요청 수/토큰 할당량에 맞춰 호출을 내보내고 429와 일시적 오류를 재시도 (None이면 한도 없이 재시도만 담당)
+        self.scheduler = scheduler or QuotaScheduler(
+            "openai", max_retries=max_retries, retry_base_delay=retry_base_delay
+        )
+        # 동시에 진행 중인 chat completion 요청 수를 제한
+        self.semaphore = threading.BoundedSemaphore(self.max_concurrency)
         self.logger = logging.getLogger(__name__)
 
-    def generate_script(self, title: str, content: str) -> str:
+    def _get_client(self):
+        with self.client_lock:
+            if self.client is None:
+                self.client = openai.OpenAI(api_key=self.api_key, max_retries=0)
+            return self.client
+
+    def _create_completion(self, client, fresh: bool = False, **kwargs):
+        # fresh=True이면 캐시된 응답을 쓰지 않고 새로 생성한 응답으로 캐시를 갱신
+        cache_key = None
+        if self.cache is not None:
+            cache_key = LLMResponseCache.make_key(self.PROMPT_VERSION, **kwargs)
+            cached = None if fresh else self.cache.get(cache_key)
+            LLM_CACHE_LOOKUPS.inc(result="bypass" if fresh else ("hit" if cached is not None else "miss"))
+            if cached is not None:
+                active_span = current_span()
+                if active_span is not None:
+                    active_span.add(llm_cache_hits=1)
+                return self._restore_response(cached)
+
+        response = self._request_completion(client, **kwargs)
+        if cache_key is not None:
+            try:
+                self.cache.put(cache_key, self._serialize_response(response))
+            except Exception as e:
+                self.logger.warning(f"Failed to cache chat completion: {str(e)}")
+        return response
+
+    def _request_completion(self, client, **kwargs):
+        model = kwargs.get("model", "")
+        # 프롬프트 토큰 수와 완성 토큰 추정치만큼 TPM 할당량을 예약 (응답의 usage로 실제 사용량을 정산)
+        max_tokens = kwargs.get("max_completion_tokens") or kwargs.get("max_tokens")
+        completion_tokens = min(self.COMPLETION_TOKENS_ESTIMATE, max_tokens) if max_tokens else self.COMPLETION_TOKENS_ESTIMATE
+        estimated_tokens = sum(
+            count_tokens(message.get("content") or "", model) for message in kwargs.get("messages", [])
+        ) + completion_tokens
+
+        def request():
+            wait_started = time.perf_counter()
+            with self.semaphore:
+                CONCURRENCY_WAIT.observe(time.perf_counter() - wait_started, resource="llm")
+                with LLM_REQUESTS_IN_FLIGHT.track_inprogress():
+                    return client.chat.completions.create(**kwargs)
+
+        def usage(response) -> dict:
+            total_tokens = getattr(getattr(response, "usage", None), "total_tokens", None)
+            return {"tokens": total_tokens} if total_tokens is not None else {}
+
+        response = self.scheduler.run(request, retryable=self.RETRYABLE_ERRORS, usage=usage, tokens=estimated_tokens)
+        self._record_usage(model, response)
+        return response
+
+    @staticmethod
+    def _serialize_response(response) -> dict:
+        # 응답에서 이후 처리에 쓰는 필드(본문, 함수 호출 인자)만 저장
+        choices = []
+        for choice in response.choices:
+            function_call = getattr(choice.message, "function_call", None)
+            choices.append({
+                "content": choice.message.content,
+                "function_call": {"name": function_call.name, "arguments": function_call.arguments} if function_call else None,
+                "finish_reason": getattr(choice, "finish_reason", None),
+            })
+        return {"model": getattr(response, "model", None), "choices": choices}
+
+    @staticmethod
+    def _restore_response(data: dict):
+        # 캐시된 응답은 토큰을 쓰지 않았으므로 usage 없이 복원
+        choices = []
+        for choice in data["choices"]:
+            function_call = SimpleNamespace(**choice["function_call"]) if choice["function_call"] else None
+            message = SimpleNamespace(content=choice["content"], function_call=function_call)
+            choices.append(SimpleNamespace(message=message, finish_reason=choice["finish_reason"]))
+        return SimpleNamespace(model=data["model"], choices=choices, usage=None)
+
+    @staticmethod
+    def _record_usage(model: str, response):
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+        completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+        LLM_TOKENS.inc(prompt_tokens, model=model, kind="prompt")
+        LLM_TOKENS.inc(completion_tokens, model=model, kind="completion")
+        active_span = current_span()
+        if active_span is not None:
+            active_span.add(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, llm_requests=1)
+
+    def generate_chapter_script(self, idx: int, chapter: dict, total_chapters: int, client=None,
+                                fresh: bool = False) -> str:
+        client = client or self._get_client()
+        is_first = (idx == 1)
+        is_last = (idx == total_chapters)
+        chapter_prompt = self._get_chapter_prompt(idx, chapter, is_first, is_last)
+        # 원문 전체를 다시 보내지 않고, 간단한 참조 메시지로 대체하여 토큰 사용을 줄임.
+        reference_message = {
+            "role": "assistant",
+            "content": "참고: 이전 메시지에서 제공한 원문 전체 내용을 기억하고 있으니, 이를 바탕으로 작성해줘."
+        }
+        chapter_messages = [
+            {"role": "system", "content": ScriptMaker.SYSTEM_MESSAGE},
+            reference_message,
+            {"role": "user", "content": chapter_prompt}
+        ]
 
         try:
-            self.logger.info(f"Starting script generation for title: {title}")
-            client = openai.OpenAI()
-
-            # 1. 초기 대화: 원문 전체를 포함하여 테이블 오브 콘텐츠(목차) 생성에 필요한 정보를 제공
-            initial_messages = self._get_initial_messages(title, content)
-
-            # 2. 목차 생성 요청 (목차는 JSON 형식으로 출력하도록 요청)
-            prompt_toc = self._get_toc_prompt()
-
-            initial_messages.append({"role": "user", "content": prompt_toc})
-
-            functions = [
-                {
-                    "name": "extract_toc",
-                    "description": "원문 내용을 바탕으로 목차를 JSON 형식으로 생성합니다.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "chapters": {
-                                "type": "array",
-                                "items": {
-                                    "type": "object",
-                                    "properties": {
-                                        "title": {
-                                            "type": "string",
-                                            "description": "챕터 제목"
-                                        },
-                                        "content": {
-                                            "type": "string",
-                                            "description": "챕터에 해당하는 원문 내용"
-                                        }
-                                    },
-                                    "required": ["title", "content"]
-                                }
-                            }
-                        },
-                        "required": ["chapters"]
-                    }
-                }
-            ]
+            with span("chapter_script", chapter=idx) as chapter_span:
+                chapter_response = self._create_completion(
+                    client,
+                    fresh=fresh,
+                    model="gpt-4o",
+                    messages=chapter_messages,
+                    temperature=0.7,
+                )
+                chapter_script = chapter_response.choices[0].message.content.strip()
+                chapter_span.set(characters=len(chapter_script))
+        except Exception as e:
+            self.logger.error(f"Chapter {idx} script generation failed: {str(e)}")
+            raise ContentProcessingException(f"Failed to generate chapter {idx} script: {str(e)}")
 
-            toc_response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=initial_messages,
-                functions=functions,
-                function_call={"name": "extract_toc"},
-                temperature=0.7,
-            )
+        self.logger.info(f"Completed Chapter {idx} script generation")
+        return chapter_script
 
-            #3 목차 파싱, structured output은 function_call 필드에 arguments로 JSON 데이터를 담아 응답합니다.
-            function_args = toc_response.choices[0].message.function_call.arguments
+    def generate_toc(self, title: str, content: str, client=None, fresh: bool = False) -> list:
 
-            if function_args is None:
-                raise ContentProcessingException("함수 호출 응답이 없습니다.")
+        try:
+            self.logger.info(f"Starting table of contents generation for title: {title} (mode: {self.toc_mode})")
+            client = client or self._get_client()
 
-            toc_data = json.loads(function_args)
-            chapters = toc_data.get("chapters", [])
+            with span("toc", mode=self.toc_mode, characters=len(content)) as toc_span:
+                if self.toc_mode == "sections":
+                    chapters = self._generate_section_toc(client, title, content, fresh)
+                else:
+                    chapters = self._generate_full_toc(client, title, content, fresh)
+                toc_span.set(chapters=len(chapters))
 
             if not chapters:
                 self.logger.error("Failed to generate table of contents")
                 raise ContentProcessingException("목차 생성에 실패하였습니다.")
             
             self.logger.info(f"Successfully generated table of contents with {len(chapters)} chapters")
+            return chapters
 
-            full_script = []
-            self.logger.info("Starting chapter script generation...")
+        except Exception as e:
+            self.logger.error(f"Table of contents generation failed: {str(e)}")
+            raise ContentProcessingException(f"Failed to generate table of contents: {str(e)}")
 
-            # 4. 이후부터는 원문 전체 내용을 다시 보내지 않고, 간단한 참조 메시지로 대체하여 토큰 사용을 줄임.
-            reference_message = {
-                "role": "assistant",
-                "content": "참고: 이전 메시지에서 제공한 원문 전체 내용을 기억하고 있으니, 이를 바탕으로 작성해줘."
+    def _generate_section_toc(self, client, title: str, content: str, fresh: bool = False) -> list:
+        # 1. 원문을 문단 제목/토큰 수 기준으로 로컬에서 미리 구간 분할
+        sections = self.sectioner.split(content)
+        if not sections:
+            return []
+        self.logger.info(f"Split content into {len(sections)} sections")
+        if len(sections) == 1:
+            return self._build_chapters_from_sections([{"title": title, "start_section": 1}], sections)
+
+        total_tokens = sum(section.tokens for section in sections)
+        if total_tokens > self.long_document.max_input_tokens:
+            raise ContentProcessingException(
+                f"Content is too long ({total_tokens} tokens, limit {self.long_document.max_input_tokens})"
+            )
+
+        # 2. 모델은 챕터 제목과 시작 구간 번호만 반환 (원문을 다시 출력하지 않음)
+        if total_tokens > self.long_document.threshold_tokens:
+            # 긴 문서: window별 요약(map)을 동시에 만든 뒤 요약본으로 목차 생성(reduce)
+            self.logger.info(f"Long document ({total_tokens} tokens), building TOC from window outlines")
+            messages = self._get_outline_messages(title, self._summarize_windows(client, title, sections, fresh))
+        else:
+            messages = self._get_section_messages(title, sections)
+        messages.append({"role": "user", "content": self._get_section_toc_prompt(len(sections))})
+
+        toc_response = self._create_completion(
+            client,
+            fresh=fresh,
+            model="gpt-4o",
+            messages=messages,
+            functions=self._get_section_toc_functions(),
+            function_call={"name": "extract_toc"},
+            temperature=0.7,
+        )
+
+        function_args = toc_response.choices[0].message.function_call.arguments
+        if function_args is None:
+            raise ContentProcessingException("함수 호출 응답이 없습니다.")
+
+        chapters = self._build_chapters_from_sections(json.loads(function_args).get("chapters", []), sections)
+        return self._split_oversized_chapters(chapters, sections)
+
+    @staticmethod
+    def _get_section_toc_functions() -> list:
+        return [
+            {
+                "name": "extract_toc",
+                "description": "구간 번호로 나뉜 원문을 바탕으로 목차를 JSON 형식으로 생성합니다.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "chapters": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "title": {
+                                        "type": "string",
+                                        "description": "챕터 제목"
+                                    },
+                                    "start_section": {
+                                        "type": "integer",
+                                        "description": "챕터가 시작되는 구간 번호"
+                                    }
+                                },
+                                "required": ["title", "start_section"]
+                            }
+                        }
+                    },
+                    "required": ["chapters"]
+                }
             }
+        ]
+
+    def _build_windows(self, sections: list) -> List[tuple]:
+        # (문맥용 이전 구간, 요약 대상 구간) 묶음을 window_tokens 이하로 구성
+        windows, current, current_tokens = [], [], 0
+        for section in sections:
+            if current and current_tokens + section.tokens > self.long_document.window_tokens:
+                windows.append(current)
+                current, current_tokens = [], 0
+            current.append(section)
+            current_tokens += section.tokens
+        if current:
+            windows.append(current)
+
+        result = []
+        for idx, window in enumerate(windows):
+            context, context_tokens = [], 0
+            if idx > 0:
+                for section in reversed(windows[idx - 1]):
+                    if context_tokens + section.tokens > self.long_document.overlap_tokens:
+                        break
+                    context.insert(0, section)
+                    context_tokens += section.tokens
+            result.append((context, window))
+        return result
+
+    def _summarize_windows(self, client, title: str, sections: list, fresh: bool = False) -> List[str]:
+        windows = self._build_windows(sections)
+        self.logger.info(f"Summarizing {len(windows)} windows (max concurrency: {self.max_concurrency})")
 
-            # 5. 각 챕터별 스크립트 생성 (개별 요청 시 새 conversation을 구성)
-            total_chapters = len(chapters)
-            for idx, chapter in enumerate(chapters, start=1):
-                is_first = (idx == 1)
-                is_last = (idx == total_chapters)
-                chapter_prompt = self._get_chapter_prompt(idx, chapter, is_first, is_last)
-                chapter_messages = [
+        def summarize(context: list, window: list) -> str:
+            response = self._create_completion(
+                client,
+                fresh=fresh,
+                model="gpt-4o",
+                messages=[
                     {"role": "system", "content": ScriptMaker.SYSTEM_MESSAGE},
-                    reference_message,
-                    {"role": "user", "content": chapter_prompt}
-                ]
+                    {"role": "user", "content": self._get_window_summary_prompt(title, context, window)},
+                ],
+                temperature=0.3,
+            )
+            return response.choices[0].message.content.strip()
 
-                chapter_response = client.chat.completions.create(
-                    model="gpt-4o",
-                    messages=chapter_messages,
-                    temperature=0.7,
-                )
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(windows))) as executor:
+            # 요약 요청의 토큰 사용량이 목차 span에 합산되도록 현재 컨텍스트를 복사해 실행
+            futures = [
+                executor.submit(contextvars.copy_context().run, summarize, context, window)
+                for context, window in windows
+            ]
+            # 요약 결과는 window 순서대로 조립
+            return [future.result() for future in futures]
 
-                chapter_script = chapter_response.choices[0].message.content.strip()
-                full_script.append(chapter_script)
-                self.logger.info(f"Completed Chapter {idx} script generation")
+    def _split_oversized_chapters(self, chapters: list, sections: list) -> list:
+        sections_by_index = {section.index: section for section in sections}
+        result = []
+        for chapter in chapters:
+            parts, current, current_tokens = [], [], 0
+            for section_index in chapter["sections"]:
+                section = sections_by_index[section_index]
+                if current and current_tokens + section.tokens > self.long_document.max_chapter_tokens:
+                    parts.append(current)
+                    current, current_tokens = [], 0
+                current.append(section)
+                current_tokens += section.tokens
+            parts.append(current)
 
-            self.logger.info("Successfully completed full script generation")
-            return full_script
-            
-        except Exception as e:
-            self.logger.error(f"Script generation failed: {str(e)}")
-            raise ContentProcessingException(f"Failed to generate script: {str(e)}")
-        
\ No newline at end of file
+            if len(parts) == 1:
+                result.append(chapter)
+                continue
+            for part_idx, part in enumerate(parts, start=1):
+                result.append({
+                    "title": f"{chapter['title']} ({part_idx}부)",
+                    "content": "\n\n".join(section.text for section in part),
+                    "sections": [section.index for section in part],
+                    "headings": [section.heading for section in part],
+                })
+        return result
+
+    @staticmethod
+    def _build_chapters_from_sections(toc_chapters: list, sections: list) -> list:
+        # 시작 구간 번호만 신뢰하고, 구간이 빠짐없이 순서대로 한 번씩 포함되도록 챕터 범위를 계산
+        total_sections = len(sections)
+        titles_by_start = {}
+        for chapter in toc_chapters:
+            try:
+                start = min(max(int(chapter["start_section"]), 1), total_sections)
+            except (KeyError, TypeError, ValueError):
+                continue
+            titles_by_start.setdefault(start, chapter.get("title", "").strip())
+        if not titles_by_start:
+            return []
+
+        starts = sorted(titles_by_start)
+        if starts[0] != 1:
+            titles_by_start[1] = titles_by_start.pop(starts[0])
+            starts[0] = 1
+
+        chapters = []
+        for idx, start in enumerate(starts):
+            end = starts[idx + 1] - 1 if idx + 1 < len(starts) else total_sections
+            chapter_sections = sections[start - 1:end]
+            chapters.append({
+                "title": titles_by_start[start] or chapter_sections[0].heading,
+                "content": "\n\n".join(section.text for section in chapter_sections),
+                "sections": [section.index for section in chapter_sections],
+                "headings": [section.heading for section in chapter_sections],
+            })
+        return chapters
+
+    # 업데이트 모드에서 이전 목차를 재사용하려면 새 구간 중 이 비율 이상이 이전 문단 제목과 일치해야 함
+    MIN_MATCHED_SECTION_RATIO = 0.5
+
+    def rebuild_toc(self, title: str, content: str, previous_chapters: List[dict]) -> Optional[list]:
+        """이전 버전의 챕터 구성(문단 제목 목록)에 새 원문의 구간을 다시 배치해 목차를 만듦 (LLM 호출 없음)
+
+        문서 구조가 크게 바뀌어 이전 목차를 쓸 수 없으면 None을 반환합니다.
+        """
+        sections = self.sectioner.split(content)
+        # 같은 제목의 문단이 여러 번 나올 수 있으므로 (제목, 몇 번째 등장) 단위로 대응시킴
+        chapter_by_heading = {}
+        occurrences = Counter()
+        for chapter_idx, chapter in enumerate(previous_chapters):
+            for heading in chapter.get("headings") or []:
+                if heading:
+                    chapter_by_heading[(heading, occurrences[heading])] = chapter_idx
+                    occurrences[heading] += 1
+        if not sections or not chapter_by_heading:
+            return None
+
+        # 이전 목차의 챕터 순서를 유지하면서 구간을 배정하고, 새로 생긴 문단은 바로 앞 챕터에 붙임
+        assigned: List[List] = [[] for _ in previous_chapters]
+        current, matched = 0, 0
+        occurrences.clear()
+        for section in sections:
+            chapter_idx = chapter_by_heading.get((section.heading, occurrences[section.heading]))
+            occurrences[section.heading] += 1
+            if chapter_idx is not None:
+                matched += 1
+                if chapter_idx >= current:
+                    current = chapter_idx
+            assigned[current].append(section)
+
+        if matched < len(sections) * self.MIN_MATCHED_SECTION_RATIO:
+            self.logger.info(f"Only {matched}/{len(sections)} sections match the previous TOC, rebuilding")
+            return None
+
+        chapters = [
+            {
+                "title": previous["title"],
+                "content": "\n\n".join(section.text for section in chapter_sections),
+                "sections": [section.index for section in chapter_sections],
+                "headings": [section.heading for section in chapter_sections],
+            }
+            for previous, chapter_sections in zip(previous_chapters, assigned)
+            if chapter_sections
+        ]
+        self.logger.info(f"Rebuilt TOC for {title} from previous version ({matched}/{len(sections)} sections matched)")
+        return self._split_oversized_chapters(chapters, sections)
+
+    @classmethod
+    def chapter_source_hash(cls, chapter: dict, idx: int, total_chapters: int, **params) -> str:
+        # 챕터 스크립트를 결정하는 입력 (원문, 제목, 첫/마지막 챕터 여부)과 추가 설정. 위치만 바뀐 챕터는 같은 해시
+        payload = json.dumps(
+            {
+                "prompt_version": cls.PROMPT_VERSION,
+                "title": chapter.get("title"),
+                "content": chapter.get("content"),
+                "is_first": idx == 1,
+                "is_last": idx == total_chapters,
+                "params": params,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _generate_full_toc(self, client, title: str, content: str, fresh: bool = False) -> list:
+        # 1. 초기 대화: 원문 전체를 포함하여 테이블 오브 콘텐츠(목차) 생성에 필요한 정보를 제공
+        initial_messages = self._get_initial_messages(title, content)
+
+        # 2. 목차 생성 요청 (목차는 JSON 형식으로 출력하도록 요청)
+        prompt_toc = self._get_toc_prompt()
+
+        initial_messages.append({"role": "user", "content": prompt_toc})
+
+        functions = [
+            {
+                "name": "extract_toc",
+                "description": "원문 내용을 바탕으로 목차를 JSON 형식으로 생성합니다.",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "chapters": {
+                            "type": "array",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "title": {
+                                        "type": "string",
+                                        "description": "챕터 제목"
+                                    },
+                                    "content": {
+                                        "type": "string",
+                                        "description": "챕터에 해당하는 원문 내용"
+                                    }
+                                },
+                                "required": ["title", "content"]
+                            }
+                        }
+                    },
+                    "required": ["chapters"]
+                }
+            }
+        ]
+
+        toc_response = self._create_completion(
+            client,
+            fresh=fresh,
+            model="gpt-4o",
+            messages=initial_messages,
+            functions=functions,
+            function_call={"name": "extract_toc"},
+            temperature=0.7,
+        )
+
+        #3 목차 파싱, structured output은 function_call 필드에 arguments로 JSON 데이터를 담아 응답합니다.
+        function_args = toc_response.choices[0].message.function_call.arguments
+
+        if function_args is None:
+            raise ContentProcessingException("함수 호출 응답이 없습니다.")
+
+        toc_data = json.loads(function_args)
+        return toc_data.get("chapters", [])
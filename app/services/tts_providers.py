@@ -0,0 +1,216 @@
+import io
+import os
+import time
+import asyncio
+import threading
+from typing import Dict, Iterator, Optional, Type
+from app.storage.audio_cache import AudioCache
+
+class TTSProvider:
+    """TTS 프로바이더 인터페이스. synthesize만 구현하면 stream/asynthesize는 기본 구현을 사용"""
+    name = ""
+    voice = ""
+    model = ""
+    requires_api_key = False
+    # 요청 1회당 입력 글자 수 한도와 기본 동시 요청 수
+    max_chars = 4000
+    default_concurrency = 4
+    STREAM_CHUNK_SIZE = 64 * 1024
+
+    def synthesize(self, text: str) -> bytes:
+        raise NotImplementedError
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        yield self.synthesize(text)
+
+    async def asynthesize(self, text: str) -> bytes:
+        return await asyncio.to_thread(self.synthesize, text)
+
+    def bind_clients(self, clients):
+        # 애플리케이션 공용 API 클라이언트(ApiClientManager)를 사용하도록 교체 (외부 API를 쓰지 않으면 무시)
+        pass
+
+    def cache_params(self) -> dict:
+        # 캐시 키에 포함할 추가 설정 (출력 형식, 보이스 세부 설정 등)
+        return {}
+
+    def cache_key(self, text: str) -> str:
+        return AudioCache.make_key(self.name, self.voice, self.model, text, **self.cache_params())
+
+
+TTS_PROVIDERS: Dict[str, Type[TTSProvider]] = {}
+
+
+def register_tts_provider(provider_cls: Type[TTSProvider]) -> Type[TTSProvider]:
+    TTS_PROVIDERS[provider_cls.name] = provider_cls
+    return provider_cls
+
+
+def create_tts_provider(name: str, api_key: Optional[str] = None, **options) -> TTSProvider:
+    if name not in TTS_PROVIDERS:
+        raise ValueError(f"Unknown TTS provider: {name} (available: {', '.join(sorted(TTS_PROVIDERS))})")
+    provider_cls = TTS_PROVIDERS[name]
+    if provider_cls.requires_api_key:
+        if not api_key:
+            raise ValueError("API key is not provided")
+        return provider_cls(api_key=api_key, **options)
+    return provider_cls(**options)
+
+
+@register_tts_provider
+class ElevenLabsTTSProvider(TTSProvider):
+    name = "elevenlabs"
+    voice = "DMkRitQrfpiddSQT5adl"  # jjeong voice
+    model = "eleven_multilingual_v2"
+    requires_api_key = True
+    max_chars = 4500
+    default_concurrency = 2
+    OUTPUT_FORMAT = "mp3_44100_128"
+    VOICE_SETTINGS = {
+        "stability": 0.5,
+        "similarity_boost": 0.75,
+        "style": 0.0,
+        "use_speaker_boost": True,
+    }
+
+    def __init__(self, api_key: str):
+        from elevenlabs.client import ElevenLabs
+        self.client = ElevenLabs(api_key=api_key)
+
+    def bind_clients(self, clients):
+        self.client = clients.elevenlabs
+
+    def synthesize(self, text: str) -> bytes:
+        return b"".join(chunk for chunk in self.stream(text) if chunk)
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        from elevenlabs import VoiceSettings
+        # response는 청크 iterable로 반환됨
+        yield from self.client.text_to_speech.convert(
+            voice_id=self.voice,
+            output_format=self.OUTPUT_FORMAT,
+            text=text,
+            model_id=self.model,
+            voice_settings=VoiceSettings(**self.VOICE_SETTINGS)
+        )
+
+    def cache_params(self) -> dict:
+        return {"output_format": self.OUTPUT_FORMAT, **self.VOICE_SETTINGS}
+
+
+@register_tts_provider
+class OpenAITTSProvider(TTSProvider):
+    name = "openai"
+    voice = "nova"
+    model = "tts-1"
+    requires_api_key = True
+    # OpenAI TTS는 4096자 제한, 여유를 두고 설정
+    max_chars = 4000
+    default_concurrency = 4
+
+    def __init__(self, api_key: str):
+        import openai
+        self.api_key = api_key
+        self.client = openai.OpenAI(api_key=api_key, max_retries=0)
+        self.clients = None
+        self._async_client = None
+
+    def bind_clients(self, clients):
+        self.client = clients.openai
+        self.clients = clients
+
+    def synthesize(self, text: str) -> bytes:
+        response = self.client.audio.speech.create(
+            model=self.model,
+            voice=self.voice,
+            input=text,
+        )
+        return response.content
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        with self.client.audio.speech.with_streaming_response.create(
+            model=self.model,
+            voice=self.voice,
+            input=text,
+            response_format="mp3",
+        ) as response:
+            yield from response.iter_bytes(self.STREAM_CHUNK_SIZE)
+
+    async def asynthesize(self, text: str) -> bytes:
+        if self._async_client is None:
+            import openai
+            self._async_client = self.clients.async_openai if self.clients else openai.AsyncOpenAI(api_key=self.api_key, max_retries=0)
+        response = await self._async_client.audio.speech.create(
+            model=self.model,
+            voice=self.voice,
+            input=text,
+        )
+        return response.content
+
+
+@register_tts_provider
+class GTTSProvider(TTSProvider):
+    name = "gtts"
+    voice = "ko"
+    model = "gtts"
+    max_chars = 4000
+    default_concurrency = 2
+
+    def __init__(self, lang: str = "ko"):
+        from gtts import gTTS
+        self.gtts_cls = gTTS
+        self.voice = lang
+
+    def synthesize(self, text: str) -> bytes:
+        buffer = io.BytesIO()
+        self.gtts_cls(text=text, lang=self.voice).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+@register_tts_provider
+class FakeTTSProvider(TTSProvider):
+    """외부 API 없이 글자 수에 비례하는 길이의 무음 MP3를 만드는 부하 테스트/벤치마크용 프로바이더"""
+    name = "fake"
+    voice = "silence"
+    model = "fake-mp3"
+    max_chars = 4000
+    default_concurrency = 64
+
+    # MPEG-1 Layer III, 128kbps, 44.1kHz, mono 프레임 (1152 샘플, 417바이트)
+    FRAME_HEADER = bytes([0xFF, 0xFB, 0x90, 0xC0])
+    FRAME_SIZE = 417
+    FRAME_SECONDS = 1152 / 44100
+
+    def __init__(self, seconds_per_char: Optional[float] = None, latency_seconds: Optional[float] = None):
+        # 헤더와 side info, 메인 데이터가 모두 0인 프레임은 무음으로 디코딩됨
+        self.frame = self.FRAME_HEADER + bytes(self.FRAME_SIZE - len(self.FRAME_HEADER))
+        self.seconds_per_char = seconds_per_char if seconds_per_char is not None else float(
+            os.getenv("FAKE_TTS_SECONDS_PER_CHAR", "0.08")
+        )
+        self.latency_seconds = latency_seconds if latency_seconds is not None else float(
+            os.getenv("FAKE_TTS_LATENCY_SECONDS", "0")
+        )
+        self.lock = threading.Lock()
+        self.request_count = 0
+        self.characters_synthesized = 0
+
+    def synthesize(self, text: str) -> bytes:
+        return b"".join(self.stream(text))
+
+    def stream(self, text: str) -> Iterator[bytes]:
+        with self.lock:
+            self.request_count += 1
+            self.characters_synthesized += len(text)
+
+        total_frames = max(1, round(len(text) * self.seconds_per_char / self.FRAME_SECONDS))
+        frames_per_chunk = max(1, self.STREAM_CHUNK_SIZE // self.FRAME_SIZE)
+        chunk_count = -(-total_frames // frames_per_chunk)
+        # 실제 API처럼 지연 시간을 청크 사이에 나눠서 흉내 냄
+        for idx in range(chunk_count):
+            if self.latency_seconds:
+                time.sleep(self.latency_seconds / chunk_count)
+            frames = min(frames_per_chunk, total_frames - idx * frames_per_chunk)
+            yield self.frame * frames
+
+    def cache_params(self) -> dict:
+        return {"seconds_per_char": self.seconds_per_char}
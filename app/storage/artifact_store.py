@@ -0,0 +1,73 @@
+import os
+import hashlib
+import shutil
+import uuid
+from typing import Iterator, Tuple
+
+class ArtifactStore:
+    """sha256 해시를 파일명으로 사용하는 content-addressed 산출물 저장소 (스크립트, 팟캐스트 오디오)"""
+    HASH_CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, root_dir: str = "generated/artifacts"):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def path_for(self, digest: str, suffix: str) -> str:
+        return os.path.join(self.root_dir, digest[:2], f"{digest}{suffix}")
+
+    def exists(self, digest: str, suffix: str) -> bool:
+        return os.path.exists(self.path_for(digest, suffix))
+
+    def put_bytes(self, data: bytes, suffix: str) -> Tuple[str, str, int]:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.path_for(digest, suffix)
+        if os.path.exists(path):
+            # 참조 없는 최근 파일은 GC가 건너뛰므로, 재사용 시 수정 시각을 갱신
+            os.utime(path)
+            return digest, path, len(data)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return digest, path, len(data)
+
+    def put_file(self, src_path: str, suffix: str) -> Tuple[str, str, int]:
+        # 이미 디스크에 있는 파일은 읽어서 해시만 계산하고 저장소로 이동 (같은 내용이면 원본 삭제)
+        sha = hashlib.sha256()
+        with open(src_path, "rb") as f:
+            while chunk := f.read(self.HASH_CHUNK_SIZE):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        size = os.path.getsize(src_path)
+        path = self.path_for(digest, suffix)
+        if os.path.exists(path):
+            os.remove(src_path)
+            os.utime(path)
+            return digest, path, size
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        shutil.move(src_path, tmp_path)
+        os.replace(tmp_path, path)
+        return digest, path, size
+
+    def remove(self, digest: str, suffix: str):
+        try:
+            os.remove(self.path_for(digest, suffix))
+        except FileNotFoundError:
+            pass
+
+    def iter_artifacts(self) -> Iterator[Tuple[str, str, int, float]]:
+        # (digest, suffix, size, mtime)
+        for root, _, files in os.walk(self.root_dir):
+            for name in files:
+                if name.endswith(".tmp"):
+                    continue
+                digest, dot, suffix = name.partition(".")
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                yield digest, f"{dot}{suffix}", stat.st_size, stat.st_mtime
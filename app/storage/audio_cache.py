@@ -0,0 +1,28 @@
+import json
+import hashlib
+from typing import Optional
+from app.storage.disk_lru_cache import DiskLRUCache
+
+class AudioCache(DiskLRUCache):
+    """(프로바이더, 보이스, 모델, 텍스트) 해시를 키로 하는 디스크 기반 TTS 오디오 캐시 (항목은 MP3 파일 그대로)"""
+    SUFFIX = ".mp3"
+    NAME = "TTS"
+
+    def __init__(self, cache_dir: str = "generated/cache/tts", max_bytes: int = 1024 * 1024 * 1024,
+                 rescan_interval_seconds: float = 60.0):
+        super().__init__(cache_dir, max_bytes, rescan_interval_seconds)
+
+    @staticmethod
+    def make_key(provider: str, voice: str, model: str, text: str, **params) -> str:
+        payload = json.dumps(
+            {"provider": provider, "voice": voice, "model": model, "text": text, "params": params},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        return self._touch(key)
+
+    def put(self, key: str, data: bytes) -> str:
+        return self._store(key, data)
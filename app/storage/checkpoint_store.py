@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import uuid
+import logging
+from typing import List, Optional
+
+class CheckpointStore:
+    """(제목, 본문) 해시별로 목차, 챕터 스크립트, 챕터 오디오를 저장해 실패한 작업을 이어서 진행하게 하는 저장소
+
+    실행마다 <내용 해시>/<실행 ID>.<시도 번호> 디렉터리를 따로 쓰므로 같은 문서를 동시에 만드는 실행(fresh 요청 등)이
+    서로의 체크포인트를 지우지 않습니다. 실패한 실행은 자기 디렉터리를 <내용 해시>/resumable로 넘기고,
+    다음 실행 하나가 이를 원자적으로 가져가(rename) 이어서 진행합니다.
+
+    같은 작업의 다음 시도(임대가 만료돼 다른 워커가 가져간 경우 포함)는 이전 시도의 디렉터리를 자기 이름으로
+    옮겨 가져갑니다. 쓰기는 디렉터리를 새로 만들지 않으므로, 아직 실행 중이던 이전 시도는 그 뒤로 체크포인트를
+    쓰지 못하고 FileNotFoundError로 실패합니다 (두 워커가 같은 챕터 파일을 함께 쓰지 않음).
+    """
+    TOC_FILENAME = "toc.json"
+    RESUMABLE_DIRNAME = "resumable"
+
+    def __init__(self, root_dir: str = "generated/checkpoints", ttl_seconds: int = 7 * 86400,
+                 prune_interval_seconds: int = 3600):
+        self.root_dir = root_dir
+        self.ttl_seconds = ttl_seconds
+        self.prune_interval_seconds = prune_interval_seconds
+        self.last_prune_at = 0.0
+        self.logger = logging.getLogger(__name__)
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(title: str, content: str) -> str:
+        payload = json.dumps({"title": title, "content": content}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def claim(self, content_key: str, run_id: str, resume: bool = True, attempt: int = 1) -> str:
+        # 이 실행(시도)이 사용할 체크포인트 키를 반환. 같은 작업의 이전 시도 체크포인트를 먼저 가져오고,
+        # 없으면 resume일 때 실패한 다른 실행의 체크포인트를 가져옴
+        run_key = f"{content_key}/{run_id}.{attempt}"
+        content_dir = os.path.join(self.root_dir, content_key)
+        run_dir = os.path.join(self.root_dir, run_key)
+        os.makedirs(content_dir, exist_ok=True)
+        if os.path.exists(run_dir):
+            return run_key
+        previous = []
+        for name in os.listdir(content_dir):
+            prefix, _, previous_attempt = name.rpartition(".")
+            if prefix == run_id and previous_attempt.isdigit() and int(previous_attempt) < attempt:
+                previous.append((int(previous_attempt), name))
+        # 가장 최근 시도의 체크포인트를 가져오고 더 오래된 시도의 것은 정리
+        adopted = False
+        for _, name in sorted(previous, reverse=True):
+            path = os.path.join(content_dir, name)
+            if adopted:
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            try:
+                os.rename(path, run_dir)
+                adopted = True
+            except FileNotFoundError:
+                continue
+        if not adopted and resume:
+            try:
+                os.rename(os.path.join(content_dir, self.RESUMABLE_DIRNAME), run_dir)
+            except FileNotFoundError:
+                pass
+        os.makedirs(run_dir, exist_ok=True)
+        return run_key
+
+    def release(self, key: str, resumable: bool = False):
+        # 실행이 끝나면 자기 체크포인트만 정리. 실패했으면 다음 실행이 이어받을 수 있도록 넘겨 둠
+        run_dir = os.path.join(self.root_dir, key)
+        content_dir = os.path.dirname(run_dir)
+        if resumable and os.path.exists(run_dir):
+            resumable_dir = os.path.join(content_dir, self.RESUMABLE_DIRNAME)
+            # 이전에 넘겨진 체크포인트보다 방금 실패한 실행의 것이 최신
+            shutil.rmtree(resumable_dir, ignore_errors=True)
+            try:
+                os.rename(run_dir, resumable_dir)
+                return
+            except OSError as e:
+                self.logger.warning(f"Failed to keep checkpoint {key} for resume: {str(e)}")
+        self.clear(key)
+        try:
+            os.rmdir(content_dir)
+        except OSError:
+            # 다른 실행이 같은 문서의 체크포인트를 쓰고 있으면 남겨 둠
+            pass
+
+    def load_toc(self, key: str) -> Optional[List[dict]]:
+        try:
+            with open(self._path(key, self.TOC_FILENAME), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def save_toc(self, key: str, chapters: List[dict]):
+        # 새 목차가 저장되면 이전 목차 기준으로 만든 챕터 체크포인트는 더 이상 유효하지 않음 (디렉터리는 유지)
+        self._require_run_dir(key)
+        for name in os.listdir(os.path.join(self.root_dir, key)):
+            try:
+                os.remove(self._path(key, name))
+            except FileNotFoundError:
+                pass
+        self._write(key, self.TOC_FILENAME, json.dumps(chapters, ensure_ascii=False).encode("utf-8"))
+
+    def load_script(self, key: str, idx: int) -> Optional[str]:
+        try:
+            with open(self._path(key, f"chapter_{idx:03d}.txt"), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def save_script(self, key: str, idx: int, script: str):
+        self._write(key, f"chapter_{idx:03d}.txt", script.encode("utf-8"))
+
+    def load_audio(self, key: str, idx: int) -> Optional[str]:
+        path = self._path(key, f"chapter_{idx:03d}.mp3")
+        return path if os.path.exists(path) else None
+
+    def save_audio(self, key: str, idx: int, audio_path: str) -> str:
+        # 생성된 챕터 오디오를 체크포인트 디렉토리로 옮기고 새 경로를 반환
+        path = self._path(key, f"chapter_{idx:03d}.mp3")
+        self._require_run_dir(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        shutil.move(audio_path, tmp_path)
+        os.replace(tmp_path, path)
+        return path
+
+    def clear(self, key: str):
+        shutil.rmtree(os.path.join(self.root_dir, key), ignore_errors=True)
+
+    def maybe_prune(self):
+        if time.time() - self.last_prune_at >= self.prune_interval_seconds:
+            self.prune()
+
+    def prune(self):
+        # 보존 기간 동안 갱신되지 않은(재시도되지 않은) 체크포인트 삭제
+        self.last_prune_at = now = time.time()
+        for key in os.listdir(self.root_dir):
+            path = os.path.join(self.root_dir, key)
+            try:
+                if now - os.path.getmtime(path) > self.ttl_seconds:
+                    shutil.rmtree(path, ignore_errors=True)
+                    self.logger.info(f"Pruned expired checkpoint: {key}")
+            except FileNotFoundError:
+                continue
+
+    def _path(self, key: str, filename: str) -> str:
+        return os.path.join(self.root_dir, key, filename)
+
+    def _require_run_dir(self, key: str):
+        # 실행 디렉터리는 claim에서만 만들어지므로, 없으면 다음 시도가 가져간 것
+        if not os.path.isdir(os.path.join(self.root_dir, key)):
+            raise FileNotFoundError(f"Checkpoint {key} was taken over by a newer attempt")
+
+    def _write(self, key: str, filename: str, data: bytes):
+        self._require_run_dir(key)
+        path = self._path(key, filename)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,114 @@
+import os
+import time
+import threading
+import uuid
+import logging
+from collections import OrderedDict
+from typing import Optional
+
+class DiskLRUCache:
+    """용량 한도와 LRU 제거를 갖춘 디스크 캐시의 공통 부분 (키/값 인코딩은 하위 클래스가 담당)
+
+    항목은 <cache_dir>/<키 앞 두 글자>/<키><SUFFIX> 파일 하나로, 원자적으로(임시 파일 -> rename) 기록됩니다.
+    같은 디렉터리를 여러 프로세스(API 서버, 워커)가 함께 쓰므로 디스크가 기준입니다. 메모리의 LRU 인덱스에 없는
+    키는 디스크에서 다시 확인하고, 용량 한도는 디스크 사용량을 다시 집계해(mtime 순서가 프로세스 간 공통 LRU 순서)
+    적용합니다. 다른 프로세스가 쓴 양은 알 수 없으므로 rescan_interval_seconds마다 한 번은 디스크를 다시 집계합니다.
+    """
+    # 항목 파일 확장자와 로그에 표시할 캐시 이름
+    SUFFIX = ""
+    NAME = "disk"
+
+    def __init__(self, cache_dir: str, max_bytes: int, rescan_interval_seconds: float = 60.0):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.rescan_interval_seconds = rescan_interval_seconds
+        self.last_scan_at = 0.0
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(type(self).__module__)
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+        # key -> 파일 크기. 앞쪽일수록 오래 사용되지 않은 항목 (LRU 순서)
+        self.entries: "OrderedDict[str, int]" = OrderedDict()
+        self.total_bytes = 0
+        self._load_entries()
+
+    def _touch(self, key: str) -> Optional[str]:
+        # 항목이 있으면 경로를 반환하고 최근 사용으로 기록
+        path = self._path_for(key)
+        # 재시작 후나 다른 프로세스에서도 LRU 순서를 알 수 있도록 접근 시각을 mtime에 기록.
+        # 인덱스에 없는 키도 다른 프로세스가 저장했을 수 있으므로 디스크를 기준으로 확인
+        try:
+            os.utime(path)
+            size = os.path.getsize(path)
+        except FileNotFoundError:
+            # 다른 프로세스(또는 스레드)가 제거한 항목
+            with self.lock:
+                if key in self.entries:
+                    self.total_bytes -= self.entries.pop(key)
+            return None
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            else:
+                self.entries[key] = size
+                self.total_bytes += size
+        return path
+
+    def _store(self, key: str, data: bytes) -> str:
+        path = self._path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)
+            self.entries[key] = len(data)
+            self.total_bytes += len(data)
+            rescan = self.total_bytes > self.max_bytes or time.time() - self.last_scan_at >= self.rescan_interval_seconds
+        if rescan:
+            self._load_entries()
+        return path
+
+    def _remove(self, key: str):
+        with self.lock:
+            if key in self.entries:
+                self.total_bytes -= self.entries.pop(key)
+        try:
+            os.remove(self._path_for(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+            key, size = self.entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path_for(key))
+            except FileNotFoundError:
+                pass
+            self.logger.info(f"Evicted {self.NAME} cache entry: {key}")
+
+    def _path_for(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}{self.SUFFIX}")
+
+    def _load_entries(self):
+        # 디스크의 항목으로 인덱스를 다시 만들고 용량 한도를 적용 (다른 프로세스가 쓰거나 지운 항목 반영)
+        self.last_scan_at = time.time()
+        found = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(self.SUFFIX):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, name))
+                except FileNotFoundError:
+                    continue
+                found.append((stat.st_mtime, name[:-len(self.SUFFIX)], stat.st_size))
+        entries: "OrderedDict[str, int]" = OrderedDict((key, size) for _, key, size in sorted(found))
+        with self.lock:
+            self.entries = entries
+            self.total_bytes = sum(entries.values())
+            self._evict()
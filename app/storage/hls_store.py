@@ -0,0 +1,72 @@
+import os
+import re
+import shutil
+import uuid
+from typing import Iterator, Optional, Tuple
+
+class HLSStore:
+    """작업별 HLS 출력(플레이리스트, 세그먼트, 챕터 정보)을 보관하는 디렉터리 저장소
+
+    세그먼트는 작업 ID 아래에 한 번 쓰이고 바뀌지 않으므로 클라이언트/CDN이 오래 캐시할 수 있습니다.
+    """
+    MASTER = "master.m3u8"
+    PLAYLIST = "playlist.m3u8"
+    CHAPTERS = "chapters.json"
+    SEGMENT_PATTERN = "segment_%05d.ts"
+
+    # 외부 요청으로 열 수 있는 파일 이름 (경로 조작 방지)
+    FILENAME_RE = re.compile(r"^(?:master\.m3u8|playlist\.m3u8|chapters\.json|segment_\d{5}\.ts)$")
+    JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+    def __init__(self, root_dir: str = "generated/hls"):
+        self.root_dir = root_dir
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def dir_for(self, job_id: str) -> str:
+        return os.path.join(self.root_dir, job_id)
+
+    def exists(self, job_id: str) -> bool:
+        return os.path.exists(os.path.join(self.dir_for(job_id), self.PLAYLIST))
+
+    def path_for(self, job_id: str, filename: str) -> Optional[str]:
+        # 허용된 이름의 파일이 있을 때만 경로를 반환
+        if not self.JOB_ID_RE.match(job_id) or not self.FILENAME_RE.match(filename):
+            return None
+        path = os.path.join(self.dir_for(job_id), filename)
+        return path if os.path.isfile(path) else None
+
+    def create_staging_dir(self, job_id: str) -> str:
+        # 패키징이 끝나기 전의 출력이 제공되지 않도록 임시 디렉터리에 쓴 뒤 commit으로 교체
+        staging_dir = os.path.join(self.root_dir, f".{job_id}.{uuid.uuid4().hex}.tmp")
+        os.makedirs(staging_dir)
+        return staging_dir
+
+    def commit(self, job_id: str, staging_dir: str):
+        target_dir = self.dir_for(job_id)
+        if os.path.exists(target_dir):
+            shutil.rmtree(target_dir, ignore_errors=True)
+        os.replace(staging_dir, target_dir)
+
+    def discard(self, staging_dir: str):
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+    def iter_outputs(self) -> Iterator[Tuple[str, int, float]]:
+        # (디렉터리 이름, 바이트 수, 수정 시각). 이름이 '.'으로 시작하면 패키징 중(또는 중단된) 임시 디렉터리
+        for entry in os.scandir(self.root_dir):
+            if not entry.is_dir():
+                continue
+            try:
+                names = os.listdir(entry.path)
+                mtime = entry.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            total = 0
+            for name in names:
+                try:
+                    total += os.path.getsize(os.path.join(entry.path, name))
+                except FileNotFoundError:
+                    continue
+            yield entry.name, total, mtime
+
+    def remove_dir(self, name: str):
+        shutil.rmtree(os.path.join(self.root_dir, name), ignore_errors=True)
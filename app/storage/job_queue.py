@@ -0,0 +1,222 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+
+class JobQueue:
+    """여러 프로세스(와 공유 볼륨을 쓰는 여러 머신)가 함께 쓰는 SQLite 기반 영속 작업 대기열
+
+    기본 저널 모드(WAL)는 공유 메모리 인덱스를 쓰므로 한 머신 안의 프로세스끼리만 안전합니다.
+    여러 머신이 NFS 등 공유 볼륨의 파일을 함께 쓸 때는 journal_mode="delete"로 롤백 저널과 파일 잠금(fcntl)만
+    사용해야 하며, 이 경우 볼륨이 POSIX 바이트 범위 잠금을 지원해야 합니다 (NFSv4 등. 잠금이 없는 SMB 마운트는 불가).
+
+    워커는 작업을 일정 시간 임대(lease)해 실행하면서 heartbeat로 임대를 연장합니다. 워커가 죽어 임대가
+    만료되면 다른 워커가 작업을 다시 가져가고, 실패한 작업은 max_attempts까지 지수 백오프로 재시도됩니다.
+    상태 값은 PodcastJob과 같은 문자열(pending, running, completed, failed)을 사용합니다.
+    """
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    # wal: 한 머신 안의 여러 프로세스 / delete: 여러 머신이 공유 볼륨의 대기열 파일을 함께 쓸 때
+    JOURNAL_MODES = ("wal", "delete")
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS job_queue (
+            job_id TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL,
+            available_at REAL NOT NULL,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            stage TEXT,
+            progress_current INTEGER NOT NULL DEFAULT 0,
+            progress_total INTEGER NOT NULL DEFAULT 0,
+            result_path TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_job_queue_status ON job_queue (status, priority, available_at);
+        CREATE INDEX IF NOT EXISTS idx_job_queue_content_hash ON job_queue (content_hash, status);
+    """
+
+    def __init__(self, db_path: str = "generated/job_queue.sqlite3", max_attempts: int = 3,
+                 busy_timeout_seconds: float = 30.0, journal_mode: str = "wal"):
+        if journal_mode not in self.JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode: {journal_mode}")
+        self.max_attempts = max(1, max_attempts)
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # 트랜잭션은 직접 관리 (임대는 BEGIN IMMEDIATE로 다른 프로세스와 직렬화)
+        self.conn = sqlite3.connect(db_path, timeout=busy_timeout_seconds, check_same_thread=False,
+                                    isolation_level=None)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.conn.execute(f"PRAGMA journal_mode={journal_mode.upper()}")
+            # 우선순위 열이 없던 이전 버전의 대기열 파일은 열을 추가한 뒤 인덱스를 다시 만듦
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(job_queue)")}
+            if columns and "priority" not in columns:
+                self.conn.execute("ALTER TABLE job_queue ADD COLUMN priority INTEGER NOT NULL DEFAULT 0")
+                self.conn.execute("DROP INDEX IF EXISTS idx_job_queue_status")
+            self.conn.executescript(self.SCHEMA)
+
+    def enqueue(self, job_id: str, content_hash: str, payload: dict, max_attempts: Optional[int] = None,
+                priority: int = 0):
+        # priority가 작은 작업부터 임대됨 (같으면 먼저 실행 가능해진 순서)
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO job_queue (job_id, content_hash, payload, status, priority, max_attempts, available_at, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, content_hash, json.dumps(payload, ensure_ascii=False), self.PENDING, priority,
+                 max_attempts or self.max_attempts, now, now, now),
+            )
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[dict]:
+        # 실행 가능한 대기 작업 또는 임대가 만료된 실행 중 작업 하나를 가져옴
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT * FROM job_queue WHERE (status = ? AND available_at <= ?) "
+                "OR (status = ? AND lease_expires_at < ? AND attempts < max_attempts) "
+                "ORDER BY priority, available_at LIMIT 1",
+                (self.PENDING, now, self.RUNNING, now),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE job_queue SET status = ?, attempts = attempts + 1, lease_owner = ?, lease_expires_at = ?, "
+                "updated_at = ? WHERE job_id = ?",
+                (self.RUNNING, worker_id, now + lease_seconds, now, row["job_id"]),
+            )
+        record = self._to_record(row)
+        if row["status"] == self.RUNNING:
+            self.logger.warning(f"Reclaimed expired lease of job {row['job_id']} from {row['lease_owner']}")
+        record.update(status=self.RUNNING, attempts=row["attempts"] + 1, lease_owner=worker_id)
+        return record
+
+    def heartbeat(self, job_id: str, worker_id: str, lease_seconds: float, **progress) -> bool:
+        # 임대를 연장하고 진행 상황(stage, progress_current, progress_total)을 기록. 임대를 잃었으면 False
+        unknown = set(progress) - {"stage", "progress_current", "progress_total"}
+        if unknown:
+            raise ValueError(f"Unknown progress fields: {', '.join(sorted(unknown))}")
+        now = time.time()
+        assignments = "".join(f", {column} = ?" for column in progress)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                f"UPDATE job_queue SET lease_expires_at = ?, updated_at = ?{assignments} "
+                "WHERE job_id = ? AND lease_owner = ? AND status = ?",
+                (now + lease_seconds, now, *progress.values(), job_id, worker_id, self.RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def complete(self, job_id: str, worker_id: str, result_path: str) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE job_queue SET status = ?, result_path = ?, error = NULL, lease_owner = NULL, "
+                "lease_expires_at = NULL, updated_at = ? WHERE job_id = ? AND lease_owner = ? AND status = ?",
+                (self.COMPLETED, result_path, now, job_id, worker_id, self.RUNNING),
+            )
+        return cursor.rowcount == 1
+
+    def fail(self, job_id: str, worker_id: str, error: str, retry_delay_seconds: float) -> Optional[str]:
+        # 재시도 횟수가 남았으면 retry_delay_seconds 뒤에 다시 대기열로, 아니면 실패 처리. 바뀐 상태를 반환
+        now = time.time()
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT attempts, max_attempts FROM job_queue WHERE job_id = ? AND lease_owner = ? AND status = ?",
+                (job_id, worker_id, self.RUNNING),
+            ).fetchone()
+            if row is None:
+                return None
+            status = self.PENDING if row["attempts"] < row["max_attempts"] else self.FAILED
+            conn.execute(
+                "UPDATE job_queue SET status = ?, error = ?, available_at = ?, lease_owner = NULL, "
+                "lease_expires_at = NULL, updated_at = ? WHERE job_id = ?",
+                (status, error, now + retry_delay_seconds, now, job_id),
+            )
+        return status
+
+    def reap_expired(self) -> List[str]:
+        # 임대가 만료됐는데 재시도 횟수를 다 쓴 작업을 실패 처리하고 작업 ID 목록을 반환
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT job_id FROM job_queue WHERE status = ? AND lease_expires_at < ? AND attempts >= max_attempts",
+                (self.RUNNING, now),
+            ).fetchall()
+            job_ids = [row["job_id"] for row in rows]
+            conn.executemany(
+                "UPDATE job_queue SET status = ?, error = ?, lease_owner = NULL, lease_expires_at = NULL, "
+                "updated_at = ? WHERE job_id = ?",
+                [(self.FAILED, "Worker lease expired", now, job_id) for job_id in job_ids],
+            )
+        return job_ids
+
+    def prune(self, retention_seconds: float) -> int:
+        # 보존 기간이 지난 완료/실패 작업 삭제 (결과는 PodcastIndex에 남아 있음)
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "DELETE FROM job_queue WHERE status IN (?, ?) AND updated_at < ?",
+                (self.COMPLETED, self.FAILED, time.time() - retention_seconds),
+            )
+        return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self.get_many([job_id]).get(job_id)
+
+    def get_many(self, job_ids: Iterable[str]) -> Dict[str, dict]:
+        job_ids = list(job_ids)
+        if not job_ids:
+            return {}
+        placeholders = ", ".join("?" for _ in job_ids)
+        with self.lock:
+            rows = self.conn.execute(f"SELECT * FROM job_queue WHERE job_id IN ({placeholders})", job_ids).fetchall()
+        return {row["job_id"]: self._to_record(row) for row in rows}
+
+    def find_active(self, content_hash: str) -> Optional[dict]:
+        # 같은 내용으로 대기 중이거나 실행 중인 작업 (다른 프로세스가 넣은 작업 포함)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT * FROM job_queue WHERE content_hash = ? AND status IN (?, ?) ORDER BY created_at LIMIT 1",
+                (content_hash, self.PENDING, self.RUNNING),
+            ).fetchone()
+        return self._to_record(row) if row is not None else None
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self.lock:
+            rows = self.conn.execute("SELECT status, COUNT(*) AS count FROM job_queue GROUP BY status").fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+    def count_active(self) -> int:
+        counts = self.count_by_status()
+        return counts.get(self.PENDING, 0) + counts.get(self.RUNNING, 0)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    @staticmethod
+    def _to_record(row: sqlite3.Row) -> dict:
+        record = dict(row)
+        record["payload"] = json.loads(record["payload"])
+        return record
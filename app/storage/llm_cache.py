@@ -0,0 +1,46 @@
+import json
+import time
+import hashlib
+from typing import Optional
+from app.storage.disk_lru_cache import DiskLRUCache
+
+class LLMResponseCache(DiskLRUCache):
+    """(모델, 메시지, 함수 정의, 파라미터, 프롬프트 버전) 해시를 키로 하는 디스크 기반 chat completion 응답 캐시
+
+    항목은 생성 시각과 응답을 담은 JSON 파일이며, ttl_seconds가 지난 항목은 조회할 때 삭제합니다.
+    """
+    SUFFIX = ".json"
+    NAME = "LLM"
+
+    def __init__(self, cache_dir: str = "generated/cache/llm", ttl_seconds: int = 30 * 86400,
+                 max_bytes: int = 256 * 1024 * 1024, rescan_interval_seconds: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        super().__init__(cache_dir, max_bytes, rescan_interval_seconds)
+
+    @staticmethod
+    def make_key(prompt_version: str, **request) -> str:
+        payload = json.dumps(
+            {"prompt_version": prompt_version, "request": request},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        path = self._touch(key)
+        if path is None:
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._remove(key)
+            return None
+        if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+            self._remove(key)
+            return None
+        return entry["response"]
+
+    def put(self, key: str, response: dict):
+        data = json.dumps({"created_at": time.time(), "response": response}, ensure_ascii=False).encode("utf-8")
+        self._store(key, data)
@@ -0,0 +1,330 @@
+import os
+import json
+import time
+import socket
+import sqlite3
+import hashlib
+import threading
+import logging
+from typing import List, Optional
+from app.storage.artifact_store import ArtifactStore
+from app.storage.hls_store import HLSStore
+from app.storage.job_queue import JobQueue
+
+class PodcastIndex:
+    """팟캐스트 작업 메타데이터와 산출물 해시를 기록하는 SQLite 인덱스
+
+    여러 머신의 워커가 공유 볼륨의 인덱스를 함께 쓸 때는 JobQueue와 같이 journal_mode="delete"를 사용합니다.
+    """
+    SCRIPT_SUFFIX = ".txt"
+    AUDIO_SUFFIX = ".mp3"
+
+    COLUMNS = (
+        "url", "title", "content_hash", "status", "script_hash", "script_size",
+        "audio_hash", "audio_size", "chapter_count", "timings", "error",
+    )
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS podcasts (
+            job_id TEXT PRIMARY KEY,
+            url TEXT,
+            title TEXT NOT NULL,
+            content_hash TEXT NOT NULL,
+            status TEXT NOT NULL,
+            script_hash TEXT,
+            script_size INTEGER,
+            audio_hash TEXT,
+            audio_size INTEGER,
+            chapter_count INTEGER,
+            timings TEXT,
+            error TEXT,
+            owner TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_podcasts_content_hash ON podcasts (content_hash, status);
+        CREATE INDEX IF NOT EXISTS idx_podcasts_url ON podcasts (url, status);
+        CREATE INDEX IF NOT EXISTS idx_podcasts_accessed_at ON podcasts (accessed_at);
+        CREATE TABLE IF NOT EXISTS podcast_chapters (
+            job_id TEXT NOT NULL,
+            idx INTEGER NOT NULL,
+            title TEXT NOT NULL,
+            headings TEXT NOT NULL,
+            source_hash TEXT NOT NULL,
+            script_hash TEXT NOT NULL,
+            script_size INTEGER NOT NULL,
+            audio_hash TEXT NOT NULL,
+            audio_size INTEGER NOT NULL,
+            PRIMARY KEY (job_id, idx)
+        );
+    """
+
+    def __init__(self, db_path: str = "generated/podcasts.sqlite3", artifacts: Optional[ArtifactStore] = None,
+                 retention_seconds: int = 30 * 86400, max_bytes: int = 10 * 1024 * 1024 * 1024,
+                 gc_interval_seconds: int = 600, hls: Optional[HLSStore] = None, journal_mode: str = "wal"):
+        if journal_mode not in JobQueue.JOURNAL_MODES:
+            raise ValueError(f"Unknown journal mode: {journal_mode}")
+        self.artifacts = artifacts or ArtifactStore()
+        # 작업별 HLS 세그먼트/플레이리스트 (작업 기록이 삭제되면 함께 삭제)
+        self.hls = hls or HLSStore()
+        self.retention_seconds = retention_seconds
+        self.max_bytes = max_bytes
+        self.gc_interval_seconds = gc_interval_seconds
+        self.last_gc_at = 0.0
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # 작업 스레드 여러 개가 하나의 커넥션을 공유하므로 접근은 lock으로 직렬화
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock, self.conn:
+            self.conn.execute(f"PRAGMA journal_mode={journal_mode.upper()}")
+            # 작업 소유 프로세스 열이 없던 이전 버전의 인덱스 파일은 열을 추가
+            columns = {row["name"] for row in self.conn.execute("PRAGMA table_info(podcasts)")}
+            if columns and "owner" not in columns:
+                self.conn.execute("ALTER TABLE podcasts ADD COLUMN owner TEXT")
+            self.conn.executescript(self.SCHEMA)
+
+    @staticmethod
+    def content_hash(title: str, content: str, voice: str = "") -> str:
+        # voice는 TTS 설정 키(프로바이더, 음성, 모델). 설정이 바뀌면 같은 문서라도 기존 결과를 재사용하지 않음
+        payload = json.dumps({"title": title, "content": content, "voice": voice}, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def create_job(self, job_id: str, title: str, content_hash: str, url: Optional[str] = None,
+                   status: str = "pending"):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO podcasts (job_id, url, title, content_hash, status, owner, created_at, updated_at, "
+                "accessed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, url, title, content_hash, status, self._owner(), now, now, now),
+            )
+
+    def update_job(self, job_id: str, **fields):
+        unknown = set(fields) - set(self.COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown podcast index columns: {', '.join(sorted(unknown))}")
+        if "timings" in fields and fields["timings"] is not None:
+            fields["timings"] = json.dumps(fields["timings"])
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self.lock, self.conn:
+            self.conn.execute(
+                f"UPDATE podcasts SET {assignments}, updated_at = ? WHERE job_id = ?",
+                (*fields.values(), time.time(), job_id),
+            )
+
+    def save_result(self, job_id: str, script_text: str, audio_path: str, chapter_count: int,
+                    timings: Optional[dict] = None) -> str:
+        # 스크립트와 병합된 오디오를 저장소로 옮기고 해시/크기를 기록한 뒤 저장소 경로를 반환
+        script_hash, _, script_size = self.artifacts.put_bytes(script_text.encode("utf-8"), self.SCRIPT_SUFFIX)
+        audio_hash, stored_path, audio_size = self.artifacts.put_file(audio_path, self.AUDIO_SUFFIX)
+        self.update_job(
+            job_id,
+            script_hash=script_hash,
+            script_size=script_size,
+            audio_hash=audio_hash,
+            audio_size=audio_size,
+            chapter_count=chapter_count,
+            timings=timings,
+        )
+        return stored_path
+
+    def save_chapters(self, job_id: str, chapters: List[dict]):
+        """챕터별 스크립트/오디오를 저장소에 보관하고 원문 구성과 함께 기록 (다음 업데이트 때 재사용)
+
+        chapters 항목: title, headings, source_hash, script와 audio_path(새로 만든 오디오, 저장소로 이동)
+        또는 audio_hash/audio_size(이전 버전에서 재사용한 오디오)
+        """
+        rows = []
+        for idx, chapter in enumerate(chapters, start=1):
+            script_hash, _, script_size = self.artifacts.put_bytes(chapter["script"].encode("utf-8"), self.SCRIPT_SUFFIX)
+            if chapter.get("audio_hash"):
+                audio_hash, audio_size = chapter["audio_hash"], chapter["audio_size"]
+            else:
+                audio_hash, _, audio_size = self.artifacts.put_file(chapter["audio_path"], self.AUDIO_SUFFIX)
+            rows.append((
+                job_id, idx, chapter["title"], json.dumps(chapter.get("headings") or [], ensure_ascii=False),
+                chapter["source_hash"], script_hash, script_size, audio_hash, audio_size,
+            ))
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM podcast_chapters WHERE job_id = ?", (job_id,))
+            self.conn.executemany(
+                "INSERT INTO podcast_chapters (job_id, idx, title, headings, source_hash, script_hash, script_size, "
+                "audio_hash, audio_size) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+
+    def get_chapters(self, job_id: str) -> List[dict]:
+        # 챕터 구성과 산출물 경로 (산출물이 삭제된 챕터는 available=False, 구성 정보로만 사용)
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM podcast_chapters WHERE job_id = ? ORDER BY idx", (job_id,)
+            ).fetchall()
+        chapters = []
+        for row in rows:
+            chapter = dict(row)
+            chapter["headings"] = json.loads(chapter["headings"])
+            chapter["script_path"] = self.artifacts.path_for(chapter["script_hash"], self.SCRIPT_SUFFIX)
+            chapter["audio_path"] = self.artifacts.path_for(chapter["audio_hash"], self.AUDIO_SUFFIX)
+            chapter["available"] = os.path.exists(chapter["script_path"]) and os.path.exists(chapter["audio_path"])
+            chapters.append(chapter)
+        return chapters
+
+    def get(self, job_id: str) -> Optional[dict]:
+        return self._fetch_one("SELECT * FROM podcasts WHERE job_id = ?", (job_id,))
+
+    def find_completed(self, content_hash: Optional[str] = None, url: Optional[str] = None) -> Optional[dict]:
+        # 같은 내용(또는 같은 URL)으로 이미 완성된 결과 중 가장 최근 것
+        if content_hash is not None:
+            query, params = "SELECT * FROM podcasts WHERE content_hash = ? AND status = 'completed'", (content_hash,)
+        elif url is not None:
+            query, params = "SELECT * FROM podcasts WHERE url = ? AND status = 'completed'", (url,)
+        else:
+            raise ValueError("content_hash or url is required")
+        record = self._fetch_one(f"{query} ORDER BY created_at DESC LIMIT 1", params)
+        if record is not None and not self.artifacts.exists(record["audio_hash"], self.AUDIO_SUFFIX):
+            # 산출물이 수동으로 삭제된 경우 인덱스에서도 무효화
+            self.update_job(record["job_id"], status="failed", error="Artifact missing")
+            return None
+        return record
+
+    def find_latest(self, url: str) -> Optional[dict]:
+        return self._fetch_one("SELECT * FROM podcasts WHERE url = ? ORDER BY created_at DESC LIMIT 1", (url,))
+
+    def audio_path(self, record: dict) -> Optional[str]:
+        if not record.get("audio_hash"):
+            return None
+        return self.artifacts.path_for(record["audio_hash"], self.AUDIO_SUFFIX)
+
+    def script_path(self, record: dict) -> Optional[str]:
+        if not record.get("script_hash"):
+            return None
+        return self.artifacts.path_for(record["script_hash"], self.SCRIPT_SUFFIX)
+
+    def mark_interrupted(self) -> int:
+        # 작업을 만든 프로세스가 종료됐으면 진행 중이던 작업은 더 이상 완료될 수 없음.
+        # 같은 인덱스를 쓰는 다른 프로세스(uvicorn --workers 등)가 실행 중인 작업은 건드리지 않음
+        host, pid = self._owner().rsplit(":", 1)
+        with self.lock, self.conn:
+            owners = [
+                row["owner"] for row in self.conn.execute(
+                    "SELECT DISTINCT owner FROM podcasts WHERE status IN ('pending', 'running')"
+                )
+            ]
+            interrupted = []
+            for owner in owners:
+                # 소유자가 없는 이전 버전의 기록, 또는 이 머신에서 종료된 프로세스(PID가 재사용된 경우 포함)의 작업
+                owner_host, _, owner_pid = (owner or "").rpartition(":")
+                if owner is None or (owner_host == host and (owner_pid == pid or not self._process_alive(owner_pid))):
+                    interrupted.append(owner)
+            count = 0
+            for owner in interrupted:
+                count += self.conn.execute(
+                    "UPDATE podcasts SET status = 'failed', error = 'Interrupted by restart', updated_at = ? "
+                    "WHERE status IN ('pending', 'running') AND owner IS ?",
+                    (time.time(), owner),
+                ).rowcount
+        return count
+
+    def maybe_gc(self):
+        if time.time() - self.last_gc_at >= self.gc_interval_seconds:
+            self.gc()
+
+    def gc(self):
+        self.last_gc_at = now = time.time()
+        # 디렉터리 순회는 인덱스 lock 밖에서
+        hls_outputs = {name: (size, mtime) for name, size, mtime in self.hls.iter_outputs()}
+        with self.lock, self.conn:
+            # 1. 보존 기간 동안 조회되지 않은 완료/실패 작업 삭제
+            expired = self.conn.execute(
+                "DELETE FROM podcasts WHERE status IN ('completed', 'failed') AND accessed_at < ?",
+                (now - self.retention_seconds,),
+            ).rowcount
+
+            # 2. 전체 용량이 한도를 넘으면 가장 오래 조회되지 않은 완료 작업부터 삭제 (챕터 산출물 포함)
+            rows = self.conn.execute(
+                "SELECT job_id, script_hash, script_size, audio_hash, audio_size FROM podcasts "
+                "WHERE status = 'completed' ORDER BY accessed_at DESC"
+            ).fetchall()
+            chapter_artifacts = {}
+            for row in self.conn.execute(
+                "SELECT job_id, script_hash, script_size, audio_hash, audio_size FROM podcast_chapters"
+            ):
+                chapter_artifacts.setdefault(row["job_id"], []).extend(
+                    ((row["script_hash"], row["script_size"]), (row["audio_hash"], row["audio_size"]))
+                )
+            seen, total_bytes, evicted_jobs = set(), 0, []
+            for row in rows:
+                artifacts = [(row["script_hash"], row["script_size"]), (row["audio_hash"], row["audio_size"])]
+                for digest, size in artifacts + chapter_artifacts.get(row["job_id"], []):
+                    if digest and digest not in seen:
+                        seen.add(digest)
+                        total_bytes += size or 0
+                total_bytes += hls_outputs.get(row["job_id"], (0, 0))[0]
+                if total_bytes > self.max_bytes:
+                    evicted_jobs.append(row["job_id"])
+            self.conn.executemany("DELETE FROM podcasts WHERE job_id = ?", [(job_id,) for job_id in evicted_jobs])
+            self.conn.execute("DELETE FROM podcast_chapters WHERE job_id NOT IN (SELECT job_id FROM podcasts)")
+
+            referenced = {
+                digest
+                for query in (
+                    "SELECT script_hash, audio_hash FROM podcasts",
+                    "SELECT script_hash, audio_hash FROM podcast_chapters",
+                )
+                for row in self.conn.execute(query)
+                for digest in row
+                if digest
+            }
+            job_ids = {row["job_id"] for row in self.conn.execute("SELECT job_id FROM podcasts")}
+
+        # 3. 어떤 작업에서도 참조하지 않는 산출물 파일 삭제
+        #    (저장 직후 인덱스에 기록되기 전인 파일을 지우지 않도록 최근 파일은 건너뜀)
+        removed = 0
+        for digest, suffix, _, mtime in list(self.artifacts.iter_artifacts()):
+            if digest not in referenced and now - mtime > self.gc_interval_seconds:
+                self.artifacts.remove(digest, suffix)
+                removed += 1
+        # 삭제된 작업의 HLS 출력과 중단된 패키징의 임시 디렉터리 삭제
+        for name, (_, mtime) in hls_outputs.items():
+            if name not in job_ids and now - mtime > self.gc_interval_seconds:
+                self.hls.remove_dir(name)
+                removed += 1
+        if expired or evicted_jobs or removed:
+            self.logger.info(
+                f"Podcast index GC: {expired} expired, {len(evicted_jobs)} evicted, {removed} artifacts removed"
+            )
+
+    @staticmethod
+    def _owner() -> str:
+        # fork된 프로세스에서도 실제로 작업을 실행하는 프로세스를 가리키도록 호출할 때마다 계산
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def _process_alive(pid: str) -> bool:
+        if not pid.isdigit():
+            return False
+        if os.name == "nt":
+            # Windows의 os.kill은 signal 0도 프로세스를 종료시키므로 확인하지 않고 종료된 것으로 간주
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _fetch_one(self, query: str, params: tuple) -> Optional[dict]:
+        with self.lock, self.conn:
+            row = self.conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            record = dict(row)
+            # 조회된 작업은 GC 대상에서 밀려나도록 접근 시각 갱신
+            self.conn.execute("UPDATE podcasts SET accessed_at = ? WHERE job_id = ?", (time.time(), record["job_id"]))
+        record["timings"] = json.loads(record["timings"]) if record["timings"] else None
+        return record
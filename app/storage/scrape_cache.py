@@ -0,0 +1,59 @@
+import os
+import json
+import time
+import hashlib
+import uuid
+from typing import Optional
+
+class ScrapeCache:
+    """정규화된 URL을 키로 (제목, 추출된 본문)과 검증용 헤더를 저장하는 디스크 캐시"""
+
+    def __init__(self, cache_dir: str = "generated/cache/scrape", ttl_seconds: int = 3600):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def get(self, url: str) -> Optional[dict]:
+        path = self._path_for(url)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        # 해시 충돌 방지를 위해 저장된 URL도 비교
+        if entry.get("url") != url:
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("fetched_at", 0) < self.ttl_seconds
+
+    def put(self, url: str, title: str, content: str,
+            etag: Optional[str] = None, last_modified: Optional[str] = None) -> dict:
+        entry = {
+            "url": url,
+            "title": title,
+            "content": content,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fetched_at": time.time(),
+        }
+        self._write(url, entry)
+        return entry
+
+    def touch(self, entry: dict) -> dict:
+        # 304 Not Modified 응답을 받으면 본문은 그대로 두고 유효 기간만 갱신
+        entry = {**entry, "fetched_at": time.time()}
+        self._write(entry["url"], entry)
+        return entry
+
+    def _write(self, url: str, entry: dict):
+        path = self._path_for(url)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _path_for(self, url: str) -> str:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.json")
@@ -0,0 +1,312 @@
+import json
+import math
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Prometheus 텍스트 포맷(0.0.4)으로 노출하는 최소한의 메트릭 구현 (외부 의존성 없음)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _format_labels(labelnames: Sequence[str], labelvalues: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def _samples(self) -> List[str]:
+        with self.lock:
+            items = sorted(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def snapshot(self) -> Dict[Tuple[str, ...], float]:
+        with self.lock:
+            return dict(self.values)
+
+    @contextmanager
+    def track_inprogress(self, **labels) -> Iterator[None]:
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self) -> List[str]:
+        with self.lock:
+            items = sorted(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # key -> (버킷별 누적 전 개수, 합계, 개수)
+        self.values: Dict[Tuple[str, ...], Tuple[List[int], float, int]] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self.lock:
+            counts, total, count = self.values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for idx, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[idx] += 1
+                    break
+            self.values[key] = (counts, total + value, count + 1)
+
+    @contextmanager
+    def time(self, **labels) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self.lock:
+            items = sorted((key, (list(counts), total, count)) for key, (counts, total, count) in self.values.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """프로세스 하나의 메트릭 모음 (API 서버는 /metrics 라우트로, 워커 프로세스는 serve_metrics로 각자 노출)"""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self.lock:
+            if metric.name in self.metrics:
+                raise ValueError(f"Metric already registered: {metric.name}")
+            self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def serve_metrics(port: int, host: str = "0.0.0.0", registry: Optional[MetricsRegistry] = None) -> ThreadingHTTPServer:
+    # FastAPI 앱이 없는 프로세스(워커)의 메트릭을 별도 HTTP 서버의 /metrics로 노출 (데몬 스레드에서 실행)
+    registry = registry or REGISTRY
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # 스크레이프마다 접근 로그를 남기지 않음
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+STAGE_DURATION = REGISTRY.histogram(
+    "podcast_stage_duration_seconds", "Duration of pipeline stages", ("stage", "outcome")
+)
+STAGE_IN_PROGRESS = REGISTRY.gauge(
+    "podcast_stage_in_progress", "Pipeline stages currently running", ("stage",)
+)
+LLM_TOKENS = REGISTRY.counter(
+    "podcast_llm_tokens_total", "Tokens used by chat completions", ("model", "kind")
+)
+LLM_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "podcast_llm_requests_in_flight", "Chat completion requests currently in flight"
+)
+TTS_CHARACTERS = REGISTRY.counter(
+    "podcast_tts_characters_total", "Characters sent to the TTS provider", ("provider",)
+)
+TTS_REQUESTS_IN_FLIGHT = REGISTRY.gauge(
+    "podcast_tts_requests_in_flight", "TTS requests currently in flight", ("provider",)
+)
+CONCURRENCY_WAIT = REGISTRY.histogram(
+    "podcast_concurrency_wait_seconds", "Time spent waiting for a concurrency slot", ("resource",),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60),
+)
+BYTES_WRITTEN = REGISTRY.counter(
+    "podcast_bytes_written_total", "Bytes written to disk by pipeline stages", ("stage",)
+)
+LLM_CACHE_LOOKUPS = REGISTRY.counter(
+    "podcast_llm_cache_lookups_total", "Chat completion cache lookups", ("result",)
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "podcast_coalesced_requests_total", "Requests attached to an identical in-flight scrape or job", ("kind",)
+)
+QUOTA_WAIT = REGISTRY.histogram(
+    "podcast_quota_wait_seconds", "Time API calls spent waiting for rate-limit quota", ("provider", "priority"),
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60),
+)
+QUOTA_THROTTLED = REGISTRY.counter(
+    "podcast_quota_throttled_total", "API calls rejected with HTTP 429 by the provider", ("provider",)
+)
+JOB_QUEUE_DEPTH = REGISTRY.gauge(
+    "podcast_job_queue_jobs", "Jobs in the shared worker queue", ("status",)
+)
+
+
+class Span:
+    """파이프라인 단계 하나의 실행 기록. 종료 시 소요 시간과 속성을 구조화 로그로 남김"""
+
+    def __init__(self, stage: str, attributes: dict):
+        self.stage = stage
+        self.attributes = attributes
+        self.started = time.perf_counter()
+        # 하위 작업이 다른 스레드에서 같은 span에 값을 더할 수 있음
+        self.lock = threading.Lock()
+
+    def set(self, **attributes):
+        with self.lock:
+            self.attributes.update(attributes)
+
+    def add(self, **counts):
+        with self.lock:
+            for key, value in counts.items():
+                self.attributes[key] = self.attributes.get(key, 0) + value
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+_span_logger = logging.getLogger("app.spans")
+
+
+@contextmanager
+def span(stage: str, **attributes) -> Iterator[Span]:
+    current = Span(stage, attributes)
+    token = _current_span.set(current)
+    outcome = "success"
+    STAGE_IN_PROGRESS.inc(stage=stage)
+    try:
+        yield current
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        _current_span.reset(token)
+        STAGE_IN_PROGRESS.dec(stage=stage)
+        duration = time.perf_counter() - current.started
+        STAGE_DURATION.observe(duration, stage=stage, outcome=outcome)
+        _span_logger.info(json.dumps(
+            {"span": stage, "outcome": outcome, "duration_seconds": round(duration, 4), **current.attributes},
+            ensure_ascii=False,
+            default=str,
+        ))
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
@@ -0,0 +1,230 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+import logging
+import contextvars
+import httpx
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
+from app.utils.metrics import QUOTA_WAIT, QUOTA_THROTTLED
+
+T = TypeVar("T")
+
+# 작업 우선순위 (값이 작을수록 먼저 처리). 사용자가 기다리는 요청이 배치 작업보다 먼저 할당량을 받음
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 1
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BATCH: "batch"}
+
+_current_priority: contextvars.ContextVar[int] = contextvars.ContextVar("request_priority", default=PRIORITY_INTERACTIVE)
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    # 이 블록 안(과 context를 이어받은 하위 스레드)에서 나가는 API 호출의 우선순위 지정
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> int:
+    return _current_priority.get()
+
+
+def is_throttled(error: Exception) -> bool:
+    # 429 응답 (OpenAI RateLimitError, ElevenLabs ApiError, httpx 오류 등 status_code를 가진 예외)
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code == 429
+
+
+def request_not_sent(error: Exception) -> bool:
+    # 연결 단계에서 실패해 요청이 프로바이더에 도달하지 않은 오류 (SDK가 감싼 경우 원인 예외까지 확인).
+    # 읽기 타임아웃이나 5xx는 요청이 이미 처리(과금)되었을 수 있으므로 해당하지 않음
+    while error is not None:
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout, ConnectionRefusedError)):
+            return True
+        error = error.__cause__
+    return False
+
+
+def should_refund(error: Exception) -> bool:
+    # 프로바이더가 할당량을 차감하지 않은 실패(429, 보내기 전의 연결 실패)만 예약량을 돌려받음
+    return is_throttled(error) or request_not_sent(error)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    if not headers:
+        return None
+    retry_after = headers.get("retry-after")
+    try:
+        return float(retry_after) if retry_after else None
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """분당 한도(rate_per_minute)로 채워지는 토큰 버킷. 한 번에 쓸 수 있는 양은 burst_seconds 동안 채워지는 양"""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = 10.0):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self, amount: float, now: float) -> float:
+        # amount를 쓸 수 있을 때까지 남은 시간. 버킷보다 큰 요청은 가득 찼을 때 허용하고 부족분은 빚으로 남김
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.tokens >= needed else (needed - self.tokens) / self.rate
+
+    def consume(self, amount: float, now: float):
+        self._refill(now)
+        self.tokens -= amount
+
+    def adjust(self, delta: float):
+        # 실제 사용량과 예약량의 차이를 반영 (음수면 환불)
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class QuotaReservation:
+    def __init__(self, scheduler: "QuotaScheduler", cost: Dict[str, float]):
+        self.scheduler = scheduler
+        self.cost = cost
+
+    def settle(self, **actual: float):
+        # 응답을 받은 뒤 실제 사용량(예: usage.total_tokens)으로 예약량을 정산
+        self.scheduler._adjust({
+            resource: amount - self.cost.get(resource, 0)
+            for resource, amount in actual.items()
+        })
+
+    def refund(self):
+        # 실패한 호출의 예약량을 돌려줌 (재시도는 새로 예약하므로 실패한 시도분이 이중으로 차감되지 않도록).
+        # 프로바이더가 받아서 처리한 요청은 실패해도 할당량을 쓰므로 should_refund인 오류에만 사용
+        self.scheduler._adjust({resource: -amount for resource, amount in self.cost.items()})
+
+
+class QuotaScheduler:
+    """프로바이더(API 키)별 요청 수/토큰/글자 수 할당량 안에서 호출을 내보내는 스케줄러
+
+    호출은 우선순위(같으면 도착 순서)대로 줄을 서고, 모든 버킷에 여유가 생기면 하나씩 허용됩니다.
+    429를 받으면 retry-after(없으면 지수 백오프 + 지터)만큼 같은 프로바이더의 모든 호출을 멈추고 재시도해,
+    한도를 넘겨 실패와 대기를 반복하는 대신 한도 근처의 처리량을 유지합니다.
+    한도는 프로세스 단위이므로 워커 여러 개가 같은 키를 쓰면 워커 수로 나눈 값을 설정합니다.
+    """
+
+    def __init__(self, name: str, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                 characters_per_minute: float = 0, burst_seconds: float = 10.0, max_retries: int = 3,
+                 retry_base_delay: float = 1.0, max_retry_delay: float = 60.0):
+        self.name = name
+        # 0 이하인 한도는 제한하지 않음
+        limits = {"requests": requests_per_minute, "tokens": tokens_per_minute, "characters": characters_per_minute}
+        self.buckets: Dict[str, TokenBucket] = {
+            resource: TokenBucket(limit, burst_seconds) for resource, limit in limits.items() if limit and limit > 0
+        }
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.max_retry_delay = max_retry_delay
+        # 429 이후 이 시각까지는 새 호출을 내보내지 않음
+        self.paused_until = 0.0
+        self.waiters: List[Tuple[int, int]] = []
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.logger = logging.getLogger(__name__)
+
+    def acquire(self, **cost: float) -> QuotaReservation:
+        cost = {"requests": 1, **cost}
+        priority = current_priority()
+        ticket = (priority, next(self.sequence))
+        started = time.monotonic()
+        with self.condition:
+            heapq.heappush(self.waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    # 줄의 맨 앞 호출만 할당량을 받을 수 있음 (나머지는 앞 호출이 나갈 때까지 대기)
+                    delay = self._admission_delay(cost, now) if self.waiters[0] == ticket else None
+                    if delay == 0:
+                        break
+                    self.condition.wait(delay)
+                for resource, amount in cost.items():
+                    if resource in self.buckets:
+                        self.buckets[resource].consume(amount, now)
+            finally:
+                self.waiters.remove(ticket)
+                heapq.heapify(self.waiters)
+                self.condition.notify_all()
+        QUOTA_WAIT.observe(
+            time.monotonic() - started, provider=self.name, priority=PRIORITY_NAMES.get(priority, str(priority))
+        )
+        return QuotaReservation(self, cost)
+
+    def run(self, fn: Callable[[], T], retryable: Tuple[type, ...] = (),
+            usage: Optional[Callable[[T], Dict[str, float]]] = None, **cost: float) -> T:
+        # 할당량을 받아 fn을 호출하고, 429와 retryable 오류는 재시도. usage는 응답에서 실제 사용량을 계산
+        attempt = 0
+        while True:
+            reservation = self.acquire(**cost)
+            try:
+                result = fn()
+            except Exception as e:
+                if should_refund(e):
+                    reservation.refund()
+                attempt += 1
+                delay = self.retry_delay(e, attempt, retryable)
+                if delay is None:
+                    raise
+                self.logger.warning(
+                    f"{self.name} call failed ({type(e).__name__}), retrying in {delay:.1f}s ({attempt}/{self.max_retries})"
+                )
+                time.sleep(delay)
+                continue
+            if usage is not None:
+                reservation.settle(**usage(result))
+            return result
+
+    def retry_delay(self, error: Exception, attempt: int, retryable: Tuple[type, ...] = ()) -> Optional[float]:
+        # 재시도할 오류면 대기 시간을, 아니면(또는 재시도 횟수를 다 쓰면) None을 반환
+        throttled = is_throttled(error)
+        if not (throttled or (retryable and isinstance(error, retryable))) or attempt > self.max_retries:
+            return None
+        delay = retry_after_seconds(error)
+        if delay is None:
+            # 동시에 429를 받은 호출들이 같은 시각에 몰리지 않도록 지터 추가
+            delay = min(self.max_retry_delay, self.retry_base_delay * (2 ** (attempt - 1)))
+            delay += random.uniform(0, self.retry_base_delay)
+        if throttled:
+            QUOTA_THROTTLED.inc(provider=self.name)
+            self.pause(delay)
+        return delay
+
+    def pause(self, seconds: float):
+        # 한도를 넘었으므로 같은 프로바이더로 나가는 모든 호출을 잠시 멈춤
+        with self.condition:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.condition.notify_all()
+
+    def _admission_delay(self, cost: Dict[str, float], now: float) -> float:
+        delay = max(0.0, self.paused_until - now)
+        for resource, amount in cost.items():
+            bucket = self.buckets.get(resource)
+            if bucket is not None:
+                delay = max(delay, bucket.delay(amount, now))
+        return delay
+
+    def _adjust(self, deltas: Dict[str, float]):
+        with self.condition:
+            for resource, delta in deltas.items():
+                if resource in self.buckets and delta:
+                    self.buckets[resource].adjust(delta)
+            self.condition.notify_all()
@@ -0,0 +1,23 @@
+import time
+import threading
+from urllib.parse import urlsplit
+
+class HostRateLimiter:
+    """호스트별로 요청 사이에 최소 간격을 두는 스레드 안전 rate limiter"""
+
+    def __init__(self, min_interval_seconds: float):
+        self.min_interval = min_interval_seconds
+        self.next_allowed: dict[str, float] = {}
+        self.lock = threading.Lock()
+
+    def wait(self, url: str):
+        if self.min_interval <= 0:
+            return
+        host = urlsplit(url).netloc.lower()
+        # 다음 요청 가능 시각을 먼저 예약하고, 잠금 밖에서 대기
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_allowed.get(host, 0.0))
+            self.next_allowed[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
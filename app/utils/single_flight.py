@@ -0,0 +1,36 @@
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+from app.utils.metrics import COALESCED_REQUESTS
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 하나로 합쳐, 먼저 시작된 호출의 결과(또는 예외)를 함께 돌려주는 도구"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls: Dict[Hashable, Future] = {}
+        self.lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self.lock:
+            future = self.calls.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self.calls[key] = Future()
+
+        if not is_leader:
+            COALESCED_REQUESTS.inc(kind=self.name)
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            # 완료된 뒤에 들어온 호출은 결과를 공유하지 않고 새로 실행
+            with self.lock:
+                self.calls.pop(key, None)
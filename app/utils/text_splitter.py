@@ -0,0 +1,71 @@
+import re
+from typing import List
+
+# 문장 끝 부호("다.", "요?", "…" 등) 뒤의 공백과 줄바꿈을 문장 경계로 사용
+_SENTENCE_BOUNDARY = re.compile(r'(?:(?<=[.!?…。！？])|(?<=[.!?…。！？]["\'”’)\]]))\s+')
+_PARAGRAPH_BOUNDARY = re.compile(r'\n\s*\n+')
+_CLAUSE_BOUNDARY = re.compile(r'(?<=[,，、;:])\s+')
+_WORD_BOUNDARY = re.compile(r'\s+')
+
+
+def split_sentences(text: str) -> List[str]:
+    sentences = []
+    for line in text.split("\n"):
+        sentences.extend(sentence.strip() for sentence in _SENTENCE_BOUNDARY.split(line) if sentence.strip())
+    return sentences
+
+
+def pack_chunks(text: str, max_chars: int) -> List[str]:
+    """문단 > 문장 > 쉼표/공백 순으로 경계를 지키면서 max_chars 이하의 청크로 묶음"""
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    units = []
+    for paragraph in _PARAGRAPH_BOUNDARY.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            units.append((paragraph, "\n\n"))
+            continue
+        for sentence in split_sentences(paragraph):
+            if len(sentence) <= max_chars:
+                units.append((sentence, " "))
+            else:
+                units.extend((piece, " ") for piece in _split_hard(sentence, max_chars))
+
+    chunks, current = [], ""
+    for unit, separator in units:
+        candidate = f"{current}{separator}{unit}" if current else unit
+        if len(candidate) <= max_chars:
+            current = candidate
+        else:
+            chunks.append(current)
+            current = unit
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_hard(sentence: str, max_chars: int) -> List[str]:
+    # 문장 하나가 한도를 넘는 경우 쉼표나 공백 위치에서 자르고, 그마저 없으면 글자 수로 자름
+    pieces = []
+    while len(sentence) > max_chars:
+        cut = _last_boundary(_CLAUSE_BOUNDARY, sentence, max_chars)
+        if cut <= 0:
+            cut = _last_boundary(_WORD_BOUNDARY, sentence, max_chars)
+        if cut <= 0:
+            cut = max_chars
+        pieces.append(sentence[:cut].strip())
+        sentence = sentence[cut:].strip()
+    if sentence:
+        pieces.append(sentence)
+    return pieces
+
+
+def _last_boundary(pattern: re.Pattern, text: str, max_chars: int) -> int:
+    cut = -1
+    for match in pattern.finditer(text, 0, max_chars + 1):
+        cut = match.start()
+    return cut
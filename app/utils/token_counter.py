@@ -0,0 +1,29 @@
+import re
+import math
+from functools import lru_cache
+
+# tiktoken이 설치되어 있지 않으면 문자 종류별 근사치로 토큰 수를 추정
+_HANGUL_PATTERN = re.compile(r'[가-힣ㄱ-ㆎ]')
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 한글은 대략 글자당 0.7 토큰, 그 외 문자는 4글자당 1 토큰으로 추정
+    hangul = len(_HANGUL_PATTERN.findall(text))
+    return math.ceil(hangul * 0.7 + (len(text) - hangul) / 4)
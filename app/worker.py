@@ -0,0 +1,236 @@
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Set
+from app.services.podcast_maker import PodcastMaker
+from app.storage.job_queue import JobQueue
+from app.utils.metrics import serve_metrics, span
+from app.utils.quota_scheduler import request_priority
+
+# 로깅 설정
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    handlers=[logging.StreamHandler()],
+)
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """공유 작업 대기열(JobQueue)에서 작업을 임대해 실행하는 워커 프로세스
+
+    API 서버를 JOB_BACKEND=queue로 띄우면 작업은 대기열에만 쌓이고, 같은 generated 디렉터리(대기열, 인덱스,
+    저장소)를 보는 워커를 코어/머신 수만큼 실행해 처리량을 웹 서버와 별개로 늘릴 수 있습니다.
+    여러 머신이 공유 볼륨의 generated 디렉터리를 쓸 때는 모든 프로세스를 SQLITE_JOURNAL_MODE=delete로 실행합니다
+    (WAL은 한 머신 안에서만 동작).
+    메트릭은 프로세스별로 집계되므로 워커의 단계별 시간, 토큰, TTS 사용량은 API 서버의 /metrics에 나타나지 않습니다.
+    --metrics-port(WORKER_METRICS_PORT)를 지정하면 워커마다 별도 포트의 /metrics로 노출하며, 한 머신에서 여러 워커를
+    실행하면 포트를 각각 다르게 지정해 모두 스크레이프 대상으로 등록합니다.
+    """
+
+    def __init__(self, podcast_maker: PodcastMaker, queue: JobQueue, concurrency: int = 2,
+                 lease_seconds: float = 120.0, poll_interval_seconds: float = 1.0,
+                 retry_base_delay_seconds: float = 30.0, retention_seconds: int = 86400,
+                 maintenance_interval_seconds: float = 60.0):
+        self.podcast_maker = podcast_maker
+        self.index = podcast_maker.index
+        self.queue = queue
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(1, concurrency)
+        self.lease_seconds = lease_seconds
+        # 임대 만료 전에 여러 번 연장할 수 있도록 임대 시간의 1/3 간격으로 heartbeat
+        self.heartbeat_interval_seconds = lease_seconds / 3
+        self.poll_interval_seconds = poll_interval_seconds
+        self.retry_base_delay_seconds = retry_base_delay_seconds
+        self.retention_seconds = retention_seconds
+        self.maintenance_interval_seconds = maintenance_interval_seconds
+        # 스크립트/TTS는 API 호출 대기 위주이므로 작업은 스레드에서 실행 (병합은 PodcastMaker.merge_executor)
+        self.executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="podcast-worker")
+        self.slots = threading.BoundedSemaphore(self.concurrency)
+        self.active: Set[str] = set()
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.finished = threading.Event()
+
+    def run(self):
+        logger.info(f"Worker {self.worker_id} started (concurrency {self.concurrency})")
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name="worker-heartbeat", daemon=True)
+        heartbeat.start()
+        last_maintenance = 0.0
+        try:
+            while not self.stop_event.is_set():
+                if time.monotonic() - last_maintenance >= self.maintenance_interval_seconds:
+                    self._maintain()
+                    last_maintenance = time.monotonic()
+                if not self.slots.acquire(timeout=self.poll_interval_seconds):
+                    continue
+                try:
+                    record = self.queue.lease(self.worker_id, self.lease_seconds)
+                except Exception as e:
+                    logger.warning(f"Failed to lease a job: {str(e)}")
+                    record = None
+                if record is None:
+                    self.slots.release()
+                    self.stop_event.wait(self.poll_interval_seconds)
+                    continue
+                with self.lock:
+                    self.active.add(record["job_id"])
+                self.executor.submit(self._execute, record)
+        finally:
+            # 새 작업은 더 가져오지 않고 실행 중인 작업이 끝날 때까지 임대를 유지
+            logger.info(f"Worker {self.worker_id} stopping, waiting for {len(self.active)} running jobs")
+            self.executor.shutdown(wait=True)
+            self.finished.set()
+            heartbeat.join()
+            logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self):
+        self.stop_event.set()
+
+    def _execute(self, record: dict):
+        job_id = record["job_id"]
+        payload = record["payload"]
+        attempt = record["attempts"]
+        logger.info(f"Job {job_id} leased (attempt {attempt}/{record['max_attempts']}): {payload['title']}")
+        self._record_status(job_id, status=JobQueue.RUNNING, error=None)
+        try:
+            with span("podcast", job_id=job_id, characters=len(payload["content"]), attempt=attempt), \
+                    request_priority(record["priority"]):
+                result_path = self.podcast_maker.create_podcast(
+                    payload["title"],
+                    payload["content"],
+                    progress_callback=lambda stage, current, total: self._report_progress(job_id, stage, current, total),
+                    job_id=job_id,
+                    fresh=payload.get("fresh", False),
+                    base_job_id=payload.get("base_job_id"),
+                    attempt=attempt,
+                )
+            if self.queue.complete(job_id, self.worker_id, result_path):
+                self._record_status(job_id, status=JobQueue.COMPLETED, error=None)
+                logger.info(f"Job {job_id} completed: {result_path}")
+            else:
+                logger.warning(f"Job {job_id} finished after its lease was taken over, discarding result")
+        except Exception as e:
+            # 체크포인트가 남아 있으므로 재시도는 완료된 목차/챕터부터 이어서 진행
+            delay = self.retry_base_delay_seconds * 2 ** (attempt - 1)
+            status = self.queue.fail(job_id, self.worker_id, str(e), delay)
+            if status == JobQueue.PENDING:
+                logger.warning(f"Job {job_id} failed (attempt {attempt}), retrying in {delay:.0f}s: {str(e)}")
+            elif status == JobQueue.FAILED:
+                logger.error(f"Job {job_id} failed: {str(e)}")
+            if status is not None:
+                self._record_status(job_id, status=status, error=str(e))
+        finally:
+            with self.lock:
+                self.active.discard(job_id)
+            self.slots.release()
+
+    def _report_progress(self, job_id: str, stage: str, current: int, total: int):
+        # 진행 상황 기록이 임대 연장도 겸함
+        if not self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds,
+                                    stage=stage, progress_current=current, progress_total=total):
+            logger.warning(f"Lost lease of job {job_id}")
+
+    def _heartbeat_loop(self):
+        while not self.finished.wait(self.heartbeat_interval_seconds):
+            with self.lock:
+                job_ids = list(self.active)
+            for job_id in job_ids:
+                try:
+                    if not self.queue.heartbeat(job_id, self.worker_id, self.lease_seconds):
+                        logger.warning(f"Lost lease of job {job_id}")
+                except Exception as e:
+                    logger.warning(f"Heartbeat failed for job {job_id}: {str(e)}")
+
+    def _maintain(self):
+        # 임대가 만료된 채 재시도 횟수를 다 쓴 작업을 실패 처리하고 오래된 완료 기록을 정리
+        try:
+            for job_id in self.queue.reap_expired():
+                logger.error(f"Job {job_id} failed: worker lease expired")
+                self._record_status(job_id, status=JobQueue.FAILED, error="Worker lease expired")
+            self.queue.prune(self.retention_seconds)
+        except Exception as e:
+            logger.warning(f"Queue maintenance failed: {str(e)}")
+
+    def _record_status(self, job_id: str, **fields):
+        if self.index is None:
+            return
+        try:
+            self.index.update_job(job_id, **fields)
+        except Exception as e:
+            logger.warning(f"Failed to record job {job_id} status: {str(e)}")
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.worker", description="공유 대기열의 팟캐스트 작업을 실행하는 워커")
+    parser.add_argument("--concurrency", type=int, default=int(os.getenv("WORKER_CONCURRENCY", "2")),
+                        help="동시에 실행할 작업 수")
+    parser.add_argument("--lease-seconds", type=float, default=float(os.getenv("JOB_LEASE_SECONDS", "120")),
+                        help="작업 임대 시간 (초, heartbeat 없이 이 시간이 지나면 다른 워커가 가져감)")
+    parser.add_argument("--retry-delay", type=float, default=float(os.getenv("JOB_RETRY_BASE_DELAY_SECONDS", "30")),
+                        help="첫 재시도까지의 대기 시간 (초, 재시도마다 두 배)")
+    parser.add_argument("--merge-processes", type=int,
+                        default=int(os.getenv("WORKER_MERGE_PROCESSES", str(os.cpu_count() or 1))),
+                        help="오디오 병합에 쓸 프로세스 수 (0이면 작업 스레드에서 병합)")
+    parser.add_argument("--poll-interval", type=float, default=1.0, help="대기열 확인 주기 (초)")
+    parser.add_argument("--metrics-port", type=int, default=int(os.getenv("WORKER_METRICS_PORT", "0")),
+                        help="이 워커의 메트릭을 /metrics로 노출할 포트 (0이면 노출하지 않음)")
+    parser.add_argument("--metrics-host", default=os.getenv("WORKER_METRICS_HOST", "0.0.0.0"),
+                        help="메트릭 서버가 바인딩할 주소")
+    args = parser.parse_args(argv)
+
+    # 환경 변수 기반 파이프라인 설정은 API 서버와 동일하게 app.pipeline에서 생성
+    from app.pipeline import podcast_maker, job_queue, bind_api_clients, create_merge_executor
+    from app.services.api_clients import ApiClientManager
+
+    if job_queue is None:
+        logger.error("Workers require JOB_BACKEND=queue")
+        return 2
+
+    if podcast_maker.merge_executor is None and args.merge_processes > 0:
+        podcast_maker.merge_executor = create_merge_executor(args.merge_processes)
+
+    api_clients = ApiClientManager.from_env()
+    bind_api_clients(api_clients)
+    worker = Worker(
+        podcast_maker,
+        job_queue,
+        concurrency=args.concurrency,
+        lease_seconds=args.lease_seconds,
+        poll_interval_seconds=args.poll_interval,
+        retry_base_delay_seconds=args.retry_delay,
+    )
+
+    def handle_signal(signum, frame):
+        # 첫 신호는 실행 중인 작업을 마치고 종료, 두 번째 신호는 즉시 종료 (임대가 만료되면 다른 워커가 재시도)
+        logger.info(f"Received signal {signum}, finishing running jobs")
+        signal.signal(signum, signal.SIG_DFL)
+        worker.stop()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = serve_metrics(args.metrics_port, args.metrics_host)
+        logger.info(f"Serving worker metrics on {args.metrics_host}:{args.metrics_port}/metrics")
+    try:
+        worker.run()
+    finally:
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        if podcast_maker.merge_executor is not None:
+            podcast_maker.merge_executor.shutdown(wait=True)
+        api_clients.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+"""나무위키 HTML 추출 백엔드 비교 벤치마크
+
+저장된 HTML 픽스처에 대해 각 추출 백엔드의 결과가 커밋된 기대 출력(<픽스처>.expected.json)과
+같은지 확인하고, 파싱 시간과 최대 메모리 사용량을 비교합니다.
+lxml은 C 라이브러리에서 메모리를 할당해 tracemalloc으로는 보이지 않으므로, 메모리는 백엔드마다
+새 프로세스에서 한 번 추출하고 최대 RSS(ru_maxrss)가 추출 전보다 얼마나 늘었는지로 측정합니다.
+
+    python -m benchmarks.bench_namuwiki_extract --scale 200
+    python -m benchmarks.bench_namuwiki_extract saved_page.html --runs 10
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from app.services.namuwiki_extractors import EXTRACTORS, get_extractor
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "namuwiki")
+BLOCKS_START = "<!-- blocks:start -->"
+BLOCKS_END = "<!-- blocks:end -->"
+
+
+def load_fixture(path: str, scale: int) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    # 큰 문서를 흉내 내기 위해 본문 블록 구간을 scale배로 반복
+    if scale > 1 and BLOCKS_START in html and BLOCKS_END in html:
+        head, rest = html.split(BLOCKS_START, 1)
+        blocks, tail = rest.split(BLOCKS_END, 1)
+        html = head + blocks * scale + tail
+    return html
+
+
+def load_expected(path: str, scale: int):
+    # 기대 출력: 제목과 본문 블록 구간 하나에서 추출되는 블록 목록 (scale배로 반복하면 블록도 그만큼 반복됨)
+    expected_path = f"{os.path.splitext(path)[0]}.expected.json"
+    if not os.path.exists(expected_path):
+        return None
+    with open(expected_path, "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    return expected["title"], "\n\n".join(expected["blocks"] * max(1, scale))
+
+
+def measure(extractor, html: str, runs: int):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        extractor.extract(html)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), min(timings)
+
+
+def max_rss_bytes() -> int:
+    # ru_maxrss는 Linux에서 KiB, macOS에서 바이트 단위
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def measure_rss(backend: str, path: str, scale: int):
+    # 다른 백엔드가 늘려 놓은 최대 RSS의 영향을 받지 않도록 백엔드마다 새 프로세스에서 측정
+    if resource is None:
+        return None
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_namuwiki_extract", path, "--scale", str(scale), "--rss-child", backend],
+        cwd=PROJECT_DIR, capture_output=True, text=True, check=True,
+    )
+    return int(result.stdout.strip())
+
+
+def rss_child(backend: str, path: str, scale: int):
+    # 픽스처를 읽고 백엔드를 불러온 뒤(추출 전)와 한 번 추출한 뒤의 최대 RSS 차이를 출력
+    html = load_fixture(path, scale)
+    extractor = get_extractor(backend)
+    before = max_rss_bytes()
+    extractor.extract(html)
+    print(max_rss_bytes() - before)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="HTML 픽스처 경로 (기본: benchmarks/fixtures/namuwiki/*.html)")
+    parser.add_argument("--scale", type=int, default=50, help="본문 블록 반복 횟수")
+    parser.add_argument("--runs", type=int, default=5, help="백엔드별 반복 측정 횟수")
+    parser.add_argument("--rss-child", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.rss_child:
+        rss_child(args.rss_child, args.paths[0], args.scale)
+        return 0
+
+    paths = args.paths or sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+    # 자식 프로세스의 ru_maxrss는 exec 이전(부모 프로세스)의 최대 RSS를 이어받으므로,
+    # 이 프로세스가 픽스처를 읽고 백엔드를 불러오기 전에 메모리 측정을 모두 실행
+    peaks = {(path, name): measure_rss(name, path, args.scale) for path in paths for name in EXTRACTORS}
+    extractors = [get_extractor(name) for name in EXTRACTORS]
+    mismatches = 0
+
+    for path in paths:
+        html = load_fixture(path, args.scale)
+        expected = load_expected(path, args.scale)
+        print(f"\n{os.path.basename(path)} ({len(html.encode('utf-8')) / 1024:.0f} KiB)")
+        print(f"{'backend':<12} {'median ms':>10} {'best ms':>10} {'peak MiB':>10} {'chars':>8}  output")
+
+        for extractor in extractors:
+            extracted = extractor.extract(html)
+            if expected is None:
+                status = "no expected output"
+            elif extracted == expected:
+                status = "expected"
+            else:
+                status = "MISMATCH"
+                mismatches += 1
+            median, best = measure(extractor, html, args.runs)
+            peak = peaks[path, extractor.name]
+            peak_text = f"{peak / (1024 * 1024):>10.1f}" if peak is not None else f"{'n/a':>10}"
+            print(
+                f"{extractor.name:<12} {median * 1000:>10.1f} {best * 1000:>10.1f} "
+                f"{peak_text} {len(extracted[1]):>8}  {status}"
+            )
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
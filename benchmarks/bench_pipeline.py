@@ -0,0 +1,272 @@
+"""팟캐스트 파이프라인 전 구간 오프라인 벤치마크
+
+저장된 나무위키 HTML, 녹화된 chat completion 응답, fake TTS 오디오를
+NamuWikiScraper -> TextCleaner -> ScriptMaker -> AudioMaker -> PodcastMaker 순서로
+그대로 흘려보내고, 단계별 지연 시간 분위수(p50/p95/p99), 동시 작업 N개에서의 처리량,
+단계별 최대 RSS를 보고합니다. 네트워크와 API 키 없이 실행됩니다 (병합에는 ffmpeg 필요).
+
+    python -m benchmarks.bench_pipeline --jobs 16 --concurrency 4
+    python -m benchmarks.bench_pipeline --save-baseline baseline.json
+    python -m benchmarks.bench_pipeline --baseline baseline.json --max-regression 0.25
+"""
+import argparse
+import json
+import logging
+import math
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+from app.services.namuwiki_scrape import NamuWikiScraper
+from app.services.namuwiki_data_extract import TextCleaner
+from app.services.script_maker import ScriptMaker
+from app.services.audio_maker import AudioMaker
+from app.services.audio_merger import AudioMerger
+from app.services.podcast_maker import PodcastMaker
+from app.services.tts_providers import FakeTTSProvider
+from app.utils.metrics import STAGE_IN_PROGRESS
+from benchmarks.bench_namuwiki_extract import load_fixture, FIXTURE_DIR as HTML_FIXTURE_DIR
+from benchmarks.replay import DEFAULT_CHAT_FIXTURE, FixtureHTTPAdapter, RecordedChatClient
+
+STAGES = ("scrape", "clean", "toc", "chapter_script", "chapter_tts", "merge", "export", "podcast", "job")
+
+
+def percentile(values: List[float], q: float) -> float:
+    # nearest-rank 방식
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class SpanCollector(logging.Handler):
+    """app.spans 로거의 JSON 로그를 받아 단계별 소요 시간을 모음"""
+
+    def __init__(self):
+        super().__init__(level=logging.INFO)
+        self.durations: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        # logging.Handler가 이미 self.lock을 사용하므로 별도 이름으로 둠
+        self.samples_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            data = json.loads(record.getMessage())
+        except ValueError:
+            return
+        with self.samples_lock:
+            self.durations[data["span"]].append(data["duration_seconds"])
+            if data.get("outcome") != "success":
+                self.errors[data["span"]] += 1
+
+    def add(self, stage: str, duration: float):
+        with self.samples_lock:
+            self.durations[stage].append(duration)
+
+
+def read_rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        # /proc가 없는 환경에서는 프로세스 최대 RSS로 대체 (macOS는 바이트, Linux는 KiB 단위)
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler(threading.Thread):
+    """주기적으로 RSS를 읽어 그 순간 실행 중인 단계들의 최대값으로 기록"""
+
+    def __init__(self, interval_seconds: float = 0.01):
+        super().__init__(name="rss-sampler", daemon=True)
+        self.interval_seconds = interval_seconds
+        self.peak_by_stage: Dict[str, int] = defaultdict(int)
+        self.peak_total = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval_seconds):
+            rss = read_rss_bytes()
+            self.peak_total = max(self.peak_total, rss)
+            for (stage,), running in STAGE_IN_PROGRESS.snapshot().items():
+                if running > 0:
+                    self.peak_by_stage[stage] = max(self.peak_by_stage[stage], rss)
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def build_pipeline(args, work_dir: str) -> PodcastMaker:
+    html = load_fixture(args.fixture, args.scale)
+    session = requests.Session()
+    session.mount("https://", FixtureHTTPAdapter(html, latency_seconds=args.scrape_latency))
+    NamuWikiScraper._session = session
+    NamuWikiScraper.cache = None
+    NamuWikiScraper.rate_limiter = None
+
+    script_maker = ScriptMaker(
+        "offline",
+        max_concurrency=args.llm_concurrency,
+        client=RecordedChatClient(args.chat_fixture, latency_seconds=args.llm_latency),
+    )
+    audio_maker = AudioMaker(
+        FakeTTSProvider(latency_seconds=args.tts_latency),
+        max_concurrency=args.tts_concurrency,
+        audio_dir=os.path.join(work_dir, "audio"),
+    )
+    # 모든 출력은 작업 디렉터리 아래에 쓰므로 실행 위치의 generated/를 건드리지 않음
+    return PodcastMaker(
+        script_maker,
+        audio_maker,
+        audio_merger=AudioMerger(args.merge_mode, cache_dir=os.path.join(work_dir, "transition")),
+        podcast_dir=os.path.join(work_dir, "podcasts"),
+        script_dir=os.path.join(work_dir, "script"),
+    )
+
+
+def run_jobs(podcast_maker: PodcastMaker, collector: SpanCollector, jobs: int, concurrency: int) -> List[str]:
+    def run_job(idx: int) -> str:
+        started = time.perf_counter()
+        title, raw_content = NamuWikiScraper.scrape_content(f"https://namu.wiki/w/벤치마크_{idx}")
+        content = TextCleaner.clean_text(raw_content)
+        # 작업마다 제목을 달리해 결과 재사용 없이 매번 전체 파이프라인을 실행
+        path = podcast_maker.create_podcast(f"{title} {idx}", content)
+        collector.add("job", time.perf_counter() - started)
+        return path
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench-job") as executor:
+        return list(executor.map(run_job, range(jobs)))
+
+
+def summarize(collector: SpanCollector, sampler: RssSampler, wall_seconds: float, jobs: int) -> dict:
+    stages = {}
+    for stage in STAGES:
+        durations = collector.durations.get(stage, [])
+        if not durations:
+            continue
+        stages[stage] = {
+            "count": len(durations),
+            "errors": collector.errors.get(stage, 0),
+            "p50": percentile(durations, 50),
+            "p95": percentile(durations, 95),
+            "p99": percentile(durations, 99),
+            "max": max(durations),
+            # 샘플링 주기보다 짧게 끝난 단계는 RSS를 측정하지 못할 수 있음
+            "peak_rss_mib": sampler.peak_by_stage[stage] / (1024 * 1024) if stage in sampler.peak_by_stage else None,
+        }
+    return {
+        "jobs": jobs,
+        "wall_seconds": wall_seconds,
+        "jobs_per_minute": jobs / wall_seconds * 60 if wall_seconds else float("nan"),
+        "peak_rss_mib": sampler.peak_total / (1024 * 1024),
+        "stages": stages,
+    }
+
+
+def print_report(report: dict, args):
+    print(
+        f"\n{report['jobs']} jobs, concurrency {args.concurrency}, scale {args.scale}: "
+        f"{report['wall_seconds']:.2f}s wall, {report['jobs_per_minute']:.1f} jobs/min, "
+        f"peak RSS {report['peak_rss_mib']:.1f} MiB"
+    )
+    print(f"{'stage':<16} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'max ms':>10} {'RSS MiB':>9}")
+    for stage, stats in report["stages"].items():
+        rss = "-" if stats["peak_rss_mib"] is None else f"{stats['peak_rss_mib']:.1f}"
+        print(
+            f"{stage:<16} {stats['count']:>6} {stats['p50'] * 1000:>10.1f} {stats['p95'] * 1000:>10.1f} "
+            f"{stats['p99'] * 1000:>10.1f} {stats['max'] * 1000:>10.1f} {rss:>9}"
+            + (f"  ({stats['errors']} errors)" if stats["errors"] else "")
+        )
+
+
+def compare_baseline(report: dict, baseline: dict, max_regression: float, min_delta_seconds: float) -> List[str]:
+    # 기준값 대비 p50/p95가 비율과 절대값 모두 허용치를 넘으면 회귀로 판단 (아주 짧은 단계의 잡음 무시)
+    regressions = []
+    for stage, stats in report["stages"].items():
+        base = baseline.get("stages", {}).get(stage)
+        if not base:
+            continue
+        for key in ("p50", "p95"):
+            delta = stats[key] - base[key]
+            if delta > min_delta_seconds and stats[key] > base[key] * (1 + max_regression):
+                regressions.append(
+                    f"{stage} {key}: {base[key] * 1000:.1f}ms -> {stats[key] * 1000:.1f}ms (+{delta / base[key] * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", default=os.path.join(HTML_FIXTURE_DIR, "sample_article.html"), help="나무위키 HTML 픽스처")
+    parser.add_argument("--chat-fixture", default=DEFAULT_CHAT_FIXTURE, help="녹화된 chat completion 응답")
+    parser.add_argument("--scale", type=int, default=20, help="본문 블록 반복 횟수")
+    parser.add_argument("--jobs", type=int, default=8, help="실행할 팟캐스트 작업 수")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시에 실행할 작업 수")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="ScriptMaker 동시 요청 수")
+    parser.add_argument("--tts-concurrency", type=int, default=8, help="AudioMaker 동시 요청 수")
+    parser.add_argument("--scrape-latency", type=float, default=0.0, help="HTML 응답 지연 (초)")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="chat completion 응답 지연 (초)")
+    parser.add_argument("--tts-latency", type=float, default=0.0, help="TTS 요청당 지연 (초)")
+    parser.add_argument("--merge-mode", default="concat", choices=AudioMerger.MERGE_MODES)
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--save-baseline", help="결과를 기준값 파일로 저장")
+    parser.add_argument("--baseline", help="비교할 기준값 파일")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="허용할 지연 시간 증가 비율")
+    parser.add_argument("--min-regression-ms", type=float, default=5.0, help="회귀로 판단할 최소 증가량 (ms)")
+    args = parser.parse_args(argv)
+
+    # 파이프라인의 일반 로그는 숨기고 span 로그만 수집
+    logging.getLogger("app").setLevel(logging.WARNING)
+    span_logger = logging.getLogger("app.spans")
+    span_logger.setLevel(logging.INFO)
+    span_logger.propagate = False
+    collector = SpanCollector()
+    span_logger.addHandler(collector)
+
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    sampler = RssSampler()
+    try:
+        podcast_maker = build_pipeline(args, work_dir)
+        sampler.start()
+        started = time.perf_counter()
+        run_jobs(podcast_maker, collector, args.jobs, args.concurrency)
+        wall_seconds = time.perf_counter() - started
+    finally:
+        if sampler.is_alive():
+            sampler.stop()
+        span_logger.removeHandler(collector)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = summarize(collector, sampler, wall_seconds, args.jobs)
+    print_report(report, args)
+
+    for path in filter(None, (args.json_path, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare_baseline(report, baseline, args.max_regression, args.min_regression_ms / 1000)
+        if regressions:
+            print("\nRegressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
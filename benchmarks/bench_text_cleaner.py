@@ -0,0 +1,124 @@
+"""본문 정리(TextCleaner) 벤치마크
+
+큰 나무위키 문서에 대해 기존 3단계 정규식 정리와 문단 구조를 보존하는 현재 정리기(TextCleaner)의 처리 시간을 비교하고,
+문단/문단 제목 경계와 각주 표시가 어떻게 남는지 함께 보여 줍니다.
+추출이 끝난 뒤 정리하는 방식과 추출되는 블록을 바로 정리하는 스트리밍 방식의
+전체 시간과 첫 블록이 정리되기까지의 시간도 비교합니다. BeautifulSoup 기반 백엔드는 트리를 다 만든 뒤에
+블록을 내보내므로 첫 블록 시간이 줄어드는 것은 HTML을 조각 단위로 파싱하는 lxml 백엔드뿐입니다.
+
+    python -m benchmarks.bench_text_cleaner --scale 200
+    python -m benchmarks.bench_text_cleaner saved_page.html --backend lxml --runs 10
+"""
+import argparse
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+
+from app.services.content_sectioner import ContentSectioner
+from app.services.namuwiki_data_extract import TextCleaner
+from app.services.namuwiki_extractors import EXTRACTORS, get_extractor
+from benchmarks.bench_namuwiki_extract import FIXTURE_DIR, load_fixture
+
+
+# 문단 구조를 보존하기 이전의 구현 (비교용)
+def legacy_clean_text(content: str) -> str:
+    content = re.sub(r'\s+', ' ', content)
+    content = re.sub(r'\[\d+\]', '', content)
+    content = '\n'.join(line.strip() for line in content.split('\n') if line.strip())
+    return content.strip()
+
+
+def count_structure(text: str):
+    # (문단 수, 문단 제목 수, 남은 각주/편집 표시 수)
+    blocks = [block for block in ContentSectioner.BLOCK_SEPARATOR_PATTERN.split(text.strip()) if block.strip()]
+    headings = 0
+    for block in blocks:
+        lines = block.split("\n")
+        if ContentSectioner.HEADING_NUMBER_PATTERN.match(lines[0]) and len(lines) > 1:
+            headings += 1
+        elif len(lines) == 1 and ContentSectioner.HEADING_INLINE_PATTERN.match(lines[0]):
+            headings += 1
+    markers = len(re.findall(TextCleaner.MARKER_PATTERN, text))
+    return len(blocks), headings, markers
+
+
+def measure(func, runs: int):
+    timings = []
+    result = None
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), min(timings), result
+
+
+def measure_first_block(extractor, html: str, runs: int) -> float:
+    # 스트리밍 방식에서 첫 번째 정리된 블록이 나오기까지 걸린 시간
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        _, blocks = extractor.iter_blocks(html)
+        next(TextCleaner.clean_blocks(blocks))
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="HTML 픽스처 경로 (기본: benchmarks/fixtures/namuwiki/*.html)")
+    parser.add_argument("--scale", type=int, default=50, help="본문 블록 반복 횟수")
+    parser.add_argument("--runs", type=int, default=5, help="방식별 반복 측정 횟수")
+    parser.add_argument("--backend", choices=sorted(EXTRACTORS), default="html.parser", help="HTML 추출 백엔드")
+    args = parser.parse_args(argv)
+
+    paths = args.paths or sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+    extractor = get_extractor(args.backend)
+    failures = 0
+
+    for path in paths:
+        html = load_fixture(path, args.scale)
+        _, raw_content = extractor.extract(html)
+        raw_paragraphs, raw_headings, raw_markers = count_structure(raw_content)
+        print(
+            f"\n{os.path.basename(path)} ({len(raw_content)} chars extracted with {extractor.name}: "
+            f"{raw_paragraphs} paragraphs, {raw_headings} headings, {raw_markers} markers)"
+        )
+
+        print(f"{'cleaner':<12} {'median ms':>10} {'best ms':>10} {'chars':>10} {'paragraphs':>11} {'headings':>9} {'markers':>8}")
+        for name, clean in (("legacy", legacy_clean_text), ("structured", TextCleaner.clean_text)):
+            median, best, cleaned = measure(lambda: clean(raw_content), args.runs)
+            paragraphs, headings, markers = count_structure(cleaned)
+            print(
+                f"{name:<12} {median * 1000:>10.1f} {best * 1000:>10.1f} {len(cleaned):>10} "
+                f"{paragraphs:>11} {headings:>9} {markers:>8}"
+            )
+            if name == "structured" and (headings != raw_headings or markers):
+                failures += 1
+
+        # 추출 후 정리 vs 추출과 정리를 겹쳐서 실행
+        def sequential():
+            return TextCleaner.clean_text(extractor.extract(html)[1])
+
+        def streaming():
+            return TextCleaner.clean_text(extractor.iter_blocks(html)[1])
+
+        print(f"{'pipeline':<12} {'median ms':>10} {'best ms':>10} {'first ms':>10}  output")
+        seq_median, seq_best, expected = measure(sequential, args.runs)
+        first = measure_first_block(extractor, html, args.runs)
+        stream_median, stream_best, streamed = measure(streaming, args.runs)
+        identical = streamed == expected
+        failures += 0 if identical else 1
+        print(f"{'sequential':<12} {seq_median * 1000:>10.1f} {seq_best * 1000:>10.1f} {seq_median * 1000:>10.1f}  -")
+        print(
+            f"{'streaming':<12} {stream_median * 1000:>10.1f} {stream_best * 1000:>10.1f} {first * 1000:>10.1f}  "
+            f"{'identical' if identical else 'MISMATCH'}"
+        )
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
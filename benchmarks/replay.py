@@ -0,0 +1,85 @@
+"""벤치마크용 오프라인 재생 도구
+
+저장된 나무위키 HTML과 녹화된 chat completion 응답을 네트워크 없이 돌려주는
+requests 어댑터와 OpenAI 클라이언트 대용 객체를 제공합니다.
+"""
+import json
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+import requests
+from requests.adapters import BaseAdapter
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+DEFAULT_CHAT_FIXTURE = os.path.join(FIXTURE_DIR, "openai", "chat_completions.json")
+
+
+class FixtureHTTPAdapter(BaseAdapter):
+    """모든 GET 요청에 저장된 HTML을 200 응답으로 돌려주는 requests 어댑터"""
+
+    def __init__(self, html: str, latency_seconds: float = 0.0):
+        super().__init__()
+        self.body = html.encode("utf-8")
+        self.latency_seconds = latency_seconds
+        self.request_count = 0
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.request_count += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = request.url
+        response.request = request
+        response.encoding = "utf-8"
+        response.headers["Content-Type"] = "text/html; charset=utf-8"
+        response._content = self.body
+        return response
+
+    def close(self):
+        pass
+
+
+class RecordedChatClient:
+    """chat.completions.create 호출을 요청 종류(목차/요약/챕터)별 녹화 응답으로 재생"""
+
+    def __init__(self, path: str = DEFAULT_CHAT_FIXTURE, latency_seconds: float = 0.0):
+        with open(path, "r", encoding="utf-8") as f:
+            self.recording = json.load(f)
+        self.latency_seconds = latency_seconds
+        self.calls = {"toc": 0, "summary": 0, "chapter": 0}
+        self.lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, model: str, messages: list, functions: list = None, **kwargs):
+        if functions:
+            kind = "toc"
+        elif any(message["role"] == "assistant" for message in messages):
+            # 챕터 요청은 원문 대신 참조용 assistant 메시지를 포함
+            kind = "chapter"
+        else:
+            kind = "summary"
+        with self.lock:
+            self.calls[kind] += 1
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        recorded = self.recording[kind]
+        if kind == "toc":
+            message = SimpleNamespace(
+                content=None,
+                function_call=SimpleNamespace(name="extract_toc", arguments=json.dumps(recorded["arguments"], ensure_ascii=False)),
+            )
+        else:
+            message = SimpleNamespace(content=recorded["content"], function_call=None)
+        return SimpleNamespace(
+            model=self.recording.get("model", model),
+            choices=[SimpleNamespace(message=message, finish_reason="stop")],
+            usage=SimpleNamespace(**recorded["usage"]),
+        )
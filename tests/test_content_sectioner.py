@@ -0,0 +1,72 @@
+from app.services.content_sectioner import ContentSectioner
+from app.services.script_maker import ScriptMaker
+from app.utils.token_counter import count_tokens
+
+
+def paragraph(label: str, sentences: int = 3) -> str:
+    return " ".join(f"{label}에 대한 {idx}번째 설명 문장이다." for idx in range(1, sentences + 1))
+
+
+def test_splits_on_numbered_heading_blocks():
+    content = "\n\n".join([
+        "도입 문단이다.",
+        "1.\n개요\n[편집]", paragraph("개요"),
+        "2.1.\n초기 반응", paragraph("반응"),
+        "3. 평가 [편집]", paragraph("평가"),
+    ])
+
+    sections = ContentSectioner(min_section_tokens=0).split(content)
+
+    assert [section.heading for section in sections] == ["", "1. 개요", "2.1. 초기 반응", "3. 평가"]
+    assert [section.index for section in sections] == [1, 2, 3, 4]
+    assert sections[1].text == f"1. 개요\n{paragraph('개요')}"
+    assert sections[1].tokens == count_tokens(sections[1].text)
+
+
+def test_multiline_block_starting_with_a_number_is_not_a_heading():
+    content = "\n\n".join(["1.\n개요", "2. 문단 번호로 시작하지만\n여러 줄인 본문이다.", paragraph("본문")])
+
+    sections = ContentSectioner(min_section_tokens=0).split(content)
+
+    assert [section.heading for section in sections] == ["1. 개요"]
+
+
+def test_merges_short_sections_into_the_next_one():
+    content = "\n\n".join(["1.\n짧은 문단", "짧다.", "2.\n긴 문단", paragraph("긴 문단", 20)])
+    sectioner = ContentSectioner(min_section_tokens=count_tokens("1. 짧은 문단\n짧다.") + 1)
+
+    sections = sectioner.split(content)
+
+    assert len(sections) == 1
+    assert sections[0].heading == "1. 짧은 문단"
+    assert sections[0].text.startswith("1. 짧은 문단\n짧다.\n\n2. 긴 문단\n")
+
+
+def test_splits_long_sections_at_paragraph_and_sentence_boundaries():
+    body = "\n".join(paragraph(f"{idx}번 문단", 6) for idx in range(1, 5))
+    sectioner = ContentSectioner(max_section_tokens=count_tokens(paragraph("1번 문단", 6)) + 5, min_section_tokens=0)
+
+    sections = sectioner.split(f"1.\n역사\n\n{body}")
+
+    assert [section.heading for section in sections] == ["1. 역사"] + ["1. 역사 (계속)"] * 3
+    assert all(section.tokens <= sectioner.max_section_tokens + count_tokens("1. 역사 (계속)\n") for section in sections)
+    assert "\n".join(section.text.split("\n", 1)[1] for section in sections) == body
+
+
+def test_build_chapters_covers_every_section_once_in_order():
+    content = "\n\n".join(f"{idx}.\n제목 {idx}\n\n{paragraph(f'제목 {idx}')}" for idx in range(1, 6))
+    sections = ContentSectioner(min_section_tokens=0).split(content)
+    # 모델이 준 시작 구간이 중복되거나 범위를 벗어나거나 1이 아니어도 빠짐없이 한 번씩 배정
+    toc = [
+        {"title": "앞부분", "start_section": 2},
+        {"title": "중복", "start_section": 2},
+        {"title": "뒷부분", "start_section": "4"},
+        {"title": "범위 밖", "start_section": 99},
+        {"title": "잘못된 값", "start_section": None},
+    ]
+
+    chapters = ScriptMaker._build_chapters_from_sections(toc, sections)
+
+    assert [chapter["title"] for chapter in chapters] == ["앞부분", "뒷부분", "범위 밖"]
+    assert [chapter["sections"] for chapter in chapters] == [[1, 2, 3], [4], [5]]
+    assert chapters[0]["content"] == "\n\n".join(section.text for section in sections[:3])
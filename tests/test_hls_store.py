@@ -0,0 +1,92 @@
+import os
+import uuid
+
+import pytest
+
+from app.storage.hls_store import HLSStore
+
+JOB_ID = uuid.uuid4().hex
+
+
+@pytest.fixture
+def store(tmp_path):
+    return HLSStore(str(tmp_path / "hls"))
+
+
+def write_outputs(directory: str, label: str):
+    for name in (HLSStore.PLAYLIST, HLSStore.SEGMENT_PATTERN % 0):
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(label)
+
+
+def read(path: str) -> str:
+    with open(path) as f:
+        return f.read()
+
+
+def test_outputs_are_served_only_after_commit(store):
+    staging_dir = store.create_staging_dir(JOB_ID)
+    write_outputs(staging_dir, "v1")
+
+    assert os.path.basename(staging_dir).startswith(".")
+    assert not store.exists(JOB_ID)
+    assert store.path_for(JOB_ID, HLSStore.PLAYLIST) is None
+
+    store.commit(JOB_ID, staging_dir)
+
+    assert store.exists(JOB_ID)
+    assert not os.path.exists(staging_dir)
+    assert read(store.path_for(JOB_ID, "segment_00000.ts")) == "v1"
+
+
+def test_commit_replaces_previous_outputs(store):
+    first = store.create_staging_dir(JOB_ID)
+    write_outputs(first, "v1")
+    with open(os.path.join(first, "segment_00001.ts"), "w") as f:
+        f.write("stale")
+    store.commit(JOB_ID, first)
+
+    second = store.create_staging_dir(JOB_ID)
+    write_outputs(second, "v2")
+    store.commit(JOB_ID, second)
+
+    assert read(store.path_for(JOB_ID, HLSStore.PLAYLIST)) == "v2"
+    assert store.path_for(JOB_ID, "segment_00001.ts") is None
+
+
+def test_discard_removes_staging_dir(store):
+    staging_dir = store.create_staging_dir(JOB_ID)
+    write_outputs(staging_dir, "v1")
+
+    store.discard(staging_dir)
+
+    assert not os.path.exists(staging_dir)
+    assert not store.exists(JOB_ID)
+
+
+@pytest.mark.parametrize("job_id, filename", [
+    (JOB_ID, "../secret.txt"),
+    (JOB_ID, "segment_1.ts"),
+    ("../" + JOB_ID[3:], HLSStore.PLAYLIST),
+    (JOB_ID.upper(), HLSStore.PLAYLIST),
+])
+def test_path_for_rejects_unknown_names(store, job_id, filename):
+    staging_dir = store.create_staging_dir(JOB_ID)
+    write_outputs(staging_dir, "v1")
+    store.commit(JOB_ID, staging_dir)
+
+    assert store.path_for(job_id, filename) is None
+
+
+def test_iter_outputs_lists_committed_and_staging_dirs(store):
+    committed = store.create_staging_dir(JOB_ID)
+    write_outputs(committed, "v1")
+    store.commit(JOB_ID, committed)
+    staging_dir = store.create_staging_dir(JOB_ID)
+    write_outputs(staging_dir, "v22")
+
+    outputs = {name: size for name, size, _ in store.iter_outputs()}
+
+    assert outputs == {JOB_ID: 4, os.path.basename(staging_dir): 6}
+    store.remove_dir(os.path.basename(staging_dir))
+    assert [name for name, _, _ in store.iter_outputs()] == [JOB_ID]
@@ -0,0 +1,117 @@
+import pytest
+
+from app.storage import job_queue
+from app.storage.job_queue import JobQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(job_queue, "time", clock)
+    return clock
+
+
+@pytest.fixture
+def queue(tmp_path, clock):
+    queue = JobQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2)
+    yield queue
+    queue.conn.close()
+
+
+def test_lease_takes_jobs_by_priority_then_age(queue, clock):
+    queue.enqueue("batch", "hash-a", {"title": "A"}, priority=1)
+    clock.now += 1
+    queue.enqueue("interactive", "hash-b", {"title": "B"}, priority=0)
+
+    first = queue.lease("worker-1", lease_seconds=30)
+    second = queue.lease("worker-1", lease_seconds=30)
+
+    assert (first["job_id"], second["job_id"]) == ("interactive", "batch")
+    assert first["payload"] == {"title": "B"}
+    assert first["attempts"] == 1 and first["lease_owner"] == "worker-1"
+    assert queue.lease("worker-1", lease_seconds=30) is None
+
+
+def test_heartbeat_extends_lease_and_records_progress(queue, clock):
+    queue.enqueue("job", "hash", {})
+    queue.lease("worker-1", lease_seconds=30)
+
+    clock.now += 20
+    assert queue.heartbeat("job", "worker-1", 30, stage="tts", progress_current=2, progress_total=5)
+    clock.now += 20
+    # 연장된 임대가 아직 남아 있으므로 다른 워커가 가져갈 수 없음
+    assert queue.lease("worker-2", lease_seconds=30) is None
+
+    record = queue.get("job")
+    assert (record["stage"], record["progress_current"], record["progress_total"]) == ("tts", 2, 5)
+    assert not queue.heartbeat("job", "worker-2", 30)
+    with pytest.raises(ValueError):
+        queue.heartbeat("job", "worker-1", 30, result_path="x")
+
+
+def test_expired_lease_is_reclaimed_and_old_owner_is_fenced(queue, clock):
+    queue.enqueue("job", "hash", {})
+    queue.lease("worker-1", lease_seconds=30)
+
+    clock.now += 31
+    reclaimed = queue.lease("worker-2", lease_seconds=30)
+
+    assert reclaimed["job_id"] == "job"
+    assert (reclaimed["attempts"], reclaimed["lease_owner"]) == (2, "worker-2")
+    # 임대를 잃은 워커의 heartbeat/완료/실패 기록은 무시됨
+    assert not queue.heartbeat("job", "worker-1", 30)
+    assert not queue.complete("job", "worker-1", "old.mp3")
+    assert queue.fail("job", "worker-1", "boom", 0) is None
+    assert queue.complete("job", "worker-2", "new.mp3")
+    assert queue.get("job")["result_path"] == "new.mp3"
+
+
+def test_failed_job_is_retried_after_delay_until_max_attempts(queue, clock):
+    queue.enqueue("job", "hash", {})
+    queue.lease("worker-1", lease_seconds=30)
+
+    assert queue.fail("job", "worker-1", "boom", retry_delay_seconds=10) == JobQueue.PENDING
+    assert queue.lease("worker-1", lease_seconds=30) is None
+
+    clock.now += 10
+    assert queue.lease("worker-1", lease_seconds=30)["attempts"] == 2
+    assert queue.fail("job", "worker-1", "boom again", retry_delay_seconds=10) == JobQueue.FAILED
+    clock.now += 10
+    assert queue.lease("worker-1", lease_seconds=30) is None
+    assert queue.get("job")["error"] == "boom again"
+
+
+def test_reap_fails_expired_jobs_without_attempts_left(queue, clock):
+    queue.enqueue("job", "hash", {})
+    queue.lease("worker-1", lease_seconds=30)
+    clock.now += 31
+    queue.lease("worker-2", lease_seconds=30)
+    clock.now += 31
+
+    # 재시도 횟수를 다 쓴 작업은 다시 임대되지 않고 실패 처리됨
+    assert queue.lease("worker-3", lease_seconds=30) is None
+    assert queue.reap_expired() == ["job"]
+    assert queue.get("job")["status"] == JobQueue.FAILED
+
+
+def test_find_active_and_counts(queue):
+    queue.enqueue("job-1", "hash", {})
+    queue.enqueue("job-2", "other", {})
+    queue.lease("worker-1", lease_seconds=30)
+
+    assert queue.find_active("hash")["job_id"] == "job-1"
+    assert queue.count_by_status() == {JobQueue.PENDING: 1, JobQueue.RUNNING: 1}
+    assert queue.count_active() == 2
+
+
+def test_rejects_unknown_journal_mode(tmp_path):
+    with pytest.raises(ValueError):
+        JobQueue(str(tmp_path / "queue.sqlite3"), journal_mode="memory")
@@ -0,0 +1,39 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from app.utils.metrics import CONTENT_TYPE, MetricsRegistry, serve_metrics
+
+
+@pytest.fixture
+def server():
+    registry = MetricsRegistry()
+    registry.counter("worker_jobs_total", "Jobs run by this worker", ("status",)).inc(2, status="completed")
+    # 포트 0: 빈 포트를 자동으로 할당
+    server = serve_metrics(0, host="127.0.0.1", registry=registry)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def url(server, path: str) -> str:
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}{path}"
+
+
+def test_serves_registry_in_prometheus_text_format(server):
+    with urllib.request.urlopen(url(server, "/metrics"), timeout=5) as response:
+        body = response.read().decode("utf-8")
+        content_type = response.headers["Content-Type"]
+
+    assert content_type == CONTENT_TYPE
+    assert '# TYPE worker_jobs_total counter' in body
+    assert 'worker_jobs_total{status="completed"} 2' in body
+
+
+def test_other_paths_are_not_found(server):
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(url(server, "/"), timeout=5)
+
+    assert error.value.code == 404
@@ -0,0 +1,47 @@
+import glob
+import json
+import os
+
+import pytest
+
+from app.services.namuwiki_extractors import EXTRACTORS, get_extractor
+
+# 나무위키 문서 구조(표, 각주, 접기 문단, 광고 div, 중첩 블록)를 담은 저장 HTML과
+# 기본 추출기(html.parser)로 만든 기대 출력(<문서>.expected.json의 title, content)
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "namuwiki")
+PAGES = sorted(glob.glob(os.path.join(FIXTURE_DIR, "*.html")))
+
+
+def load_page(path):
+    with open(path, "r", encoding="utf-8") as f:
+        html = f.read()
+    with open(f"{os.path.splitext(path)[0]}.expected.json", "r", encoding="utf-8") as f:
+        expected = json.load(f)
+    return html, (expected["title"], expected["content"])
+
+
+@pytest.mark.parametrize("page", PAGES, ids=os.path.basename)
+@pytest.mark.parametrize("backend", sorted(EXTRACTORS))
+def test_extractor_matches_golden_output(backend, page):
+    html, expected = load_page(page)
+
+    assert get_extractor(backend).extract(html) == expected
+
+
+@pytest.mark.parametrize("page", PAGES, ids=os.path.basename)
+@pytest.mark.parametrize("backend", sorted(EXTRACTORS))
+def test_iter_blocks_matches_extract(backend, page):
+    # 스트리밍 경로(iter_blocks)도 같은 블록을 같은 순서로 내보내야 함
+    html, (title, content) = load_page(page)
+
+    streamed_title, blocks = get_extractor(backend).iter_blocks(html)
+
+    assert (streamed_title, "\n\n".join(blocks)) == (title, content)
+
+
+@pytest.mark.parametrize("backend", sorted(EXTRACTORS))
+def test_extractor_requires_content_div(backend):
+    html = '<html><head><meta property="og:title" content="문서"></head><body><div>본문</div></body></html>'
+
+    with pytest.raises(ValueError):
+        get_extractor(backend).extract(html)
@@ -0,0 +1,22 @@
+import importlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # app.pipeline은 import 시 generated/ 아래에 저장소를 만들므로 임시 디렉터리에서 불러옴
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("TTS_PROVIDER", "fake")
+    main = importlib.import_module("app.main")
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+def test_update_podcast_rejects_non_namuwiki_url(client):
+    response = client.post("/api/podcasts/update", json={"url": "https://example.com/w/x"})
+
+    assert response.status_code == 400
+    assert "namu.wiki" in response.json()["detail"]
@@ -0,0 +1,182 @@
+import threading
+import time
+
+import pytest
+
+from app.utils import quota_scheduler
+from app.utils.quota_scheduler import PRIORITY_BATCH, QuotaScheduler, request_priority
+
+
+class FakeClock:
+    # time.monotonic/time.sleep 대신 쓰는 시계 (sleep은 바로 시각만 앞당김)
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.now += seconds
+
+
+class FakeCondition(threading.Condition):
+    # 단일 스레드 테스트용: 실제로 기다리지 않고 timeout만큼 시계를 앞당김
+    def __init__(self, clock: FakeClock):
+        super().__init__()
+        self.clock = clock
+
+    def wait(self, timeout=None):
+        assert timeout is not None, "single-threaded test would block forever"
+        self.clock.now += timeout
+        return False
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(quota_scheduler, "time", clock)
+    return clock
+
+
+def make_scheduler(clock: FakeClock, **limits) -> QuotaScheduler:
+    scheduler = QuotaScheduler("test", **limits)
+    scheduler.condition = FakeCondition(clock)
+    return scheduler
+
+
+def test_paces_requests_to_the_per_minute_limit(clock):
+    # 분당 60회, 버스트 1초 -> 1초에 한 번
+    scheduler = make_scheduler(clock, requests_per_minute=60, burst_seconds=1)
+
+    admitted = []
+    for _ in range(4):
+        scheduler.acquire()
+        admitted.append(clock.now)
+
+    assert admitted == pytest.approx([0.0, 1.0, 2.0, 3.0])
+
+
+def test_settle_returns_unused_tokens(clock):
+    # 분당 600토큰, 버스트 10초 -> 버킷 100토큰
+    scheduler = make_scheduler(clock, tokens_per_minute=600, burst_seconds=10)
+
+    scheduler.acquire(tokens=100).settle(tokens=40)
+    scheduler.acquire(tokens=60)
+
+    assert clock.now == 0.0
+
+
+def test_oversized_request_waits_for_a_full_bucket_and_leaves_debt(clock):
+    scheduler = make_scheduler(clock, tokens_per_minute=600, burst_seconds=10)
+
+    scheduler.acquire(tokens=50)
+    scheduler.acquire(tokens=300)
+    assert clock.now == pytest.approx(5.0)
+
+    # 빚(200토큰)을 갚고 10토큰이 모일 때까지 대기
+    scheduler.acquire(tokens=10)
+    assert clock.now == pytest.approx(5.0 + 21.0)
+
+
+def test_retries_throttled_call_after_retry_after_and_refunds_quota(clock):
+    scheduler = make_scheduler(clock, requests_per_minute=60, burst_seconds=1)
+    calls = []
+
+    def call():
+        calls.append(clock.now)
+        if len(calls) == 1:
+            raise ProviderError(429, {"retry-after": "5"})
+        return "ok"
+
+    assert scheduler.run(call) == "ok"
+    # 429 동안 모든 호출을 멈췄다가 재시도하고, 429 시도의 요청 수는 돌려받아 바로 나감
+    assert calls == pytest.approx([0.0, 5.0])
+    assert scheduler.paused_until == pytest.approx(5.0)
+
+
+def test_throttle_backoff_grows_exponentially_without_retry_after(clock, monkeypatch):
+    monkeypatch.setattr(quota_scheduler.random, "uniform", lambda low, high: 0.0)
+    scheduler = make_scheduler(clock, max_retries=3, retry_base_delay=1.0)
+    calls = []
+
+    def call():
+        calls.append(clock.now)
+        raise ProviderError(429)
+
+    with pytest.raises(ProviderError):
+        scheduler.run(call)
+
+    assert calls == pytest.approx([0.0, 1.0, 3.0, 7.0])
+
+
+def test_does_not_retry_or_refund_server_errors(clock):
+    scheduler = make_scheduler(clock, requests_per_minute=60, burst_seconds=1)
+    calls = []
+
+    def call():
+        calls.append(clock.now)
+        raise ProviderError(500)
+
+    with pytest.raises(ProviderError):
+        scheduler.run(call)
+    # 처리(과금)됐을 수 있는 요청이므로 할당량을 돌려받지 않음
+    scheduler.acquire()
+
+    assert len(calls) == 1
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_retryable_errors_are_retried(clock, monkeypatch):
+    monkeypatch.setattr(quota_scheduler.random, "uniform", lambda low, high: 0.0)
+    scheduler = make_scheduler(clock)
+    calls = []
+
+    def call():
+        calls.append(clock.now)
+        if len(calls) < 3:
+            raise TimeoutError()
+        return "ok"
+
+    assert scheduler.run(call, retryable=(TimeoutError,)) == "ok"
+    assert calls == pytest.approx([0.0, 1.0, 3.0])
+    assert scheduler.paused_until == 0.0
+
+
+def test_interactive_calls_are_admitted_before_waiting_batch_calls(clock):
+    # 여러 스레드가 실제 Condition에서 기다리므로 FakeCondition은 쓰지 않음
+    scheduler = QuotaScheduler("test", requests_per_minute=6000)
+    scheduler.pause(1000)
+    admitted = []
+    bucket = scheduler.buckets["requests"]
+    consume = bucket.consume
+    # 할당량을 받은 순서 (consume은 condition 잠금 안에서 호출됨)
+    bucket.consume = lambda amount, now: (admitted.append(threading.current_thread().name), consume(amount, now))
+
+    def batch_call():
+        with request_priority(PRIORITY_BATCH):
+            scheduler.acquire()
+
+    def wait_for_waiters(count: int):
+        deadline = time.monotonic() + 5
+        while len(scheduler.waiters) < count:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    threads = [threading.Thread(target=batch_call, name="batch"), threading.Thread(target=scheduler.acquire, name="interactive")]
+    for idx, thread in enumerate(threads, start=1):
+        thread.start()
+        wait_for_waiters(idx)
+
+    clock.now = 1001.0
+    scheduler.pause(0)
+    for thread in threads:
+        thread.join(5)
+
+    assert admitted == ["interactive", "batch"]
@@ -0,0 +1,81 @@
+import pytest
+
+from app.services.content_sectioner import ContentSectioner
+from app.services.script_maker import ScriptMaker
+
+
+def section(number: int, title: str, body: str = "") -> str:
+    return f"{number}.\n{title}\n\n{body or f'{title}에 대한 설명 문장이다. 자세한 내용이 이어진다.'}"
+
+
+@pytest.fixture
+def script_maker():
+    return ScriptMaker(api_key="test", sectioner=ContentSectioner(min_section_tokens=0))
+
+
+@pytest.fixture
+def previous_chapters(script_maker):
+    # 이전 버전: [개요, 역사] / [평가, 여담] 두 챕터
+    content = "\n\n".join([section(1, "개요"), section(2, "역사"), section(3, "평가"), section(4, "여담")])
+    sections = script_maker.sectioner.split(content)
+    toc = [{"title": "시작", "start_section": 1}, {"title": "평판", "start_section": 3}]
+    return ScriptMaker._build_chapters_from_sections(toc, sections)
+
+
+def test_keeps_previous_chapters_when_only_text_changes(script_maker, previous_chapters):
+    content = "\n\n".join([
+        section(1, "개요"), section(2, "역사", "역사 문단이 수정되었다."), section(3, "평가"), section(4, "여담"),
+    ])
+
+    chapters = script_maker.rebuild_toc("문서", content, previous_chapters)
+
+    assert [chapter["title"] for chapter in chapters] == ["시작", "평판"]
+    assert [chapter["headings"] for chapter in chapters] == [["1. 개요", "2. 역사"], ["3. 평가", "4. 여담"]]
+    assert "역사 문단이 수정되었다." in chapters[0]["content"]
+    assert chapters[1]["content"] == previous_chapters[1]["content"]
+
+
+def test_new_sections_join_the_preceding_chapter(script_maker, previous_chapters):
+    content = "\n\n".join([
+        section(1, "개요"), section(2, "역사"), section(3, "평가"), section(4, "새 논란"), section(5, "여담"),
+    ])
+
+    chapters = script_maker.rebuild_toc("문서", content, previous_chapters)
+
+    assert [chapter["headings"] for chapter in chapters] == [
+        ["1. 개요", "2. 역사"], ["3. 평가", "4. 새 논란", "5. 여담"],
+    ]
+    assert [chapter["sections"] for chapter in chapters] == [[1, 2], [3, 4, 5]]
+
+
+def test_returns_none_when_structure_changed_too_much(script_maker, previous_chapters):
+    content = "\n\n".join([section(1, "개요"), section(2, "배경"), section(3, "줄거리"), section(4, "등장인물")])
+
+    assert script_maker.rebuild_toc("문서", content, previous_chapters) is None
+    assert script_maker.rebuild_toc("문서", content, []) is None
+
+
+def test_repeated_headings_are_matched_by_occurrence(script_maker):
+    # 같은 제목의 문단은 몇 번째 등장인지로 이전 챕터를 찾음
+    previous = [
+        {"title": "첫 작품", "headings": ["1. 작품", "1. 평가"]},
+        {"title": "두 번째 작품", "headings": ["1. 작품", "1. 평가"]},
+    ]
+    content = "\n\n".join([section(1, "작품"), section(1, "평가"), section(1, "작품"), section(1, "평가")])
+
+    chapters = script_maker.rebuild_toc("문서", content, previous)
+
+    assert [chapter["title"] for chapter in chapters] == ["첫 작품", "두 번째 작품"]
+    assert [chapter["sections"] for chapter in chapters] == [[1, 2], [3, 4]]
+
+
+def test_chapter_source_hash_changes_only_with_chapter_inputs(previous_chapters):
+    chapter = previous_chapters[0]
+    base = ScriptMaker.chapter_source_hash(chapter, 1, 2, voice="a")
+
+    # 위치만 바뀌어도 첫/마지막 여부가 같으면 재사용 가능
+    assert ScriptMaker.chapter_source_hash(dict(chapter, sections=[5, 6]), 1, 3, voice="a") == base
+    assert ScriptMaker.chapter_source_hash(dict(chapter, content="수정됨"), 1, 2, voice="a") != base
+    assert ScriptMaker.chapter_source_hash(dict(chapter, title="새 제목"), 1, 2, voice="a") != base
+    assert ScriptMaker.chapter_source_hash(chapter, 2, 2, voice="a") != base
+    assert ScriptMaker.chapter_source_hash(chapter, 1, 2, voice="b") != base
@@ -0,0 +1,75 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.utils.metrics import COALESCED_REQUESTS
+from app.utils.single_flight import SingleFlight
+
+
+def wait_for_followers(name: str, count: int):
+    # 후속 호출은 리더의 Future를 받은 뒤 카운터를 올리므로, 이 값이 차면 모두 합류한 상태
+    deadline = time.monotonic() + 5
+    while COALESCED_REQUESTS.values.get((name,), 0) < count:
+        assert time.monotonic() < deadline, "followers did not join the in-flight call"
+        time.sleep(0.01)
+
+
+def test_concurrent_calls_share_the_leader_result():
+    flight = SingleFlight("test-share")
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flight.do, "key", fn)]
+        started.wait(5)
+        futures += [executor.submit(flight.do, "key", fn) for _ in range(3)]
+        wait_for_followers("test-share", 3)
+        release.set()
+        results = [future.result(5) for future in futures]
+
+    assert results == ["result"] * 4
+    assert len(calls) == 1
+    assert flight.calls == {}
+
+
+def test_followers_receive_the_leader_exception():
+    flight = SingleFlight("test-error")
+    started, release = threading.Event(), threading.Event()
+
+    def fn():
+        started.set()
+        release.wait(5)
+        raise ValueError("boom")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        leader = executor.submit(flight.do, "key", fn)
+        started.wait(5)
+        follower = executor.submit(flight.do, "key", lambda: "not called")
+        wait_for_followers("test-error", 1)
+        release.set()
+        for future in (leader, follower):
+            with pytest.raises(ValueError):
+                future.result(5)
+
+
+def test_different_keys_and_later_calls_run_separately():
+    flight = SingleFlight("test-separate")
+    calls = []
+
+    def fn(value):
+        calls.append(value)
+        return value
+
+    assert flight.do("a", fn, 1) == 1
+    assert flight.do("b", fn, 2) == 2
+    # 완료된 뒤의 호출은 이전 결과를 공유하지 않고 새로 실행
+    assert flight.do("a", fn, 3) == 3
+    assert calls == [1, 2, 3]
@@ -0,0 +1,65 @@
+import pytest
+
+from app.services.namuwiki_data_extract import TextCleaner
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("첫 문장이다.[1] 두 번째 문장이다.", "첫 문장이다. 두 번째 문장이다."),
+    ("본문 [a] 내용 [*] 끝.", "본문 내용 끝."),
+    ("본문[주 12] 내용[각주 3]이다.", "본문 내용이다."),
+    # 네 자리를 넘는 번호나 일반 대괄호는 각주가 아님
+    ("연도 [12345] 표기와 [참고] 문구.", "연도 [12345] 표기와 [참고] 문구."),
+])
+def test_removes_footnote_markers(text, expected):
+    assert TextCleaner.clean_text(text) == expected
+
+
+def test_removes_marker_only_lines_without_splitting_paragraph():
+    text = "첫 줄이 이어지는\n[1]\n문장이다."
+
+    assert TextCleaner.clean_text(text) == "첫 줄이 이어지는 문장이다."
+
+
+def test_removes_edit_markers():
+    text = "1.\n개요 [편집]\n본문이다.\n\n2.\n역사\n[편집]\n\n과거의 일이다."
+
+    assert TextCleaner.clean_text(text) == "1. 개요\n\n본문이다.\n\n2. 역사\n\n과거의 일이다."
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2.1.\n초기 반응\n반응이 좋았다.", ["2.1. 초기 반응", "반응이 좋았다."]),
+    ("3.\n평가", ["3. 평가"]),
+    # 블록 첫 줄이 아닌 번호는 문단 제목이 아님
+    ("순위는\n2.\n위였다.", ["순위는 2.\n위였다."]),
+    ("앞 문단이다.\n\n 4.2.\n결말\n끝났다.", ["앞 문단이다.", "4.2. 결말", "끝났다."]),
+])
+def test_splits_numbered_headings_into_blocks(text, expected):
+    assert TextCleaner.clean_text(text).split("\n\n") == expected
+
+
+def test_keeps_paragraph_boundaries():
+    text = "첫 문단이다.\n\n\n두 번째 문단이다.\n \n세 번째 문단이다."
+
+    assert TextCleaner.clean_text(text) == "첫 문단이다.\n\n두 번째 문단이다.\n\n세 번째 문단이다."
+
+
+@pytest.mark.parametrize("text, expected", [
+    # 인라인 요소 경계에서 잘린 줄은 이어 붙이고 문장이 끝난 줄의 줄바꿈은 유지
+    ("링크가\n들어간 문장이다.\n다음 문장이다.", "링크가 들어간 문장이다.\n다음 문장이다."),
+    ("그가 말했다. “좋다.”\n그리고 떠났다.", "그가 말했다. “좋다.”\n그리고 떠났다."),
+    ("정말요?\n그렇다…\n끝", "정말요?\n그렇다…\n끝"),
+])
+def test_joins_lines_that_do_not_end_a_sentence(text, expected):
+    assert TextCleaner.clean_text(text) == expected
+
+
+def test_normalizes_special_and_repeated_spaces():
+    text = "﻿앞​\t공백  과   전각　공백 \n 줄 끝."
+
+    assert TextCleaner.clean_text(text) == "앞 공백 과 전각 공백 줄 끝."
+
+
+def test_streamed_blocks_match_whole_text():
+    blocks = ["1.\n개요 [편집]", "본문이\n이어진다.[1]", "  ", "2.\n역사\n과거의 일이다."]
+
+    assert list(TextCleaner.clean_blocks(blocks)) == TextCleaner.clean_text("\n\n".join(blocks)).split("\n\n")
@@ -0,0 +1,71 @@
+import pytest
+
+from app.services.audio_maker import AudioMaker
+from app.services.tts_providers import FakeTTSProvider
+from app.utils.text_splitter import pack_chunks, split_sentences
+
+
+def without_spaces(text: str) -> str:
+    return "".join(text.split())
+
+
+def test_short_text_is_a_single_chunk():
+    assert pack_chunks("  짧은 문장이다.  ", 100) == ["짧은 문장이다."]
+    assert pack_chunks(" \n ", 100) == []
+
+
+def test_packs_whole_paragraphs_when_they_fit():
+    text = "첫 문단이다.\n\n두 번째 문단이다.\n\n세 번째 문단이다."
+
+    assert pack_chunks(text, 22) == ["첫 문단이다.\n\n두 번째 문단이다.", "세 번째 문단이다."]
+
+
+def test_splits_long_paragraph_at_sentence_boundaries():
+    text = "첫 문장이다. 두 번째 문장인가? 세 번째 문장이다! “인용이다.” 끝."
+
+    chunks = pack_chunks(text, 20)
+
+    assert chunks == ["첫 문장이다. 두 번째 문장인가?", "세 번째 문장이다! “인용이다.”", "끝."]
+
+
+@pytest.mark.parametrize("text, expected", [
+    # 쉼표 위치에서 먼저 자르고, 없으면 공백, 그마저 없으면 글자 수로 자름
+    ("가나다라, 마바사아자, 차카타파하", ["가나다라,", "마바사아자,", "차카타파하"]),
+    ("가나다라 마바사아자 차카타파하", ["가나다라", "마바사아자", "차카타파하"]),
+    ("가나다라마바사아자차카타파하", ["가나다라마바", "사아자차카타", "파하"]),
+])
+def test_hard_splits_sentences_longer_than_the_limit(text, expected):
+    assert pack_chunks(text, 6) == expected
+
+
+@pytest.mark.parametrize("max_chars", [5, 17, 40, 300])
+def test_chunks_respect_limit_and_keep_all_text(max_chars):
+    text = "\n\n".join(
+        f"{idx}번째 문단의 첫 문장이다. 두 번째 문장은 조금 더 길게, 쉼표를 넣어 이어진다. 짧다." for idx in range(5)
+    )
+
+    chunks = pack_chunks(text, max_chars)
+
+    assert all(0 < len(chunk) <= max_chars for chunk in chunks)
+    assert without_spaces("".join(chunks)) == without_spaces(text)
+
+
+def test_split_sentences_keeps_closing_quotes_with_the_sentence():
+    assert split_sentences("그가 “좋다.” 라고 했다. 끝\n새 줄") == ["그가 “좋다.”", "라고 했다.", "끝", "새 줄"]
+
+
+def test_audio_maker_synthesizes_each_chunk_once_in_order(tmp_path):
+    class RecordingProvider(FakeTTSProvider):
+        def synthesize(self, text: str) -> bytes:
+            texts.append(text)
+            return text.encode("utf-8")
+
+    texts = []
+    script = "첫 문장이다. 두 번째 문장이다. 세 번째 문장이다. 네 번째 문장이다."
+    maker = AudioMaker(RecordingProvider(), max_concurrency=4, max_chars=20, audio_dir=str(tmp_path))
+
+    with open(maker.generate_audio("제목", script), "rb") as f:
+        audio = f.read()
+
+    assert sorted(texts) == sorted(pack_chunks(script, 20))
+    assert audio.decode("utf-8") == "".join(pack_chunks(script, 20))